@@ -0,0 +1,132 @@
+from dataclasses import dataclass
+from typing import ClassVar, Literal
+
+from util.compact import Converter
+
+from . import syntax
+
+
+@dataclass(frozen=True, slots=True)
+class Program:
+    tag: ClassVar[Literal["l0"]] = "l0"
+    procedures: tuple[Procedure, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class Procedure:
+    tag: ClassVar[Literal["procedure"]] = "procedure"
+    name: str
+    parameters: tuple[str, ...]
+    body: Statement
+
+
+type Statement = Copy | Immediate | Primitive | Branch | Allocate | Load | Store | Address | Call | Halt
+
+
+@dataclass(frozen=True, slots=True)
+class Copy:
+    tag: ClassVar[Literal["copy"]] = "copy"
+    destination: str
+    source: str
+    then: Statement
+
+
+@dataclass(frozen=True, slots=True)
+class Immediate:
+    tag: ClassVar[Literal["immediate"]] = "immediate"
+    destination: str
+    value: int
+    then: Statement
+
+
+@dataclass(frozen=True, slots=True)
+class Primitive:
+    tag: ClassVar[Literal["primitive"]] = "primitive"
+    destination: str
+    operator: Literal["+", "-", "*"]
+    left: str
+    right: str
+    then: Statement
+
+
+@dataclass(frozen=True, slots=True)
+class Branch:
+    tag: ClassVar[Literal["branch"]] = "branch"
+    operator: Literal["<", "=="]
+    left: str
+    right: str
+    then: Statement
+    otherwise: Statement
+
+
+@dataclass(frozen=True, slots=True)
+class Allocate:
+    tag: ClassVar[Literal["allocate"]] = "allocate"
+    destination: str
+    count: int
+    then: Statement
+
+
+@dataclass(frozen=True, slots=True)
+class Load:
+    tag: ClassVar[Literal["load"]] = "load"
+    destination: str
+    base: str
+    index: int
+    then: Statement
+
+
+@dataclass(frozen=True, slots=True)
+class Store:
+    tag: ClassVar[Literal["store"]] = "store"
+    base: str
+    index: int
+    value: str
+    then: Statement
+
+
+@dataclass(frozen=True, slots=True)
+class Address:
+    tag: ClassVar[Literal["address"]] = "address"
+    destination: str
+    name: str
+    then: Statement
+
+
+@dataclass(frozen=True, slots=True)
+class Call:
+    tag: ClassVar[Literal["call"]] = "call"
+    target: str
+    arguments: tuple[str, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class Halt:
+    tag: ClassVar[Literal["halt"]] = "halt"
+    value: str
+
+
+_converter = Converter(
+    {
+        syntax.Program: Program,
+        syntax.Procedure: Procedure,
+        syntax.Copy: Copy,
+        syntax.Immediate: Immediate,
+        syntax.Primitive: Primitive,
+        syntax.Branch: Branch,
+        syntax.Allocate: Allocate,
+        syntax.Load: Load,
+        syntax.Store: Store,
+        syntax.Address: Address,
+        syntax.Call: Call,
+        syntax.Halt: Halt,
+    }
+)
+
+
+def to_compact(program: syntax.Program) -> Program:
+    return _converter.to_compact(program)
+
+
+def from_compact(program: Program) -> syntax.Program:
+    return _converter.from_compact(program)
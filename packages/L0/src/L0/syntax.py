@@ -1,19 +1,20 @@
 from collections.abc import Sequence
 from typing import Annotated, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import Field
+from util.node import Node
 
 type Identifier = Annotated[str, Field(min_length=1)]
 
 type Nat = Annotated[int, Field(ge=0)]
 
 
-class Program(BaseModel, frozen=True):
+class Program(Node, frozen=True):
     tag: Literal["l0"] = "l0"
     procedures: Sequence[Procedure]
 
 
-class Procedure(BaseModel, frozen=True):
+class Procedure(Node, frozen=True):
     tag: Literal["procedure"] = "procedure"
     name: Identifier
     parameters: Sequence[Identifier]
@@ -26,21 +27,21 @@ type Statement = Annotated[
 ]
 
 
-class Copy(BaseModel, frozen=True):
+class Copy(Node, frozen=True):
     tag: Literal["copy"] = "copy"
     destination: Identifier
     source: Identifier
     then: Statement
 
 
-class Immediate(BaseModel, frozen=True):
+class Immediate(Node, frozen=True):
     tag: Literal["immediate"] = "immediate"
     destination: Identifier
     value: int
     then: Statement
 
 
-class Primitive(BaseModel, frozen=True):
+class Primitive(Node, frozen=True):
     tag: Literal["primitive"] = "primitive"
     destination: Identifier
     operator: Literal["+", "-", "*"]
@@ -49,7 +50,7 @@ class Primitive(BaseModel, frozen=True):
     then: Statement
 
 
-class Branch(BaseModel, frozen=True):
+class Branch(Node, frozen=True):
     tag: Literal["branch"] = "branch"
     operator: Literal["<", "=="]
     left: Identifier
@@ -58,14 +59,14 @@ class Branch(BaseModel, frozen=True):
     otherwise: Statement
 
 
-class Allocate(BaseModel, frozen=True):
+class Allocate(Node, frozen=True):
     tag: Literal["allocate"] = "allocate"
     destination: Identifier
     count: Nat
     then: Statement
 
 
-class Load(BaseModel, frozen=True):
+class Load(Node, frozen=True):
     tag: Literal["load"] = "load"
     destination: Identifier
     base: Identifier
@@ -73,7 +74,7 @@ class Load(BaseModel, frozen=True):
     then: Statement
 
 
-class Store(BaseModel, frozen=True):
+class Store(Node, frozen=True):
     tag: Literal["store"] = "store"
     base: Identifier
     index: Nat
@@ -81,19 +82,19 @@ class Store(BaseModel, frozen=True):
     then: Statement
 
 
-class Address(BaseModel, frozen=True):
+class Address(Node, frozen=True):
     tag: Literal["address"] = "address"
     destination: Identifier
     name: Identifier
     then: Statement
 
 
-class Call(BaseModel, frozen=True):
+class Call(Node, frozen=True):
     tag: Literal["call"] = "call"
     target: Identifier
     arguments: Sequence[Identifier]
 
 
-class Halt(BaseModel, frozen=True):
+class Halt(Node, frozen=True):
     tag: Literal["halt"] = "halt"
     value: Identifier
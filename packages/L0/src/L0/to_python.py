@@ -3,6 +3,8 @@ from ast import stmt
 from functools import partial
 
 from util.encode import encode
+from util.pyc import to_pyc
+from util.trampoline import Steps, trampoline
 
 from .syntax import (
     Address,
@@ -29,149 +31,149 @@ def store(name: str) -> ast.Name:
     return ast.Name(id=encode(name), ctx=ast.Store())
 
 
+@trampoline
 def to_ast_statement(
     term: Statement,
-) -> list[ast.stmt]:
-    _statement: partial[list[stmt]] = partial(to_ast_statement)
+) -> Steps[list[ast.stmt]]:
+    # Follows then from each statement to the next in a loop, so only the arms of a branch are converted recursively.
+    _statement = to_ast_statement.steps
+    statements: list[stmt] = []
+
+    while True:
+        match term:
+            case Copy(destination=destination, source=source, then=then):
+                statements.append(ast.Assign(targets=[store(destination)], value=load(source)))
+
+            case Immediate(destination=destination, value=value, then=then):
+                statements.append(ast.Assign(targets=[store(destination)], value=ast.Constant(value=value)))
+
+            case Primitive(destination=destination, operator=operator, left=left, right=right, then=then):
+                match operator:
+                    case "+":
+                        op = ast.Add()
+
+                    case "-":
+                        op = ast.Sub()
+
+                    case "*":  # pragma: no branch
+                        op = ast.Mult()
+
+                statements.append(
+                    ast.Assign(
+                        targets=[store(destination)],
+                        value=ast.BinOp(
+                            left=load(left),
+                            op=op,
+                            right=load(right),
+                        ),
+                    )
+                )
 
-    match term:
-        case Copy(destination=destination, source=source, then=then):
-            return [
-                ast.Assign(targets=[store(destination)], value=load(source)),
-                *_statement(then),
-            ]
-
-        case Immediate(destination=destination, value=value, then=then):
-            return [
-                ast.Assign(targets=[store(destination)], value=ast.Constant(value=value)),
-                *_statement(then),
-            ]
-
-        case Primitive(destination=destination, operator=operator, left=left, right=right, then=then):
-            match operator:
-                case "+":
-                    op = ast.Add()
-
-                case "-":
-                    op = ast.Sub()
-
-                case "*":  # pragma: no branch
-                    op = ast.Mult()
-
-            return [
-                ast.Assign(
-                    targets=[store(destination)],
-                    value=ast.BinOp(
-                        left=load(left),
-                        op=op,
-                        right=load(right),
-                    ),
-                ),
-                *_statement(then),
-            ]
-
-        case Branch(operator=operator, left=left, right=right, then=then, otherwise=otherwise):
-            match operator:
-                case "<":
-                    op = ast.Lt()
-
-                case "==":  # pragma: no branch
-                    op = ast.Eq()
-
-            return [
-                ast.If(
-                    test=ast.Compare(
-                        left=load(left),
-                        ops=[op],
-                        comparators=[load(right)],
-                    ),
-                    body=_statement(then),
-                    orelse=_statement(otherwise),
-                ),
-            ]
-
-        case Allocate(destination=destination, count=count, then=then):
-            return [
-                ast.Assign(
-                    targets=[store(destination)],
-                    value=ast.List(
-                        elts=[ast.Constant(None) for _ in range(count)],
-                        ctx=ast.Load(),
-                    ),
-                ),
-                *_statement(then),
-            ]
-
-        case Load(destination=destination, base=base, index=index, then=then):
-            return [
-                ast.Assign(
-                    targets=[store(destination)],
-                    value=ast.Subscript(
-                        value=load(base),
-                        slice=ast.Constant(index),
-                        ctx=ast.Load(),
-                    ),
-                ),
-                *_statement(then),
-            ]
-
-        case Store(base=base, index=index, value=value, then=then):
-            return [
-                ast.Assign(
-                    targets=[
-                        ast.Subscript(
-                            value=store(base),
+            case Branch(operator=operator, left=left, right=right, then=then, otherwise=otherwise):
+                match operator:
+                    case "<":
+                        op = ast.Lt()
+
+                    case "==":  # pragma: no branch
+                        op = ast.Eq()
+
+                statements.append(
+                    ast.If(
+                        test=ast.Compare(
+                            left=load(left),
+                            ops=[op],
+                            comparators=[load(right)],
+                        ),
+                        body=(yield _statement(then)),
+                        orelse=(yield _statement(otherwise)),
+                    )
+                )
+                return statements
+
+            case Allocate(destination=destination, count=count, then=then):
+                statements.append(
+                    ast.Assign(
+                        targets=[store(destination)],
+                        value=ast.List(
+                            elts=[ast.Constant(None) for _ in range(count)],
+                            ctx=ast.Load(),
+                        ),
+                    )
+                )
+
+            case Load(destination=destination, base=base, index=index, then=then):
+                statements.append(
+                    ast.Assign(
+                        targets=[store(destination)],
+                        value=ast.Subscript(
+                            value=load(base),
                             slice=ast.Constant(index),
-                            ctx=ast.Store(),
+                            ctx=ast.Load(),
+                        ),
+                    )
+                )
+
+            case Store(base=base, index=index, value=value, then=then):
+                statements.append(
+                    ast.Assign(
+                        targets=[
+                            ast.Subscript(
+                                value=load(base),
+                                slice=ast.Constant(index),
+                                ctx=ast.Store(),
+                            )
+                        ],
+                        value=load(value),
+                    )
+                )
+
+            case Address(destination=destination, name=name, then=then):
+                statements.append(ast.Assign(targets=[store(destination)], value=load(name)))
+
+            case Call(target=target, arguments=arguments):
+                statements.append(
+                    ast.Return(
+                        value=ast.Call(
+                            func=load(target),
+                            args=[load(argument) for argument in arguments],
                         )
-                    ],
-                    value=load(value),
-                ),
-                *_statement(then),
-            ]
-
-        case Address(destination=destination, name=name, then=then):
-            return [
-                ast.Assign(targets=[store(destination)], value=load(name)),
-                *_statement(then),
-            ]
-
-        case Call(target=target, arguments=arguments):
-            return [
-                ast.Return(
-                    value=ast.Call(
-                        func=load(target),
-                        args=[load(argument) for argument in arguments],
                     )
                 )
-            ]
+                return statements
+
+            case Halt(value=value):
+                statements.append(ast.Return(value=load(value)))
+                return statements
 
-        case Halt(value=value):  # pragma: no branch
-            return [
-                ast.Return(value=load(value)),
-            ]
+            case _:
+                raise TypeError(f"not an L0 statement: {type(term)!r}")
+
+        term = then
 
 
 def to_ast_procedure(procedure: Procedure) -> ast.stmt:
     _statement: partial[list[stmt]] = partial(to_ast_statement)
 
     match procedure:
-        case Procedure(name=name, parameters=parameters, body=body):  # pragma: no branch
+        case Procedure(name=name, parameters=parameters, body=body):
             return ast.FunctionDef(
                 name=name,
                 args=ast.arguments(args=[ast.arg(arg=parameter) for parameter in parameters]),
                 body=_statement(body),
             )
 
+        case _:
+            raise TypeError(f"not an L0 procedure: {type(procedure)!r}")
 
-def to_ast_program(
+
+def to_ast_module(
     program: Program,
-) -> str:
+) -> ast.Module:
     _procedure = partial(to_ast_procedure)
     _statement = partial(to_ast_statement)
 
     match program:
-        case Program(procedures=procedures):  # pragma: no branch
+        case Program(procedures=procedures):
             l0 = next(procedure for procedure in procedures if procedure.name == "l0")
 
             module = ast.Module(
@@ -216,6 +218,20 @@ def to_ast_program(
                 ]
             )
 
-            ast.fix_missing_locations(module)
+            return ast.fix_missing_locations(module)
+
+        case _:
+            raise TypeError(f"not an L0 program: {type(program)!r}")
+
+
+def to_ast_program(
+    program: Program,
+) -> str:
+    return ast.unparse(to_ast_module(program))
 
-            return ast.unparse(module)
+
+def to_pyc_program(
+    program: Program,
+    filename: str = "<l0>",
+) -> bytes:
+    return to_pyc(to_ast_module(program), filename)
@@ -0,0 +1,103 @@
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from L0 import compact
+from L0.syntax import (
+    Address,
+    Allocate,
+    Branch,
+    Call,
+    Copy,
+    Halt,
+    Immediate,
+    Load,
+    Primitive,
+    Procedure,
+    Program,
+    Store,
+)
+from L0.to_python import to_ast_module, to_ast_procedure, to_ast_program, to_ast_statement
+
+PROGRAM = Program(
+    procedures=[
+        Procedure(
+            name="f",
+            parameters=["c", "x"],
+            body=Branch(
+                operator="<",
+                left="x",
+                right="c",
+                then=Halt(value="x"),
+                otherwise=Call(target="f", arguments=["c", "x"]),
+            ),
+        ),
+        Procedure(
+            name="l0",
+            parameters=["x"],
+            body=Allocate(
+                destination="c",
+                count=1,
+                then=Address(
+                    destination="a",
+                    name="f",
+                    then=Store(
+                        base="c",
+                        index=0,
+                        value="a",
+                        then=Load(
+                            destination="b",
+                            base="c",
+                            index=0,
+                            then=Immediate(
+                                destination="i",
+                                value=1,
+                                then=Primitive(
+                                    destination="y",
+                                    operator="+",
+                                    left="x",
+                                    right="i",
+                                    then=Copy(destination="z", source="y", then=Halt(value="z")),
+                                ),
+                            ),
+                        ),
+                    ),
+                ),
+            ),
+        ),
+    ]
+)
+
+
+def test_compact_round_trip():
+    actual = compact.to_compact(PROGRAM)
+
+    match actual:
+        case compact.Program(procedures=(compact.Procedure(name="f", parameters=("c", "x")), _)):
+            pass
+
+        case _:  # pragma: no cover
+            raise AssertionError(actual)
+
+    assert compact.from_compact(actual) == PROGRAM
+
+
+def test_passes_match_compact():
+    assert to_ast_program(compact.to_compact(PROGRAM)) == to_ast_program(PROGRAM)
+
+
+# Anything else falls through every case of a pass.
+UNKNOWN: Any = object()
+
+
+@pytest.mark.parametrize(
+    "run",
+    [
+        lambda: to_ast_statement(UNKNOWN),
+        lambda: to_ast_procedure(UNKNOWN),
+        lambda: to_ast_module(UNKNOWN),
+    ],
+)
+def test_passes_reject_unknown(run: Callable[[], object]):
+    with pytest.raises(TypeError):
+        run()
@@ -0,0 +1,117 @@
+import runpy
+from pathlib import Path
+
+import pytest
+from L0.syntax import (
+    Address,
+    Allocate,
+    Branch,
+    Call,
+    Copy,
+    Halt,
+    Immediate,
+    Load,
+    Primitive,
+    Procedure,
+    Program,
+    Store,
+)
+from L0.to_python import to_ast_program, to_pyc_program
+
+# f(c, x) counts x down until it is below the bound in c, and l0 calls it with 2 * x + 3.
+PROGRAM = Program(
+    procedures=[
+        Procedure(
+            name="f",
+            parameters=["c", "x"],
+            body=Load(
+                destination="b",
+                base="c",
+                index=1,
+                then=Branch(
+                    operator="<",
+                    left="x",
+                    right="b",
+                    then=Halt(value="x"),
+                    otherwise=Immediate(
+                        destination="one",
+                        value=1,
+                        then=Primitive(
+                            destination="y",
+                            operator="-",
+                            left="x",
+                            right="one",
+                            then=Call(target="f", arguments=["c", "y"]),
+                        ),
+                    ),
+                ),
+            ),
+        ),
+        Procedure(
+            name="l0",
+            parameters=["x"],
+            body=Allocate(
+                destination="c",
+                count=2,
+                then=Address(
+                    destination="a",
+                    name="f",
+                    then=Store(
+                        base="c",
+                        index=0,
+                        value="a",
+                        then=Immediate(
+                            destination="i",
+                            value=3,
+                            then=Store(
+                                base="c",
+                                index=1,
+                                value="i",
+                                then=Immediate(
+                                    destination="two",
+                                    value=2,
+                                    then=Primitive(
+                                        destination="z",
+                                        operator="*",
+                                        left="x",
+                                        right="two",
+                                        then=Primitive(
+                                            destination="s",
+                                            operator="+",
+                                            left="z",
+                                            right="i",
+                                            then=Copy(
+                                                destination="w",
+                                                source="s",
+                                                then=Branch(
+                                                    operator="==",
+                                                    left="w",
+                                                    right="s",
+                                                    then=Call(target="f", arguments=["c", "w"]),
+                                                    otherwise=Halt(value="w"),
+                                                ),
+                                            ),
+                                        ),
+                                    ),
+                                ),
+                            ),
+                        ),
+                    ),
+                ),
+            ),
+        ),
+    ]
+)
+
+
+@pytest.mark.parametrize("pyc", [False, True])
+def test_to_python(tmp_path: Path, pyc: bool):
+    path = tmp_path / ("module.pyc" if pyc else "module.py")
+    if pyc:
+        path.write_bytes(to_pyc_program(PROGRAM, str(path)))
+    else:
+        path.write_text(to_ast_program(PROGRAM))
+
+    namespace = runpy.run_path(str(path))
+    assert namespace["l0"](5) == 2
+    assert namespace["f"]([None, 10], 4) == 4
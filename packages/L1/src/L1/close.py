@@ -2,6 +2,8 @@ from collections.abc import Callable
 from functools import partial
 
 from L0 import syntax as L0
+from util.trampoline import Steps, trampoline
+from util.trusted import trusted
 
 from .syntax import (
     Abstract,
@@ -19,117 +21,171 @@ from .syntax import (
 )
 
 
-def free_variables(statement: Statement) -> set[str]:
+@trampoline
+def annotate(
+    statement: Statement,
+    closures: dict[int, list[str]],
+) -> Steps[set[str]]:
+    # Free variables of statement, recording the sorted free variables of every Abstract in it by identity. Each set
+    # belongs to the caller, so it is updated in place on the way up instead of copied at every link of the chain.
+    recur = partial(annotate.steps, closures=closures)
+
     match statement:
         case Copy(destination=destination, source=source, then=then):
-            return {source} | (free_variables(then) - {destination})
+            free = yield recur(then)
+            free.discard(destination)
+            free.add(source)
+            return free
 
         case Abstract(destination=destination, parameters=parameters, body=body, then=then):
-            return (free_variables(body) - set(parameters)) | (free_variables(then) - {destination})
+            captured = yield recur(body)
+            captured.difference_update(parameters)
+            closures[id(statement)] = sorted(captured)
+
+            free = yield recur(then)
+            free.discard(destination)
+            free |= captured
+            return free
 
         case Apply(target=target, arguments=arguments):
             return {target, *arguments}
 
-        case Immediate(destination=destination, then=then):
-            return free_variables(then) - {destination}
+        case Immediate(destination=destination, then=then) | Allocate(destination=destination, then=then):
+            free = yield recur(then)
+            free.discard(destination)
+            return free
 
         case Primitive(destination=destination, left=left, right=right, then=then):
-            return {left, right} | (free_variables(then) - {destination})
+            free = yield recur(then)
+            free.discard(destination)
+            free.update((left, right))
+            return free
 
         case Branch(left=left, right=right, then=then, otherwise=otherwise):
-            return {left, right} | free_variables(then) | free_variables(otherwise)
-
-        case Allocate(destination=destination, then=then):
-            return free_variables(then) - {destination}
+            free = yield recur(then)
+            free |= yield recur(otherwise)
+            free.update((left, right))
+            return free
 
         case Load(destination=destination, base=base, then=then):
-            return {base} | (free_variables(then) - {destination})
+            free = yield recur(then)
+            free.discard(destination)
+            free.add(base)
+            return free
 
         case Store(base=base, value=value, then=then):
-            return {base, value} | free_variables(then)
+            free = yield recur(then)
+            free.update((base, value))
+            return free
 
-        case Halt(value=value):  # pragma: no branch
+        case Halt(value=value):
             return {value}
 
+        case _:
+            raise TypeError(f"not an L1 statement: {type(statement)!r}")
+
+
+def free_variables(statement: Statement) -> set[str]:
+    return annotate(statement, {})
+
 
+@trampoline
 def close_statement(
     statement: Statement,
     fresh: Callable[[str], str],
     procedures: list[L0.Procedure],
-) -> L0.Statement:
-    _statement = partial(close_statement, fresh=fresh, procedures=procedures)
+    closures: dict[int, list[str]] | None = None,
+) -> Steps[L0.Statement]:
+    if closures is None:
+        closures = {}
+        yield annotate.steps(statement, closures)
+
+    _statement = partial(close_statement.steps, fresh=fresh, procedures=procedures, closures=closures)
 
     match statement:
         case Copy(destination=destination, source=source, then=then):
-            return L0.Copy(destination=destination, source=source, then=_statement(then))
+            return trusted(L0.Copy, destination=destination, source=source, then=(yield _statement(then)))
 
         case Abstract(destination=destination, parameters=parameters, body=body, then=then):
-            fvs = sorted(free_variables(body) - set(parameters))
+            fvs = closures[id(statement)]
 
             proc_name = fresh("f")
             closure_param = fresh("c")
 
-            converted_body = close_statement(body, fresh, procedures)
+            converted_body = yield _statement(body)
             for i in reversed(range(len(fvs))):
-                converted_body = L0.Load(destination=fvs[i], base=closure_param, index=i + 1, then=converted_body)
+                converted_body = trusted(
+                    L0.Load, destination=fvs[i], base=closure_param, index=i + 1, then=converted_body
+                )
 
             procedures.append(
-                L0.Procedure(
+                trusted(
+                    L0.Procedure,
                     name=proc_name,
                     parameters=[closure_param, *parameters],
                     body=converted_body,
                 )
             )
 
-            converted_then = _statement(then)
+            converted_then = yield _statement(then)
 
             result: L0.Statement = converted_then
             for i in reversed(range(len(fvs))):
-                result = L0.Store(base=destination, index=i + 1, value=fvs[i], then=result)
+                result = trusted(L0.Store, base=destination, index=i + 1, value=fvs[i], then=result)
             addr_temp = fresh("t")
-            result = L0.Store(base=destination, index=0, value=addr_temp, then=result)
-            result = L0.Address(destination=addr_temp, name=proc_name, then=result)
-            result = L0.Allocate(destination=destination, count=1 + len(fvs), then=result)
+            result = trusted(L0.Store, base=destination, index=0, value=addr_temp, then=result)
+            result = trusted(L0.Address, destination=addr_temp, name=proc_name, then=result)
+            result = trusted(L0.Allocate, destination=destination, count=1 + len(fvs), then=result)
 
             return result
 
         case Apply(target=target, arguments=arguments):
             t = fresh("t")
-            return L0.Load(
+            return trusted(
+                L0.Load,
                 destination=t,
                 base=target,
                 index=0,
-                then=L0.Call(target=t, arguments=[target, *arguments]),
+                then=trusted(L0.Call, target=t, arguments=[target, *arguments]),
             )
 
         case Immediate(destination=destination, value=value, then=then):
-            return L0.Immediate(destination=destination, value=value, then=_statement(then))
+            return trusted(L0.Immediate, destination=destination, value=value, then=(yield _statement(then)))
 
         case Primitive(destination=destination, operator=operator, left=left, right=right, then=then):
-            return L0.Primitive(
-                destination=destination, operator=operator, left=left, right=right, then=_statement(then)
+            return trusted(
+                L0.Primitive,
+                destination=destination,
+                operator=operator,
+                left=left,
+                right=right,
+                then=(yield _statement(then)),
             )
 
         case Branch(operator=operator, left=left, right=right, then=then, otherwise=otherwise):
-            return L0.Branch(
+            return trusted(
+                L0.Branch,
                 operator=operator,
                 left=left,
                 right=right,
-                then=_statement(then),
-                otherwise=_statement(otherwise),
+                then=(yield _statement(then)),
+                otherwise=(yield _statement(otherwise)),
             )
 
         case Allocate(destination=destination, count=count, then=then):
-            return L0.Allocate(destination=destination, count=count, then=_statement(then))
+            return trusted(L0.Allocate, destination=destination, count=count, then=(yield _statement(then)))
 
         case Load(destination=destination, base=base, index=index, then=then):
-            return L0.Load(destination=destination, base=base, index=index, then=_statement(then))
+            return trusted(L0.Load, destination=destination, base=base, index=index, then=(yield _statement(then)))
 
         case Store(base=base, index=index, value=value, then=then):
-            return L0.Store(base=base, index=index, value=value, then=_statement(then))
+            return trusted(L0.Store, base=base, index=index, value=value, then=(yield _statement(then)))
 
-        case Halt(value=value):  # pragma: no branch
-            return L0.Halt(value=value)
+        case Halt(value=value):
+            return trusted(L0.Halt, value=value)
+
+        case _:
+            raise TypeError(f"not an L1 statement: {type(statement)!r}")
 
 
 def close_program(
@@ -137,14 +193,18 @@ def close_program(
     fresh: Callable[[str], str],
 ) -> L0.Program:
     match program:
-        case Program(parameters=parameters, body=body):  # pragma: no branch
+        case Program(parameters=parameters, body=body):
             procedures: list[L0.Procedure] = []
             converted_body = close_statement(body, fresh, procedures)
             procedures.append(
-                L0.Procedure(
+                trusted(
+                    L0.Procedure,
                     name="l0",
                     parameters=list(parameters),
                     body=converted_body,
                 )
             )
-            return L0.Program(procedures=procedures)
+            return trusted(L0.Program, procedures=procedures)
+
+        case _:
+            raise TypeError(f"not an L1 program: {type(program)!r}")
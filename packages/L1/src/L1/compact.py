@@ -0,0 +1,130 @@
+from dataclasses import dataclass
+from typing import Any, ClassVar, Literal
+
+from util.compact import Converter
+
+from . import syntax
+
+
+@dataclass(frozen=True, slots=True)
+class Program:
+    tag: ClassVar[Literal["l1"]] = "l1"
+    parameters: tuple[str, ...]
+    body: Statement
+
+
+type Statement = Copy | Abstract | Apply | Immediate | Primitive | Branch | Allocate | Load | Store | Halt
+
+
+@dataclass(frozen=True, slots=True)
+class Copy:
+    tag: ClassVar[Literal["copy"]] = "copy"
+    destination: str
+    source: str
+    then: Statement
+
+
+@dataclass(frozen=True, slots=True)
+class Abstract:
+    tag: ClassVar[Literal["abstract"]] = "abstract"
+    destination: str
+    parameters: tuple[str, ...]
+    body: Statement
+    then: Statement
+
+
+@dataclass(frozen=True, slots=True)
+class Apply:
+    tag: ClassVar[Literal["apply"]] = "apply"
+    target: str
+    arguments: tuple[str, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class Immediate:
+    tag: ClassVar[Literal["immediate"]] = "immediate"
+    destination: str
+    value: int
+    then: Statement
+
+
+@dataclass(frozen=True, slots=True)
+class Primitive:
+    tag: ClassVar[Literal["primitive"]] = "primitive"
+    destination: str
+    operator: Literal["+", "-", "*"]
+    left: str
+    right: str
+    then: Statement
+
+
+@dataclass(frozen=True, slots=True)
+class Branch:
+    tag: ClassVar[Literal["branch"]] = "branch"
+    operator: Literal["<", "=="]
+    left: str
+    right: str
+    then: Statement
+    otherwise: Statement
+
+
+@dataclass(frozen=True, slots=True)
+class Allocate:
+    tag: ClassVar[Literal["allocate"]] = "allocate"
+    destination: str
+    count: int
+    then: Statement
+
+
+@dataclass(frozen=True, slots=True)
+class Load:
+    tag: ClassVar[Literal["load"]] = "load"
+    destination: str
+    base: str
+    index: int
+    then: Statement
+
+
+@dataclass(frozen=True, slots=True)
+class Store:
+    tag: ClassVar[Literal["store"]] = "store"
+    base: str
+    index: int
+    value: str
+    then: Statement
+
+
+@dataclass(frozen=True, slots=True)
+class Halt:
+    tag: ClassVar[Literal["halt"]] = "halt"
+    value: str
+
+
+_converter = Converter(
+    {
+        syntax.Program: Program,
+        syntax.Copy: Copy,
+        syntax.Abstract: Abstract,
+        syntax.Apply: Apply,
+        syntax.Immediate: Immediate,
+        syntax.Primitive: Primitive,
+        syntax.Branch: Branch,
+        syntax.Allocate: Allocate,
+        syntax.Load: Load,
+        syntax.Store: Store,
+        syntax.Halt: Halt,
+    }
+)
+
+
+def to_compact(program: syntax.Program) -> Program:
+    return _converter.to_compact(program)
+
+
+def from_compact(program: Program) -> syntax.Program:
+    return _converter.from_compact(program)
+
+
+def new(cls: type[Any], **values: Any) -> Any:
+    # Builds the compact node where a pass would build cls with util.trusted, so its output is compact as it is made.
+    return _converter.new(cls, **values)
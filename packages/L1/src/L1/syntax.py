@@ -1,13 +1,14 @@
 from collections.abc import Sequence
 from typing import Annotated, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import Field
+from util.node import Node
 
 type Identifier = Annotated[str, Field(min_length=1)]
 type Nat = Annotated[int, Field(ge=0)]
 
 
-class Program(BaseModel, frozen=True):
+class Program(Node, frozen=True):
     tag: Literal["l1"] = "l1"
     parameters: Sequence[Identifier]
     body: Statement
@@ -19,14 +20,14 @@ type Statement = Annotated[
 ]
 
 
-class Copy(BaseModel, frozen=True):
+class Copy(Node, frozen=True):
     tag: Literal["copy"] = "copy"
     destination: Identifier
     source: Identifier
     then: Statement
 
 
-class Abstract(BaseModel, frozen=True):
+class Abstract(Node, frozen=True):
     tag: Literal["abstract"] = "abstract"
     destination: Identifier
     parameters: Sequence[Identifier]
@@ -34,20 +35,20 @@ class Abstract(BaseModel, frozen=True):
     then: Statement
 
 
-class Apply(BaseModel, frozen=True):
+class Apply(Node, frozen=True):
     tag: Literal["apply"] = "apply"
     target: Identifier
     arguments: Sequence[Identifier]
 
 
-class Immediate(BaseModel, frozen=True):
+class Immediate(Node, frozen=True):
     tag: Literal["immediate"] = "immediate"
     destination: Identifier
     value: int
     then: Statement
 
 
-class Primitive(BaseModel, frozen=True):
+class Primitive(Node, frozen=True):
     tag: Literal["primitive"] = "primitive"
     destination: Identifier
     operator: Literal["+", "-", "*"]
@@ -56,7 +57,7 @@ class Primitive(BaseModel, frozen=True):
     then: Statement
 
 
-class Branch(BaseModel, frozen=True):
+class Branch(Node, frozen=True):
     tag: Literal["branch"] = "branch"
     operator: Literal["<", "=="]
     left: Identifier
@@ -65,14 +66,14 @@ class Branch(BaseModel, frozen=True):
     otherwise: Statement
 
 
-class Allocate(BaseModel, frozen=True):
+class Allocate(Node, frozen=True):
     tag: Literal["allocate"] = "allocate"
     destination: Identifier
     count: Nat
     then: Statement
 
 
-class Load(BaseModel, frozen=True):
+class Load(Node, frozen=True):
     tag: Literal["load"] = "load"
     destination: Identifier
     base: Identifier
@@ -80,7 +81,7 @@ class Load(BaseModel, frozen=True):
     then: Statement
 
 
-class Store(BaseModel, frozen=True):
+class Store(Node, frozen=True):
     tag: Literal["store"] = "store"
     base: Identifier
     index: Nat
@@ -88,6 +89,6 @@ class Store(BaseModel, frozen=True):
     then: Statement
 
 
-class Halt(BaseModel, frozen=True):
+class Halt(Node, frozen=True):
     tag: Literal["halt"] = "halt"
     value: Identifier
@@ -1,7 +1,11 @@
 import ast
+from collections import Counter
+from collections.abc import Collection
 from functools import partial
 
 from util.encode import encode
+from util.pyc import to_pyc
+from util.trampoline import Steps, trampoline
 
 from .syntax import (
     Abstract,
@@ -27,137 +31,332 @@ def store(name: str) -> ast.Name:
     return ast.Name(id=encode(name), ctx=ast.Store())
 
 
+def binders(
+    statement: Statement,
+) -> Counter[str]:
+    # How many times each name is bound in statement, counting the functions inside it.
+    counts: Counter[str] = Counter()
+    stack = [statement]
+    while stack:
+        match stack.pop():
+            case Abstract(destination=destination, parameters=parameters, body=body, then=then):
+                counts.update([destination, *parameters])
+                stack += [body, then]
+
+            case (
+                Copy(destination=destination, then=then)
+                | Immediate(destination=destination, then=then)
+                | Primitive(destination=destination, then=then)
+                | Allocate(destination=destination, then=then)
+                | Load(destination=destination, then=then)
+            ):
+                counts[destination] += 1
+                stack.append(then)
+
+            case Store(then=then):
+                stack.append(then)
+
+            case Branch(then=then, otherwise=otherwise):
+                stack += [then, otherwise]
+
+            case Apply() | Halt():
+                pass
+
+            case other:
+                raise TypeError(f"not an L1 statement: {type(other)!r}")
+
+    return counts
+
+
+def self_calls(
+    abstract: Abstract,
+    bound: Counter[str],
+) -> set[str]:
+    # The names through which abstract may call itself, if it can run as a loop that rebinds its parameters instead:
+    # its name means the same function everywhere, and no function defined in its body could see the variables change
+    # from one iteration to the next. A letrec function reaches itself through a load from its box.
+    if bound[abstract.destination] != 1:
+        return set()
+
+    loaded = {abstract.destination}
+    targets: set[str] = set()
+    stack = [abstract.body]
+    while stack:
+        match stack.pop():
+            case Abstract():
+                return set()
+
+            case Apply(target=target, arguments=arguments):
+                if len(arguments) == len(abstract.parameters):
+                    targets.add(target)
+
+            case Load(destination=destination, then=then):
+                loaded.add(destination)
+                stack.append(then)
+
+            case Branch(then=then, otherwise=otherwise):
+                stack += [then, otherwise]
+
+            case Halt():
+                pass
+
+            case Copy(then=then) | Immediate(then=then) | Primitive(then=then) | Allocate(then=then) | Store(then=then):
+                stack.append(then)
+
+            case other:
+                raise TypeError(f"not an L1 statement: {type(other)!r}")
+
+    return targets & loaded
+
+
+@trampoline
 def to_ast_statement(
     statement: Statement,
-) -> list[ast.stmt]:
-    _statement = partial(to_ast_statement)
-
-    match statement:
-        case Copy(destination=destination, source=source, then=then):
-            return [
-                ast.Assign(targets=[store(destination)], value=load(source)),
-                *_statement(then),
-            ]
-
-        case Abstract(destination=destination, parameters=parameters, body=body, then=then):
-            return [
-                ast.FunctionDef(
-                    name=encode(destination),
-                    args=ast.arguments(args=[ast.arg(arg=parameter) for parameter in parameters]),
-                    body=_statement(body),
-                ),
-                *_statement(then),
-            ]
-
-        case Apply(target=target, arguments=arguments):
-            return [
-                ast.Return(
-                    ast.Call(
+    trampoline: bool = False,
+    bound: Counter[str] | None = None,
+    loop: Abstract | None = None,
+    calls: Collection[str] = (),
+) -> Steps[list[ast.stmt]]:
+    # Follows then from each statement to the next in a loop, so only the bodies of functions and the arms of a branch
+    # are converted recursively.
+    bound = binders(statement) if bound is None else bound
+    _statement = partial(to_ast_statement.steps, trampoline=trampoline, bound=bound)
+    statements: list[ast.stmt] = []
+
+    while True:
+        match statement:
+            case Copy(destination=destination, source=source, then=then):
+                statements.append(ast.Assign(targets=[store(destination)], value=load(source)))
+
+            case Abstract(destination=destination, parameters=parameters, body=body, then=then):
+                if calls := self_calls(statement, bound):
+                    # Every call back to itself goes round this loop instead, in one frame.
+                    function_body: list[ast.stmt] = [
+                        ast.While(
+                            test=ast.Constant(value=True),
+                            body=(yield _statement(body, loop=statement, calls=calls)),
+                        )
+                    ]
+                else:
+                    function_body = yield _statement(body)
+
+                statements.append(
+                    ast.FunctionDef(
+                        name=encode(destination),
+                        args=ast.arguments(args=[ast.arg(arg=parameter) for parameter in parameters]),
+                        body=function_body,
+                    )
+                )
+
+            case Apply(target=target, arguments=arguments):
+                if loop is not None and target in calls:
+                    # Whether a call through a box is back to the function itself is only known when it runs.
+                    rebound = [
+                        (parameter, argument)
+                        for parameter, argument in zip(loop.parameters, arguments)
+                        if parameter != argument
+                    ]
+                    again: list[ast.stmt] = [ast.Continue()]
+                    if rebound:
+                        again.insert(
+                            0,
+                            ast.Assign(
+                                targets=[
+                                    ast.Tuple(elts=[store(parameter) for parameter, _ in rebound], ctx=ast.Store())
+                                ],
+                                value=ast.Tuple(elts=[load(argument) for _, argument in rebound], ctx=ast.Load()),
+                            ),
+                        )
+
+                    if target == loop.destination:
+                        statements += again
+                        return statements
+
+                    statements.append(
+                        ast.If(
+                            ast.Compare(left=load(target), ops=[ast.Is()], comparators=[load(loop.destination)]),
+                            body=again,
+                            orelse=[],
+                        )
+                    )
+
+                if trampoline:
+                    # The call is left to the loop in to_ast_function.
+                    value: ast.expr = ast.Tuple(
+                        elts=[load(target), ast.Tuple(elts=[load(argument) for argument in arguments], ctx=ast.Load())],
+                        ctx=ast.Load(),
+                    )
+                else:
+                    value = ast.Call(
                         func=load(target),
                         args=[load(argument) for argument in arguments],
                     )
+                statements.append(ast.Return(value))
+                return statements
+
+            case Immediate(destination=destination, value=value, then=then):
+                statements.append(ast.Assign(targets=[store(destination)], value=ast.Constant(value=value)))
+
+            case Primitive(destination=destination, operator=operator, left=left, right=right, then=then):
+                match operator:
+                    case "+":
+                        op = ast.Add()
+
+                    case "-":
+                        op = ast.Sub()
+
+                    case "*":  # pragma: no branch
+                        op = ast.Mult()
+
+                statements.append(
+                    ast.Assign(
+                        targets=[store(destination)],
+                        value=ast.BinOp(left=load(left), op=op, right=load(right)),
+                    )
                 )
-            ]
-
-        case Immediate(destination=destination, value=value, then=then):
-            return [
-                ast.Assign(targets=[store(destination)], value=ast.Constant(value=value)),
-                *_statement(then),
-            ]
-
-        case Primitive(destination=destination, operator=operator, left=left, right=right, then=then):
-            match operator:
-                case "+":
-                    op = ast.Add()
-
-                case "-":
-                    op = ast.Sub()
-
-                case "*":  # pragma: no branch
-                    op = ast.Mult()
-
-            return [
-                ast.Assign(
-                    targets=[store(destination)],
-                    value=ast.BinOp(left=load(left), op=op, right=load(right)),
-                ),
-                *_statement(then),
-            ]
-
-        case Branch(operator=operator, left=left, right=right, then=then, otherwise=otherwise):
-            match operator:
-                case "<":
-                    op = ast.Lt()
-
-                case "==":  # pragma: no branch
-                    op = ast.Eq()
-
-            return [
-                ast.If(
-                    ast.Compare(left=load(left), ops=[op], comparators=[load(right)]),
-                    body=_statement(then),
-                    orelse=_statement(otherwise),
-                ),
-            ]
-
-        case Allocate(destination=destination, count=count, then=then):
-            return [
-                ast.Assign(
-                    targets=[store(destination)],
-                    value=ast.List(
-                        elts=[ast.Constant(None) for _ in range(count)],
-                        ctx=ast.Load(),
-                    ),
-                ),
-                *_statement(then),
-            ]
-
-        case Load(destination=destination, base=base, index=index, then=then):
-            return [
-                ast.Assign(
-                    targets=[store(destination)],
-                    value=ast.Subscript(
-                        value=load(base),
-                        slice=ast.Constant(index),
-                        ctx=ast.Load(),
-                    ),
-                ),
-                *_statement(then),
-            ]
-
-        case Store(base=base, index=index, value=value, then=then):
-            return [
-                ast.Assign(
-                    targets=[
-                        ast.Subscript(
+
+            case Branch(operator=operator, left=left, right=right, then=then, otherwise=otherwise):
+                match operator:
+                    case "<":
+                        op = ast.Lt()
+
+                    case "==":  # pragma: no branch
+                        op = ast.Eq()
+
+                statements.append(
+                    ast.If(
+                        ast.Compare(left=load(left), ops=[op], comparators=[load(right)]),
+                        body=(yield _statement(then, loop=loop, calls=calls)),
+                        orelse=(yield _statement(otherwise, loop=loop, calls=calls)),
+                    )
+                )
+                return statements
+
+            case Allocate(destination=destination, count=count, then=then):
+                statements.append(
+                    ast.Assign(
+                        targets=[store(destination)],
+                        value=ast.List(
+                            elts=[ast.Constant(None) for _ in range(count)],
+                            ctx=ast.Load(),
+                        ),
+                    )
+                )
+
+            case Load(destination=destination, base=base, index=index, then=then):
+                statements.append(
+                    ast.Assign(
+                        targets=[store(destination)],
+                        value=ast.Subscript(
                             value=load(base),
                             slice=ast.Constant(index),
-                            ctx=ast.Store(),
-                        )
-                    ],
-                    value=load(value),
-                ),
-                *_statement(then),
-            ]
+                            ctx=ast.Load(),
+                        ),
+                    )
+                )
+
+            case Store(base=base, index=index, value=value, then=then):
+                statements.append(
+                    ast.Assign(
+                        targets=[
+                            ast.Subscript(
+                                value=load(base),
+                                slice=ast.Constant(index),
+                                ctx=ast.Store(),
+                            )
+                        ],
+                        value=load(value),
+                    )
+                )
 
-        case Halt(value=value):  # pragma: no branch
-            return [
-                ast.Return(value=load(value)),
-            ]
+            case Halt(value=value):
+                statements.append(ast.Return(value=load(value)))
+                return statements
 
+            case _:
+                raise TypeError(f"not an L1 statement: {type(statement)!r}")
 
-def to_ast_program(
+        statement = then
+
+
+def to_ast_function(
     program: Program,
-) -> str:
+    name: str = "l1",
+    trampoline: bool = False,
+) -> ast.FunctionDef:
     match program:
-        case Program(parameters=parameters, body=body):  # pragma: no branch
-            module = ast.Module(
+        case Program(parameters=parameters, body=body):
+            function = ast.FunctionDef(
+                name=name,
+                args=ast.arguments(args=[ast.arg(arg=parameter) for parameter in parameters]),
+                body=to_ast_statement(body, trampoline, binders(body) + Counter(parameters)),
+            )
+
+            if not trampoline:
+                return function
+
+            # Every call returns its target and arguments instead, and this loop makes the calls one after another
+            # so the stack stays flat. Nothing else the program returns is a tuple.
+            return ast.FunctionDef(
+                name=name,
+                args=ast.arguments(vararg=ast.arg(arg="arguments")),
                 body=[
-                    ast.FunctionDef(
-                        name="l1",
-                        args=ast.arguments(args=[ast.arg(arg=parameter) for parameter in parameters]),
-                        body=to_ast_statement(body),
+                    function,
+                    ast.Assign(
+                        targets=[ast.Name(id="result", ctx=ast.Store())],
+                        value=ast.Call(
+                            func=ast.Name(id=name, ctx=ast.Load()),
+                            args=[ast.Starred(value=ast.Name(id="arguments", ctx=ast.Load()), ctx=ast.Load())],
+                        ),
                     ),
+                    ast.While(
+                        test=ast.Compare(
+                            left=ast.Call(
+                                func=ast.Name(id="type", ctx=ast.Load()),
+                                args=[ast.Name(id="result", ctx=ast.Load())],
+                            ),
+                            ops=[ast.Is()],
+                            comparators=[ast.Name(id="tuple", ctx=ast.Load())],
+                        ),
+                        body=[
+                            ast.Assign(
+                                targets=[
+                                    ast.Tuple(
+                                        elts=[
+                                            ast.Name(id="target", ctx=ast.Store()),
+                                            ast.Name(id="arguments", ctx=ast.Store()),
+                                        ],
+                                        ctx=ast.Store(),
+                                    )
+                                ],
+                                value=ast.Name(id="result", ctx=ast.Load()),
+                            ),
+                            ast.Assign(
+                                targets=[ast.Name(id="result", ctx=ast.Store())],
+                                value=ast.Call(
+                                    func=ast.Name(id="target", ctx=ast.Load()),
+                                    args=[ast.Starred(value=ast.Name(id="arguments", ctx=ast.Load()), ctx=ast.Load())],
+                                ),
+                            ),
+                        ],
+                    ),
+                    ast.Return(value=ast.Name(id="result", ctx=ast.Load())),
+                ],
+            )
+
+        case _:
+            raise TypeError(f"not an L1 program: {type(program)!r}")
+
+
+def to_ast_module(
+    program: Program,
+    trampoline: bool = False,
+) -> ast.Module:
+    match program:
+        case Program(parameters=parameters):
+            module = ast.Module(
+                body=[
+                    to_ast_function(program, trampoline=trampoline),
                     ast.If(
                         test=ast.Compare(
                             left=ast.Name(id="__name__", ctx=ast.Load()),
@@ -197,6 +396,22 @@ def to_ast_program(
                 ]
             )
 
-            ast.fix_missing_locations(module)
+            return ast.fix_missing_locations(module)
+
+        case _:
+            raise TypeError(f"not an L1 program: {type(program)!r}")
+
 
-            return ast.unparse(module)
+def to_ast_program(
+    program: Program,
+    trampoline: bool = False,
+) -> str:
+    return ast.unparse(to_ast_module(program, trampoline))
+
+
+def to_pyc_program(
+    program: Program,
+    trampoline: bool = False,
+    filename: str = "<l1>",
+) -> bytes:
+    return to_pyc(to_ast_module(program, trampoline), filename)
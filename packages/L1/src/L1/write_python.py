@@ -0,0 +1,167 @@
+from collections import Counter
+from collections.abc import Collection, Sequence
+from functools import partial
+from typing import TextIO
+
+from util.encode import encode
+from util.trampoline import Steps, trampoline
+
+from .syntax import (
+    Abstract,
+    Allocate,
+    Apply,
+    Branch,
+    Copy,
+    Halt,
+    Immediate,
+    Load,
+    Primitive,
+    Program,
+    Statement,
+    Store,
+)
+from .to_python import binders, self_calls
+
+
+def parenthesized(names: Sequence[str]) -> str:
+    return f"({names[0]},)" if len(names) == 1 else f"({', '.join(names)})"
+
+
+@trampoline
+def write_statement(
+    statement: Statement,
+    output: TextIO,
+    indent: int = 1,
+    trampoline: bool = False,
+    bound: Counter[str] | None = None,
+    loop: Abstract | None = None,
+    calls: Collection[str] = (),
+) -> Steps[None]:
+    # Writes the source ast.unparse would for the tree to_ast_statement builds, a line at a time, so neither the tree nor
+    # the whole source is ever held in memory. Every line starts with its newline, since the def comes first.
+    bound = binders(statement) if bound is None else bound
+    _statement = partial(write_statement.steps, output=output, trampoline=trampoline, bound=bound)
+    line = "\n" + "    " * indent
+
+    while True:
+        match statement:
+            case Copy(destination=destination, source=source, then=then):
+                output.write(f"{line}{encode(destination)} = {encode(source)}")
+
+            case Abstract(destination=destination, parameters=parameters, body=body, then=then):
+                output.write(f"\n{line}def {encode(destination)}({', '.join(parameters)}):")
+                if calls := self_calls(statement, bound):
+                    output.write(f"{line}    while True:")
+                    yield _statement(body, indent=indent + 2, loop=statement, calls=calls)
+                else:
+                    yield _statement(body, indent=indent + 1)
+
+            case Apply(target=target, arguments=arguments):
+                if loop is not None and target in calls:
+                    rebound = [
+                        (parameter, argument)
+                        for parameter, argument in zip(loop.parameters, arguments)
+                        if parameter != argument
+                    ]
+                    by_name = target == loop.destination
+                    again = line if by_name else line + "    "
+                    if not by_name:
+                        output.write(f"{line}if {encode(target)} is {encode(loop.destination)}:")
+                    if rebound:
+                        targets = ", ".join(encode(parameter) for parameter, _ in rebound)
+                        values = parenthesized([encode(argument) for _, argument in rebound])
+                        output.write(f"{again}{targets}{',' if len(rebound) == 1 else ''} = {values}")
+                    output.write(f"{again}continue")
+
+                    if by_name:
+                        return
+
+                loaded = [encode(argument) for argument in arguments]
+                if trampoline:
+                    output.write(f"{line}return ({encode(target)}, {parenthesized(loaded)})")
+                else:
+                    output.write(f"{line}return {encode(target)}({', '.join(loaded)})")
+                return
+
+            case Immediate(destination=destination, value=value, then=then):
+                output.write(f"{line}{encode(destination)} = {value!r}")
+
+            case Primitive(destination=destination, operator=operator, left=left, right=right, then=then):
+                output.write(f"{line}{encode(destination)} = {encode(left)} {operator} {encode(right)}")
+
+            case Branch():
+                # A branch whose otherwise is another branch is written as elif, as ast.unparse does.
+                keyword = "if"
+                while isinstance(statement, Branch):
+                    left, right = encode(statement.left), encode(statement.right)
+                    output.write(f"{line}{keyword} {left} {statement.operator} {right}:")
+                    yield _statement(statement.then, indent=indent + 1, loop=loop, calls=calls)
+                    keyword = "elif"
+                    statement = statement.otherwise
+
+                output.write(f"{line}else:")
+                yield _statement(statement, indent=indent + 1, loop=loop, calls=calls)
+                return
+
+            case Allocate(destination=destination, count=count, then=then):
+                output.write(f"{line}{encode(destination)} = [{', '.join(['None'] * count)}]")
+
+            case Load(destination=destination, base=base, index=index, then=then):
+                output.write(f"{line}{encode(destination)} = {encode(base)}[{index!r}]")
+
+            case Store(base=base, index=index, value=value, then=then):
+                output.write(f"{line}{encode(base)}[{index!r}] = {encode(value)}")
+
+            case Halt(value=value):
+                output.write(f"{line}return {encode(value)}")
+                return
+
+            case _:
+                raise TypeError(f"not an L1 statement: {type(statement)!r}")
+
+        statement = then
+
+
+def write_function(
+    program: Program,
+    output: TextIO,
+    name: str = "l1",
+    trampoline: bool = False,
+) -> None:
+    match program:
+        case Program(parameters=parameters, body=body):
+            bound = binders(body) + Counter(parameters)
+
+            if not trampoline:
+                output.write(f"def {name}({', '.join(parameters)}):")
+                write_statement(body, output, 1, trampoline, bound)
+                return
+
+            # The driver loop of to_ast_function, around the program itself.
+            output.write(f"def {name}(*arguments):\n\n    def {name}({', '.join(parameters)}):")
+            write_statement(body, output, 2, trampoline, bound)
+            output.write(
+                f"\n    result = {name}(*arguments)"
+                "\n    while type(result) is tuple:"
+                "\n        target, arguments = result"
+                "\n        result = target(*arguments)"
+                "\n    return result"
+            )
+
+        case _:
+            raise TypeError(f"not an L1 program: {type(program)!r}")
+
+
+def write_program(
+    program: Program,
+    output: TextIO,
+    trampoline: bool = False,
+) -> None:
+    match program:
+        case Program(parameters=parameters):
+            write_function(program, output, trampoline=trampoline)
+            arguments = ", ".join(f"int(sys.argv[{i + 1}])" for i, _ in enumerate(parameters))
+            output.write(f"\nif __name__ == '__main__':\n    import sys\n    print(l1({arguments}))")
+
+        case _:
+            raise TypeError(f"not an L1 program: {type(program)!r}")
@@ -1,6 +1,6 @@
 from L0 import syntax as L0
 from L1 import syntax as L1
-from L1.close import close_program, close_statement, free_variables
+from L1.close import annotate, close_program, close_statement, free_variables
 from util.sequential_name_generator import SequentialNameGenerator
 
 
@@ -74,6 +74,28 @@ def test_free_variables_halt():
     assert free_variables(statement) == {"x"}
 
 
+# annotate tests
+
+
+def test_annotate_nested_abstracts():
+    inner = L1.Abstract(
+        destination="g",
+        parameters=["z"],
+        body=L1.Apply(target="b", arguments=["z", "a"]),
+        then=L1.Apply(target="g", arguments=["x"]),
+    )
+    outer = L1.Abstract(
+        destination="f",
+        parameters=["x"],
+        body=inner,
+        then=L1.Halt(value="f"),
+    )
+
+    closures: dict[int, list[str]] = {}
+    assert annotate(outer, closures) == {"a", "b"}
+    assert closures == {id(outer): ["a", "b"], id(inner): ["a", "b"]}
+
+
 # close_statement tests
 
 
@@ -372,3 +394,37 @@ def test_close_program_with_abstract():
         ],
     )
     assert actual == expected
+
+
+def test_close_statement_uses_closures():
+    statement = L1.Abstract(
+        destination="f",
+        parameters=[],
+        body=L1.Halt(value="y"),
+        then=L1.Halt(value="f"),
+    )
+
+    # The annotation decides what is captured, so an empty one captures nothing.
+    procedures: list[L0.Procedure] = []
+    actual = close_statement(statement, SequentialNameGenerator(), procedures, {id(statement): []})
+
+    assert isinstance(actual, L0.Allocate)
+    assert actual.count == 1
+    assert procedures[0].body == L0.Halt(value="y")
+
+
+def test_close_program_deep_abstract():
+    depth = 100_000
+    statement: L1.Statement = L1.Halt(value="x")
+    for _ in range(depth):
+        statement = L1.Abstract(destination="f", parameters=[], body=statement, then=L1.Halt(value="f"))
+
+    program = close_program(L1.Program(parameters=["x"], body=statement), SequentialNameGenerator())
+
+    # Every lambda captures x, which its procedure loads from the closure first.
+    *procedures, l0 = program.procedures
+    assert len(procedures) == depth
+    assert l0.name == "l0"
+    for procedure in procedures:
+        assert isinstance(procedure.body, L0.Load)
+        assert procedure.body.destination == "x"
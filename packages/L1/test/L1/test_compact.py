@@ -0,0 +1,125 @@
+import ast
+import io
+from collections import Counter
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from L0.to_python import to_ast_program
+from L1 import compact
+from L1.close import annotate, close_program, close_statement
+from L1.syntax import (
+    Abstract,
+    Allocate,
+    Apply,
+    Branch,
+    Copy,
+    Halt,
+    Immediate,
+    Load,
+    Primitive,
+    Program,
+    Store,
+)
+from L1.to_python import binders, self_calls, to_ast_function, to_ast_module, to_ast_statement
+from L1.write_python import write_function, write_program, write_statement
+from util.sequential_name_generator import SequentialNameGenerator
+
+PROGRAM = Program(
+    parameters=["x"],
+    body=Abstract(
+        destination="f",
+        parameters=["y", "k"],
+        body=Apply(target="k", arguments=["y"]),
+        then=Allocate(
+            destination="m",
+            count=1,
+            then=Store(
+                base="m",
+                index=0,
+                value="x",
+                then=Load(
+                    destination="v",
+                    base="m",
+                    index=0,
+                    then=Immediate(
+                        destination="i",
+                        value=1,
+                        then=Primitive(
+                            destination="s",
+                            operator="+",
+                            left="v",
+                            right="i",
+                            then=Branch(
+                                operator="==",
+                                left="s",
+                                right="x",
+                                then=Copy(destination="r", source="s", then=Halt(value="r")),
+                                otherwise=Halt(value="x"),
+                            ),
+                        ),
+                    ),
+                ),
+            ),
+        ),
+    ),
+)
+
+
+def test_compact_round_trip():
+    actual = compact.to_compact(PROGRAM)
+
+    match actual:
+        case compact.Program(parameters=("x",), body=compact.Abstract(destination="f", parameters=("y", "k"))):
+            pass
+
+        case _:  # pragma: no cover
+            raise AssertionError(actual)
+
+    assert compact.from_compact(actual) == PROGRAM
+
+
+def test_passes_match_compact():
+    program = compact.to_compact(PROGRAM)
+
+    # The closed L0 program mixes both representations, so it is compared as the module it is written to.
+    closed = close_program(program, SequentialNameGenerator())
+    assert to_ast_program(closed) == to_ast_program(close_program(PROGRAM, SequentialNameGenerator()))
+    assert ast.dump(to_ast_module(program)) == ast.dump(to_ast_module(PROGRAM))
+
+    written, expected = io.StringIO(), io.StringIO()
+    write_program(program, written)
+    write_program(PROGRAM, expected)
+    assert written.getvalue() == expected.getvalue()
+
+
+def test_new():
+    assert compact.new(Halt, value="x") == compact.Halt(value="x")
+    assert compact.new(Apply, target="k", arguments=["x"]) == compact.Apply(target="k", arguments=("x",))
+
+
+# Anything else falls through every case of a pass.
+UNKNOWN: Any = object()
+
+
+@pytest.mark.parametrize(
+    "run",
+    [
+        lambda: annotate(UNKNOWN, {}),
+        lambda: close_statement(UNKNOWN, SequentialNameGenerator(), [], {}),
+        lambda: close_program(UNKNOWN, SequentialNameGenerator()),
+        lambda: binders(UNKNOWN),
+        lambda: self_calls(
+            compact.Abstract(destination="f", parameters=("k",), body=UNKNOWN, then=UNKNOWN), Counter(f=1)
+        ),
+        lambda: to_ast_statement(UNKNOWN, bound=Counter()),
+        lambda: to_ast_function(UNKNOWN),
+        lambda: to_ast_module(UNKNOWN),
+        lambda: write_statement(UNKNOWN, io.StringIO(), bound=Counter()),
+        lambda: write_function(UNKNOWN, io.StringIO()),
+        lambda: write_program(UNKNOWN, io.StringIO()),
+    ],
+)
+def test_passes_reject_unknown(run: Callable[[], object]):
+    with pytest.raises(TypeError):
+        run()
@@ -0,0 +1,263 @@
+import ast
+import runpy
+import sys
+from pathlib import Path
+
+import pytest
+from L1.syntax import (
+    Abstract,
+    Allocate,
+    Apply,
+    Branch,
+    Copy,
+    Halt,
+    Immediate,
+    Load,
+    Primitive,
+    Program,
+    Statement,
+    Store,
+)
+from L1.to_python import to_ast_function, to_ast_program, to_ast_statement, to_pyc_program
+
+
+def run(directory: Path, program: Program, *arguments: int, trampoline: bool = False) -> int:
+    module = directory / "module.py"
+    module.write_text(to_ast_program(program, trampoline))
+    return runpy.run_path(str(module))["l1"](*arguments)
+
+
+def test_to_ast_program_arithmetic(tmp_path: Path):
+    program = Program(
+        parameters=["x", "y"],
+        body=Primitive(
+            destination="a",
+            operator="+",
+            left="x",
+            right="y",
+            then=Primitive(
+                destination="b",
+                operator="-",
+                left="a",
+                right="y",
+                then=Primitive(
+                    destination="c",
+                    operator="*",
+                    left="b",
+                    right="a",
+                    then=Copy(destination="d", source="c", then=Halt(value="d")),
+                ),
+            ),
+        ),
+    )
+
+    assert run(tmp_path, program, 2, 3) == 10
+
+
+def test_to_ast_program_branch(tmp_path: Path):
+    def branch(operator: str) -> Program:
+        return Program(
+            parameters=["x", "y"],
+            body=Branch(
+                operator=operator,  # pyright: ignore[reportArgumentType]
+                left="x",
+                right="y",
+                then=Immediate(destination="r", value=1, then=Halt(value="r")),
+                otherwise=Immediate(destination="r", value=0, then=Halt(value="r")),
+            ),
+        )
+
+    assert run(tmp_path, branch("<"), 1, 2) == 1
+    assert run(tmp_path, branch("<"), 2, 1) == 0
+    assert run(tmp_path, branch("=="), 2, 2) == 1
+    assert run(tmp_path, branch("=="), 2, 1) == 0
+
+
+@pytest.mark.parametrize("trampoline", [False, True])
+def test_to_ast_program_memory_and_functions(tmp_path: Path, trampoline: bool):
+    program = Program(
+        parameters=["x"],
+        body=Allocate(
+            destination="m",
+            count=1,
+            then=Store(
+                base="m",
+                index=0,
+                value="x",
+                then=Abstract(
+                    destination="f",
+                    parameters=["k"],
+                    body=Load(destination="v", base="m", index=0, then=Halt(value="v")),
+                    then=Immediate(destination="z", value=0, then=Apply(target="f", arguments=["z"])),
+                ),
+            ),
+        ),
+    )
+
+    assert run(tmp_path, program, 7, trampoline=trampoline) == 7
+
+
+def test_to_ast_function_name():
+    program = Program(parameters=[], body=Immediate(destination="r", value=1, then=Halt(value="r")))
+
+    function = to_ast_function(program, "program_0")
+
+    assert function.name == "program_0"
+
+
+def test_to_ast_statement_deep(tmp_path: Path):
+    depth = 100_000
+    statement: Statement = Halt(value="x")
+    for _ in range(depth):
+        statement = Primitive(destination="x", operator="+", left="x", right="y", then=statement)
+
+    assert len(to_ast_statement(statement)) == depth + 1
+    assert run(tmp_path, Program(parameters=["x", "y"], body=statement), 1, 2) == 1 + 2 * depth
+
+
+def count_down(call: Statement) -> Abstract:
+    # f(i, k) counts i down to zero, making call with j = i - 1 to go round again.
+    return Abstract(
+        destination="f",
+        parameters=["i", "k"],
+        body=Branch(
+            operator="==",
+            left="i",
+            right="zero",
+            then=Apply(target="k", arguments=["i"]),
+            otherwise=Primitive(destination="j", operator="-", left="i", right="one", then=call),
+        ),
+        then=Abstract(
+            destination="k",
+            parameters=["r"],
+            body=Halt(value="r"),
+            then=Apply(target="f", arguments=["n", "k"]),
+        ),
+    )
+
+
+def loops(statements: list[ast.stmt]) -> bool:
+    return any(isinstance(node, ast.While) for statement in statements for node in ast.walk(statement))
+
+
+@pytest.mark.parametrize("trampoline", [False, True])
+def test_to_ast_program_self_tail_call_through_box(tmp_path: Path, trampoline: bool):
+    f = count_down(
+        Load(destination="g", base="box", index=0, then=Apply(target="g", arguments=["j", "k"])),
+    )
+    program = Program(
+        parameters=["n"],
+        body=Immediate(
+            destination="zero",
+            value=0,
+            then=Immediate(
+                destination="one",
+                value=1,
+                then=Allocate(
+                    destination="box",
+                    count=1,
+                    then=f.model_copy(update={"then": Store(base="box", index=0, value="f", then=f.then)}),
+                ),
+            ),
+        ),
+    )
+
+    assert loops(to_ast_function(program).body)
+    assert run(tmp_path, program, 100_000, trampoline=trampoline) == 0
+
+
+def test_to_ast_program_self_tail_call_by_name(tmp_path: Path):
+    # The count lives in memory, so the call passes on the same continuation and nothing is rebound.
+    program = Program(
+        parameters=["n"],
+        body=Immediate(
+            destination="zero",
+            value=0,
+            then=Immediate(
+                destination="one",
+                value=1,
+                then=Allocate(
+                    destination="m",
+                    count=1,
+                    then=Store(
+                        base="m",
+                        index=0,
+                        value="n",
+                        then=Abstract(
+                            destination="f",
+                            parameters=["k"],
+                            body=Load(
+                                destination="c",
+                                base="m",
+                                index=0,
+                                then=Branch(
+                                    operator="==",
+                                    left="c",
+                                    right="zero",
+                                    then=Apply(target="k", arguments=["c"]),
+                                    otherwise=Primitive(
+                                        destination="d",
+                                        operator="-",
+                                        left="c",
+                                        right="one",
+                                        then=Store(
+                                            base="m", index=0, value="d", then=Apply(target="f", arguments=["k"])
+                                        ),
+                                    ),
+                                ),
+                            ),
+                            then=Abstract(
+                                destination="h",
+                                parameters=["r"],
+                                body=Halt(value="r"),
+                                then=Apply(target="f", arguments=["h"]),
+                            ),
+                        ),
+                    ),
+                ),
+            ),
+        ),
+    )
+
+    assert loops(to_ast_function(program).body)
+    assert run(tmp_path, program, 100_000) == 0
+
+
+def test_to_ast_statement_self_tail_call_unsafe():
+    # Once f is rebound its name may mean another function, and a function defined in the body would see the
+    # variables of a later iteration.
+    rebound = count_down(Apply(target="f", arguments=["j", "k"]))
+    rebound = rebound.model_copy(update={"then": Copy(destination="f", source="k", then=rebound.then)})
+    closes = count_down(
+        Abstract(
+            destination="c",
+            parameters=["x"],
+            body=Copy(destination="y", source="i", then=Halt(value="y")),
+            then=Apply(target="f", arguments=["j", "c"]),
+        )
+    )
+
+    assert not loops(to_ast_statement(rebound))
+    assert not loops(to_ast_statement(closes))
+
+
+@pytest.mark.parametrize("trampoline", [False, True])
+def test_to_pyc_program(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    tmp_path: Path,
+    trampoline: bool,
+):
+    program = Program(
+        parameters=["x", "y"],
+        body=Primitive(destination="z", operator="*", left="x", right="y", then=Halt(value="z")),
+    )
+    module = tmp_path / "module.pyc"
+    module.write_bytes(to_pyc_program(program, trampoline, str(module)))
+
+    assert runpy.run_path(str(module))["l1"](6, 7) == 42
+
+    monkeypatch.setattr(sys, "argv", [str(module), "6", "7"])
+    runpy.run_path(str(module), run_name="__main__")
+
+    assert capsys.readouterr().out == "42\n"
@@ -0,0 +1,187 @@
+import ast
+import io
+
+import pytest
+from L1.syntax import (
+    Abstract,
+    Allocate,
+    Apply,
+    Branch,
+    Copy,
+    Halt,
+    Immediate,
+    Load,
+    Primitive,
+    Program,
+    Statement,
+    Store,
+)
+from L1.to_python import to_ast_function, to_ast_program
+from L1.write_python import write_function, write_program, write_statement
+
+
+def loop(call: Statement) -> Statement:
+    # f(i, acc, k) adds i down to zero into acc, making call with j = i - 1 and s = acc + i to go round again.
+    return Abstract(
+        destination="f",
+        parameters=["i", "acc", "k"],
+        body=Branch(
+            operator="==",
+            left="i",
+            right="zero",
+            then=Apply(target="k", arguments=["acc"]),
+            otherwise=Primitive(
+                destination="j",
+                operator="-",
+                left="i",
+                right="one",
+                then=Primitive(destination="s", operator="+", left="acc", right="i", then=call),
+            ),
+        ),
+        then=Store(
+            base="box",
+            index=0,
+            value="f",
+            then=Abstract(
+                destination="k",
+                parameters=["r"],
+                body=Halt(value="r"),
+                then=Apply(target="f", arguments=["n", "zero", "k"]),
+            ),
+        ),
+    )
+
+
+def constants(then: Statement) -> Statement:
+    return Immediate(
+        destination="zero",
+        value=0,
+        then=Immediate(destination="one", value=1, then=Allocate(destination="box", count=1, then=then)),
+    )
+
+
+PROGRAMS = [
+    Program(
+        parameters=["x", "y"],
+        body=Primitive(
+            destination="a",
+            operator="+",
+            left="x",
+            right="y",
+            then=Primitive(
+                destination="b",
+                operator="-",
+                left="a",
+                right="y",
+                then=Primitive(
+                    destination="c",
+                    operator="*",
+                    left="b",
+                    right="a",
+                    then=Immediate(
+                        destination="d", value=-1, then=Copy(destination="e", source="c", then=Halt(value="e"))
+                    ),
+                ),
+            ),
+        ),
+    ),
+    Program(
+        parameters=["x", "y"],
+        body=Branch(
+            operator="<",
+            left="x",
+            right="y",
+            then=Halt(value="x"),
+            otherwise=Branch(
+                operator="==",
+                left="x",
+                right="y",
+                then=Halt(value="y"),
+                otherwise=Branch(
+                    operator="<",
+                    left="y",
+                    right="x",
+                    then=Branch(operator="==", left="x", right="x", then=Halt(value="x"), otherwise=Halt(value="y")),
+                    otherwise=Halt(value="y"),
+                ),
+            ),
+        ),
+    ),
+    Program(
+        parameters=[],
+        body=Allocate(
+            destination="m",
+            count=3,
+            then=Allocate(
+                destination="e",
+                count=0,
+                then=Immediate(
+                    destination="x",
+                    value=7,
+                    then=Store(
+                        base="m",
+                        index=2,
+                        value="x",
+                        then=Abstract(
+                            destination="f",
+                            parameters=[],
+                            body=Load(destination="v", base="m", index=2, then=Halt(value="v")),
+                            then=Abstract(
+                                destination="g",
+                                parameters=["a"],
+                                body=Apply(target="f", arguments=[]),
+                                then=Apply(target="g", arguments=["x"]),
+                            ),
+                        ),
+                    ),
+                ),
+            ),
+        ),
+    ),
+    Program(
+        parameters=["n"],
+        body=constants(
+            loop(Load(destination="g", base="box", index=0, then=Apply(target="g", arguments=["j", "s", "k"])))
+        ),
+    ),
+    Program(
+        parameters=["n"],
+        body=constants(loop(Apply(target="f", arguments=["j", "acc", "k"]))),
+    ),
+    Program(
+        parameters=["n"],
+        body=constants(loop(Apply(target="f", arguments=["i", "acc", "k"]))),
+    ),
+]
+
+
+@pytest.mark.parametrize("trampoline", [False, True])
+@pytest.mark.parametrize("program", PROGRAMS)
+def test_write_program(program: Program, trampoline: bool):
+    output = io.StringIO()
+    write_program(program, output, trampoline)
+
+    assert output.getvalue() == to_ast_program(program, trampoline)
+
+
+@pytest.mark.parametrize("trampoline", [False, True])
+def test_write_function(trampoline: bool):
+    output = io.StringIO()
+    write_function(PROGRAMS[3], output, "program_0", trampoline)
+
+    expected = ast.unparse(
+        ast.fix_missing_locations(ast.Module(body=[to_ast_function(PROGRAMS[3], "program_0", trampoline)]))
+    )
+    assert output.getvalue() == expected
+
+
+def test_write_statement_deep():
+    depth = 100_000
+    statement: Statement = Halt(value="x")
+    for _ in range(depth):
+        statement = Primitive(destination="x", operator="+", left="x", right="y", then=statement)
+
+    output = io.StringIO()
+    write_statement(statement, output)
+
+    assert output.getvalue().count("\n") == depth + 1
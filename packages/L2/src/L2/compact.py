@@ -0,0 +1,121 @@
+from dataclasses import dataclass
+from typing import ClassVar, Literal
+
+from util.compact import Converter
+
+from . import syntax
+
+
+@dataclass(frozen=True, slots=True)
+class Program:
+    tag: ClassVar[Literal["l2"]] = "l2"
+    parameters: tuple[str, ...]
+    body: Term
+
+
+type Term = Let | Reference | Abstract | Apply | Immediate | Primitive | Branch | Allocate | Load | Store | Begin
+
+
+@dataclass(frozen=True, slots=True)
+class Let:
+    tag: ClassVar[Literal["let"]] = "let"
+    bindings: tuple[tuple[str, Term], ...]
+    body: Term
+
+
+@dataclass(frozen=True, slots=True)
+class Reference:
+    tag: ClassVar[Literal["reference"]] = "reference"
+    name: str
+
+
+@dataclass(frozen=True, slots=True)
+class Abstract:
+    tag: ClassVar[Literal["abstract"]] = "abstract"
+    parameters: tuple[str, ...]
+    body: Term
+
+
+@dataclass(frozen=True, slots=True)
+class Apply:
+    tag: ClassVar[Literal["apply"]] = "apply"
+    target: Term
+    arguments: tuple[Term, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class Immediate:
+    tag: ClassVar[Literal["immediate"]] = "immediate"
+    value: int
+
+
+@dataclass(frozen=True, slots=True)
+class Primitive:
+    tag: ClassVar[Literal["primitive"]] = "primitive"
+    operator: Literal["+", "-", "*"]
+    left: Term
+    right: Term
+
+
+@dataclass(frozen=True, slots=True)
+class Branch:
+    tag: ClassVar[Literal["branch"]] = "branch"
+    operator: Literal["<", "=="]
+    left: Term
+    right: Term
+    consequent: Term
+    otherwise: Term
+
+
+@dataclass(frozen=True, slots=True)
+class Allocate:
+    tag: ClassVar[Literal["allocate"]] = "allocate"
+    count: int
+
+
+@dataclass(frozen=True, slots=True)
+class Load:
+    tag: ClassVar[Literal["load"]] = "load"
+    base: Term
+    index: int
+
+
+@dataclass(frozen=True, slots=True)
+class Store:
+    tag: ClassVar[Literal["store"]] = "store"
+    base: Term
+    index: int
+    value: Term
+
+
+@dataclass(frozen=True, slots=True)
+class Begin:
+    tag: ClassVar[Literal["begin"]] = "begin"
+    effects: tuple[Term, ...]
+    value: Term
+
+
+_converter = Converter(
+    {
+        syntax.Program: Program,
+        syntax.Let: Let,
+        syntax.Reference: Reference,
+        syntax.Abstract: Abstract,
+        syntax.Apply: Apply,
+        syntax.Immediate: Immediate,
+        syntax.Primitive: Primitive,
+        syntax.Branch: Branch,
+        syntax.Allocate: Allocate,
+        syntax.Load: Load,
+        syntax.Store: Store,
+        syntax.Begin: Begin,
+    }
+)
+
+
+def to_compact(program: syntax.Program) -> Program:
+    return _converter.to_compact(program)
+
+
+def from_compact(program: Program) -> syntax.Program:
+    return _converter.from_compact(program)
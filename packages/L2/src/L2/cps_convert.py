@@ -1,158 +1,217 @@
 from collections.abc import Callable, Sequence
 from functools import partial
+from typing import Any
 
 from L1 import syntax as L1
+from util.trampoline import Steps, trampoline
+from util.trusted import trusted
 
 from L2 import syntax as L2
 
+# A continuation builds the statement that uses an identifier. It either returns that statement or, to convert more
+# terms on the way, is a generator of steps (see util.trampoline).
+type Continuation[T] = Callable[[T], L1.Statement | Steps[L1.Statement]]
 
+# A term in tail position continues to a dynamic continuation, the name of a continuation variable in the output.
+# Passing that name on instead of wrapping it in a static continuation keeps calls from allocating a new one.
+type Target = Continuation[L1.Identifier] | L1.Identifier
+
+
+def resume(
+    k: Target,
+    value: L1.Identifier,
+    new: Callable[..., Any] = trusted,
+) -> L1.Statement | Steps[L1.Statement]:
+    if isinstance(k, str):
+        return new(L1.Apply, target=k, arguments=[value])
+    return k(value)
+
+
+@trampoline
 def cps_convert_term(
     term: L2.Term,
-    k: Callable[[L1.Identifier], L1.Statement],
+    k: Target,
     fresh: Callable[[str], str],
-) -> L1.Statement:
-    _term = partial(cps_convert_term, fresh=fresh)
-    _terms = partial(cps_convert_terms, fresh=fresh)
+    new: Callable[..., Any] = trusted,
+) -> Steps[L1.Statement]:
+    _term = partial(cps_convert_term.steps, fresh=fresh, new=new)
+    _terms = partial(cps_convert_terms.steps, fresh=fresh, new=new)
+    _resume = partial(resume, new=new)
 
     match term:
         case L2.Let(bindings=bindings, body=body):
-            match list(bindings):
-                case []:
-                    return _term(body, k)
-                case [(name, value), *rest]:  # pragma: no branch
-                    return _term(
-                        value,
-                        lambda v, name=name, rest=rest: L1.Copy(
-                            destination=name,
-                            source=v,
-                            then=cps_convert_term(L2.Let(bindings=rest, body=body), k, fresh),
-                        ),
-                    )
+
+            def bind(index: int) -> Steps[L1.Statement]:
+                if index == len(bindings):
+                    return (yield _term(body, k))
+
+                name, value = bindings[index]
+
+                def then(v: L1.Identifier) -> Steps[L1.Statement]:
+                    return new(L1.Copy, destination=name, source=v, then=(yield bind(index + 1)))
+
+                return (yield _term(value, then))
+
+            return (yield bind(0))
 
         case L2.Reference(name=name):
-            return k(name)
+            return (yield _resume(k, name))
 
         case L2.Abstract(parameters=parameters, body=body):
             t = fresh("t")
             k_param = fresh("k")
-            return L1.Abstract(
+            return new(
+                L1.Abstract,
                 destination=t,
                 parameters=[*parameters, k_param],
-                body=_term(body, lambda v: L1.Apply(target=k_param, arguments=[v])),
-                then=k(t),
+                body=(yield _term(body, k_param)),
+                then=(yield _resume(k, t)),
             )
 
         case L2.Apply(target=target, arguments=arguments):
+            if isinstance(k, str):
+
+                def tail_call(aids: Sequence[L1.Identifier], tid: L1.Identifier) -> L1.Statement:
+                    return new(L1.Apply, target=tid, arguments=[*aids, k])
+
+                return (yield _term(target, lambda tid: _terms(arguments, lambda aids: tail_call(aids, tid))))
+
             k_name = fresh("k")
             t = fresh("t")
-            return _term(
-                target,
-                lambda tid: _terms(
-                    arguments,
-                    lambda aids: L1.Abstract(
-                        destination=k_name,
-                        parameters=[t],
-                        body=k(t),
-                        then=L1.Apply(target=tid, arguments=[*aids, k_name]),
-                    ),
-                ),
-            )
+
+            def call(aids: Sequence[L1.Identifier], tid: L1.Identifier) -> Steps[L1.Statement]:
+                return new(
+                    L1.Abstract,
+                    destination=k_name,
+                    parameters=[t],
+                    body=(yield k(t)),
+                    then=new(L1.Apply, target=tid, arguments=[*aids, k_name]),
+                )
+
+            return (yield _term(target, lambda tid: _terms(arguments, lambda aids: call(aids, tid))))
 
         case L2.Immediate(value=value):
             t = fresh("t")
-            return L1.Immediate(destination=t, value=value, then=k(t))
+            return new(L1.Immediate, destination=t, value=value, then=(yield _resume(k, t)))
 
         case L2.Primitive(operator=operator, left=left, right=right):
             t = fresh("t")
-            return _terms(
-                [left, right],
-                lambda ids: L1.Primitive(
+
+            def primitive(ids: Sequence[L1.Identifier]) -> Steps[L1.Statement]:
+                return new(
+                    L1.Primitive,
                     destination=t,
                     operator=operator,
                     left=ids[0],
                     right=ids[1],
-                    then=k(t),
-                ),
-            )
+                    then=(yield _resume(k, t)),
+                )
+
+            return (yield _terms([left, right], primitive))
 
         case L2.Branch(operator=operator, left=left, right=right, consequent=consequent, otherwise=otherwise):
+
+            def branch(ids: Sequence[L1.Identifier], join: L1.Identifier) -> Steps[L1.Statement]:
+                return new(
+                    L1.Branch,
+                    operator=operator,
+                    left=ids[0],
+                    right=ids[1],
+                    then=(yield _term(consequent, join)),
+                    otherwise=(yield _term(otherwise, join)),
+                )
+
+            # Both arms continue to k, so a dynamic k joins them already.
+            if isinstance(k, str):
+                return (yield _terms([left, right], lambda ids: branch(ids, k)))
+
             j = fresh("j")
             t = fresh("t")
 
-            def join_k(v: L1.Identifier) -> L1.Statement:
-                return L1.Apply(target=j, arguments=[v])
-
-            return _terms(
-                [left, right],
-                lambda ids: L1.Abstract(
+            def join_point(ids: Sequence[L1.Identifier]) -> Steps[L1.Statement]:
+                return new(
+                    L1.Abstract,
                     destination=j,
                     parameters=[t],
-                    body=k(t),
-                    then=L1.Branch(
-                        operator=operator,
-                        left=ids[0],
-                        right=ids[1],
-                        then=_term(consequent, join_k),
-                        otherwise=_term(otherwise, join_k),
-                    ),
-                ),
-            )
+                    body=(yield k(t)),
+                    then=(yield branch(ids, j)),
+                )
+
+            return (yield _terms([left, right], join_point))
 
         case L2.Allocate(count=count):
             t = fresh("t")
-            return L1.Allocate(destination=t, count=count, then=k(t))
+            return new(L1.Allocate, destination=t, count=count, then=(yield _resume(k, t)))
 
         case L2.Load(base=base, index=index):
             t = fresh("t")
-            return _term(
-                base,
-                lambda bid: L1.Load(destination=t, base=bid, index=index, then=k(t)),
-            )
+
+            def load(bid: L1.Identifier) -> Steps[L1.Statement]:
+                return new(L1.Load, destination=t, base=bid, index=index, then=(yield _resume(k, t)))
+
+            return (yield _term(base, load))
 
         case L2.Store(base=base, index=index, value=value):
             t = fresh("t")
-            return _terms(
-                [base, value],
-                lambda ids: L1.Store(
+
+            def store(ids: Sequence[L1.Identifier]) -> Steps[L1.Statement]:
+                return new(
+                    L1.Store,
                     base=ids[0],
                     index=index,
                     value=ids[1],
-                    then=L1.Immediate(destination=t, value=0, then=k(t)),
-                ),
-            )
+                    then=new(L1.Immediate, destination=t, value=0, then=(yield _resume(k, t))),
+                )
 
-        case L2.Begin(effects=effects, value=value):  # pragma: no branch
-            return _terms([*effects, value], lambda ids: k(ids[-1]))
+            return (yield _terms([base, value], store))
 
+        case L2.Begin(effects=effects, value=value):
+            # The value is in tail position, so it goes on to k itself, and a loop that ends a begin by calling
+            # itself keeps passing the same continuation.
+            return (yield _terms(effects, lambda _: _term(value, k)))
 
+        case _:
+            raise TypeError(f"not an L2 term: {type(term)!r}")
+
+
+@trampoline
 def cps_convert_terms(
     terms: Sequence[L2.Term],
-    k: Callable[[Sequence[L1.Identifier]], L1.Statement],
+    k: Continuation[Sequence[L1.Identifier]],
     fresh: Callable[[str], str],
-) -> L1.Statement:
-    _term = partial(cps_convert_term, fresh=fresh)
-    _terms = partial(cps_convert_terms, fresh=fresh)
+    new: Callable[..., Any] = trusted,
+) -> Steps[L1.Statement]:
+    # Every continuation runs exactly once, so each term can append its identifier to the same list.
+    ids: list[L1.Identifier] = []
 
-    match terms:
-        case []:
-            return k([])
+    def convert(index: int) -> Steps[L1.Statement]:
+        if index == len(terms):
+            return (yield k(ids))
 
-        case [first, *rest]:
-            return _term(first, lambda first: _terms(rest, lambda rest: k([first, *rest])))
+        def then(v: L1.Identifier) -> Steps[L1.Statement]:
+            ids.append(v)
+            return (yield convert(index + 1))
 
-        case _:  # pragma: no cover
-            raise ValueError(terms)
+        return (yield cps_convert_term.steps(terms[index], then, fresh, new))
+
+    return (yield convert(0))
 
 
 def cps_convert_program(
     program: L2.Program,
     fresh: Callable[[str], str],
+    new: Callable[..., Any] = trusted,
 ) -> L1.Program:
-    _term = partial(cps_convert_term, fresh=fresh)
+    # new builds every L1 node, util.trusted by default. L1.compact.new keeps a large output compact.
+    _term = partial(cps_convert_term, fresh=fresh, new=new)
 
     match program:
-        case L2.Program(parameters=parameters, body=body):  # pragma: no branch
-            return L1.Program(
+        case L2.Program(parameters=parameters, body=body):
+            return new(
+                L1.Program,
                 parameters=parameters,
-                body=_term(body, lambda value: L1.Halt(value=value)),
+                body=_term(body, lambda value: new(L1.Halt, value=value)),
             )
+
+        case _:
+            raise TypeError(f"not an L2 program: {type(program)!r}")
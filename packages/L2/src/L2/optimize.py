@@ -1,5 +1,12 @@
-from collections.abc import Mapping
+from collections.abc import Callable, Mapping
 from functools import partial
+from operator import is_
+from typing import Any
+
+from util.interner import Interner
+from util.persistent_map import extend, remove
+from util.trampoline import Steps, each, trampoline
+from util.trusted import trusted
 
 from .syntax import (
     Abstract,
@@ -19,57 +26,108 @@ from .syntax import (
 )
 
 type Environment = Mapping[Identifier, Immediate | Reference]
+type Free = dict[int, frozenset[Identifier]]
+
+
+class Settled:
+    # Nodes that came back unchanged from a round, with the bindings of their free variables at the time, and the free
+    # variables of every node seen, which dead-binding elimination shares. Both maps are keyed by identity, so every
+    # node has to outlive them (optimize_program builds its nodes with one interner).
+    __slots__ = ("free", "nodes")
+
+    def __init__(self) -> None:
+        self.free: Free = {}
+        self.nodes: dict[int, tuple[int, ...]] = {}
+
 
+@trampoline
+def free_variables(
+    term: Term,
+    cache: Free | None = None,
+) -> Steps[frozenset[Identifier]]:
+    if cache is not None and (cached := cache.get(id(term))) is not None:
+        return cached
+
+    recur = partial(free_variables.steps, cache=cache)
 
-def free_variables(term: Term) -> set[str]:
     match term:
         case Immediate() | Allocate():
-            return set()
+            free = frozenset[Identifier]()
 
         case Reference(name=name):
-            return {name}
+            free = frozenset([name])
 
         case Let(bindings=bindings, body=body):
-            free: set[str] = set()
-            bound: set[str] = set()
+            free = frozenset[Identifier]()
+            bound: set[Identifier] = set()
             for name, value in bindings:
-                free |= free_variables(value) - bound
+                free |= (yield recur(value)) - bound
                 bound.add(name)
-            return free | (free_variables(body) - bound)
+            free |= (yield recur(body)) - bound
 
         case Abstract(parameters=parameters, body=body):
-            return free_variables(body) - set(parameters)
+            free = (yield recur(body)) - set(parameters)
 
         case Apply(target=target, arguments=arguments):
-            result = free_variables(target)
-            for arg in arguments:
-                result |= free_variables(arg)
-            return result
+            free = (yield recur(target)).union(*(yield each(recur(arg) for arg in arguments)))
 
         case Primitive(left=left, right=right):
-            return free_variables(left) | free_variables(right)
+            free = (yield recur(left)) | (yield recur(right))
 
         case Branch(left=left, right=right, consequent=consequent, otherwise=otherwise):
-            return free_variables(left) | free_variables(right) | free_variables(consequent) | free_variables(otherwise)
+            free = (yield recur(left)) | (yield recur(right)) | (yield recur(consequent)) | (yield recur(otherwise))
 
         case Load(base=base):
-            return free_variables(base)
+            free = yield recur(base)
 
         case Store(base=base, value=value):
-            return free_variables(base) | free_variables(value)
+            free = (yield recur(base)) | (yield recur(value))
+
+        case Begin(effects=effects, value=value):
+            free = (yield recur(value)).union(*(yield each(recur(effect) for effect in effects)))
 
-        case Begin(effects=effects, value=value):  # pragma: no branch
-            result = free_variables(value)
-            for effect in effects:
-                result |= free_variables(effect)
-            return result
+        case _:
+            raise TypeError(f"not an L2 term: {type(term)!r}")
 
+    if cache is not None:
+        cache[id(term)] = free
+    return free
 
+
+@trampoline
 def optimize_term(
     term: Term,
     env: Environment,
-) -> Term:
-    recur = partial(optimize_term, env=env)
+    new: Callable[..., Any] = trusted,
+    settled: Settled | None = None,
+) -> Steps[Term]:
+    # Leaves are rewritten in constant time, so only the nodes above them are worth remembering.
+    if settled is None or type(term) in (Immediate, Reference, Allocate):
+        return (yield rewrite_term(term, env, new, settled))
+
+    # A node that came back unchanged comes back unchanged again while its free variables are bound as they were. Its
+    # children came back unchanged too, so their free variables are cached already.
+    bound = settled.nodes.get(id(term))
+    if bound is not None:
+        free = yield free_variables.steps(term, settled.free)
+        if bound == tuple([id(env.get(name)) for name in free]):
+            return term
+
+    optimized = yield rewrite_term(term, env, new, settled)
+    if optimized is term:
+        free = yield free_variables.steps(term, settled.free)
+        settled.nodes[id(term)] = tuple([id(env.get(name)) for name in free])
+    return optimized
+
+
+def rewrite_term(
+    term: Term,
+    env: Environment,
+    new: Callable[..., Any],
+    settled: Settled | None,
+) -> Steps[Term]:
+    # Returns term itself exactly when nothing in it was rewritten.
+    recur = partial(optimize_term.steps, env=env, new=new, settled=settled)
 
     match term:
         case Immediate():
@@ -81,64 +139,81 @@ def optimize_term(
             return term
 
         case Let(bindings=bindings, body=body):
-            new_env = dict(env)
+            new_env = env
             new_bindings: list[tuple[str, Term]] = []
 
             for name, value in bindings:
-                opt_value = optimize_term(value, new_env)
+                opt_value = yield optimize_term.steps(value, new_env, new, settled)
                 match opt_value:
                     case Immediate() | Reference():
-                        new_env[name] = opt_value
+                        new_env = extend(new_env, {name: opt_value})
                     case _:
                         pass
                 new_bindings.append((name, opt_value))
 
-            opt_body = optimize_term(body, new_env)
+            opt_body = yield optimize_term.steps(body, new_env, new, settled)
 
-            used = free_variables(opt_body)
+            # Cached, each of these is a union over the children instead of a walk over the whole subtree.
+            cache = None if settled is None else settled.free
+            used = yield free_variables.steps(opt_body, cache)
             kept: list[tuple[str, Term]] = []
             for name, value in reversed(new_bindings):
                 if name in used:
                     kept.append((name, value))
-                    used |= free_variables(value)
+                    used |= yield free_variables.steps(value, cache)
             kept.reverse()
 
             if not kept:
                 return opt_body
 
-            return Let(bindings=kept, body=opt_body)
+            if (
+                opt_body is body
+                and len(kept) == len(bindings)
+                and all(value is old for (_, value), (_, old) in zip(kept, bindings, strict=True))
+            ):
+                return term
+
+            return new(Let, bindings=kept, body=opt_body)
 
         case Abstract(parameters=parameters, body=body):
-            inner_env = {k: v for k, v in env.items() if k not in set(parameters)}
-            return Abstract(
-                parameters=parameters,
-                body=optimize_term(body, inner_env),
-            )
+            inner_env = remove(env, parameters)
+            opt_body = yield optimize_term.steps(body, inner_env, new, settled)
+
+            if opt_body is body:
+                return term
+
+            return new(Abstract, parameters=parameters, body=opt_body)
 
         case Apply(target=target, arguments=arguments):
-            return Apply(
-                target=recur(target),
-                arguments=[recur(arg) for arg in arguments],
-            )
+            opt_target = yield recur(target)
+            opt_arguments = yield each(recur(arg) for arg in arguments)
+
+            if opt_target is target and all(map(is_, opt_arguments, arguments)):
+                return term
+
+            return new(Apply, target=opt_target, arguments=opt_arguments)
 
         case Primitive(operator=operator, left=left, right=right):
-            opt_left = recur(left)
-            opt_right = recur(right)
+            opt_left = yield recur(left)
+            opt_right = yield recur(right)
 
             if isinstance(opt_left, Immediate) and isinstance(opt_right, Immediate):
                 match operator:
                     case "+":
-                        return Immediate(value=opt_left.value + opt_right.value)
+                        return new(Immediate, value=opt_left.value + opt_right.value)
                     case "-":
-                        return Immediate(value=opt_left.value - opt_right.value)
+                        return new(Immediate, value=opt_left.value - opt_right.value)
                     case "*":  # pragma: no branch
-                        return Immediate(value=opt_left.value * opt_right.value)
+                        return new(Immediate, value=opt_left.value * opt_right.value)
 
-            return Primitive(operator=operator, left=opt_left, right=opt_right)
+            if opt_left is left and opt_right is right:
+                return term
+
+            return new(Primitive, operator=operator, left=opt_left, right=opt_right)
 
         case Branch(operator=operator, left=left, right=right, consequent=consequent, otherwise=otherwise):
-            opt_left = recur(left)
-            opt_right = recur(right)
+            opt_left = yield recur(left)
+            opt_right = yield recur(right)
 
             if isinstance(opt_left, Immediate) and isinstance(opt_right, Immediate):
                 match operator:
@@ -148,50 +223,83 @@ def optimize_term(
                         condition = opt_left.value == opt_right.value
 
                 if condition:
-                    return recur(consequent)
-                return recur(otherwise)
+                    return (yield recur(consequent))
+                return (yield recur(otherwise))
+
+            opt_consequent = yield recur(consequent)
+            opt_otherwise = yield recur(otherwise)
 
-            return Branch(
+            if opt_left is left and opt_right is right and opt_consequent is consequent and opt_otherwise is otherwise:
+                return term
+
+            return new(
+                Branch,
                 operator=operator,
                 left=opt_left,
                 right=opt_right,
-                consequent=recur(consequent),
-                otherwise=recur(otherwise),
+                consequent=opt_consequent,
+                otherwise=opt_otherwise,
             )
 
         case Allocate():
             return term
 
         case Load(base=base, index=index):
-            return Load(base=recur(base), index=index)
+            opt_base = yield recur(base)
+
+            if opt_base is base:
+                return term
+
+            return new(Load, base=opt_base, index=index)
 
         case Store(base=base, index=index, value=value):
-            return Store(
-                base=recur(base),
-                index=index,
-                value=recur(value),
-            )
+            opt_base = yield recur(base)
+            opt_value = yield recur(value)
 
-        case Begin(effects=effects, value=value):  # pragma: no branch
-            return Begin(
-                effects=[recur(e) for e in effects],
-                value=recur(value),
-            )
+            if opt_base is base and opt_value is value:
+                return term
+
+            return new(Store, base=opt_base, index=index, value=opt_value)
+
+        case Begin(effects=effects, value=value):
+            opt_effects = yield each(recur(e) for e in effects)
+            opt_value = yield recur(value)
+
+            if opt_value is value and all(map(is_, opt_effects, effects)):
+                return term
+
+            return new(Begin, effects=opt_effects, value=opt_value)
+
+        case _:
+            raise TypeError(f"not an L2 term: {type(term)!r}")
+
+
+def interner() -> Interner:
+    return Interner(
+        [Program, Let, Reference, Abstract, Apply, Immediate, Primitive, Branch, Allocate, Load, Store, Begin]
+    )
 
 
 def optimize_program(
     program: Program,
+    intern: Interner | None = None,
 ) -> Program:
+    # Rounds repeat until one rewrites nothing. Nodes that a round left unchanged are skipped by the next unless the
+    # bindings of their free variables changed in between. When the front end built program with the same intern, a
+    # round that rebuilds a subtree as it was returns that subtree itself.
+    if intern is None:
+        intern = interner()
+    settled = Settled()
     previous = program
 
     while True:
         match previous:
-            case Program(parameters=parameters, body=body):  # pragma: no branch
-                optimized = Program(
-                    parameters=parameters,
-                    body=optimize_term(body, {}),
-                )
-
-        if optimized == previous:
-            return optimized
-        previous = optimized
+            case Program(parameters=parameters, body=body):
+                optimized = optimize_term(body, {}, intern, settled)
+
+            case _:
+                raise TypeError(f"not an L2 program: {type(previous)!r}")
+
+        if optimized is body:
+            return previous
+        previous = intern(Program, parameters=parameters, body=optimized)
@@ -2,6 +2,7 @@ import ast
 from functools import partial
 
 from util.encode import encode
+from util.pyc import to_pyc
 
 from .syntax import (
     Abstract,
@@ -115,7 +116,7 @@ def to_ast_term(
                 ctx=ast.Load(),
             )
 
-        case Begin(effects=effects, value=value):  # pragma: no branch
+        case Begin(effects=effects, value=value):
             return ast.Subscript(
                 value=ast.Tuple(
                     elts=[
@@ -128,12 +129,15 @@ def to_ast_term(
                 ctx=ast.Load(),
             )
 
+        case _:
+            raise TypeError(f"not an L2 term: {type(term)!r}")
 
-def to_ast_program(
+
+def to_ast_module(
     program: Program,
-) -> str:
+) -> ast.Module:
     match program:
-        case Program(parameters=parameters, body=body):  # pragma: no branch
+        case Program(parameters=parameters, body=body):
             module = ast.Module(
                 body=[
                     ast.FunctionDef(
@@ -182,6 +186,20 @@ def to_ast_program(
                 ]
             )
 
-            ast.fix_missing_locations(module)
+            return ast.fix_missing_locations(module)
 
-            return ast.unparse(module)
+        case _:
+            raise TypeError(f"not an L2 program: {type(program)!r}")
+
+
+def to_ast_program(
+    program: Program,
+) -> str:
+    return ast.unparse(to_ast_module(program))
+
+
+def to_pyc_program(
+    program: Program,
+    filename: str = "<l2>",
+) -> bytes:
+    return to_pyc(to_ast_module(program), filename)
@@ -0,0 +1,96 @@
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from L1 import compact as L1
+from L1.to_python import to_ast_program as to_ast_l1_program
+from L2 import compact
+from L2.cps_convert import cps_convert_program, cps_convert_term
+from L2.optimize import free_variables, optimize_program, optimize_term
+from L2.syntax import (
+    Abstract,
+    Allocate,
+    Apply,
+    Begin,
+    Branch,
+    Immediate,
+    Let,
+    Load,
+    Primitive,
+    Program,
+    Reference,
+    Store,
+)
+from L2.to_python import to_ast_module, to_ast_program, to_ast_term
+from util.sequential_name_generator import SequentialNameGenerator
+
+PROGRAM = Program(
+    parameters=["x"],
+    body=Let(
+        bindings=[
+            ("f", Abstract(parameters=["y"], body=Reference(name="y"))),
+            ("m", Allocate(count=1)),
+        ],
+        body=Begin(
+            effects=[Store(base=Reference(name="m"), index=0, value=Immediate(value=1))],
+            value=Branch(
+                operator="<",
+                left=Load(base=Reference(name="m"), index=0),
+                right=Reference(name="x"),
+                consequent=Apply(target=Reference(name="f"), arguments=[Reference(name="x")]),
+                otherwise=Primitive(operator="*", left=Reference(name="x"), right=Immediate(value=2)),
+            ),
+        ),
+    ),
+)
+
+
+def test_compact_round_trip():
+    actual = compact.to_compact(PROGRAM)
+
+    match actual:
+        case compact.Program(body=compact.Let(bindings=(("f", compact.Abstract(parameters=("y",))), _))):
+            pass
+
+        case _:  # pragma: no cover
+            raise AssertionError(actual)
+
+    assert compact.from_compact(actual) == PROGRAM
+
+
+def test_passes_match_compact():
+    program = compact.to_compact(PROGRAM)
+
+    # Their output mixes both representations, so it is compared as the module it is written to.
+    assert to_ast_program(optimize_program(program)) == to_ast_program(optimize_program(PROGRAM))
+    assert to_ast_l1_program(cps_convert_program(program, SequentialNameGenerator())) == to_ast_l1_program(
+        cps_convert_program(PROGRAM, SequentialNameGenerator())
+    )
+
+
+def test_cps_convert_compact():
+    actual = cps_convert_program(PROGRAM, SequentialNameGenerator(), L1.new)
+
+    assert isinstance(actual, L1.Program)
+    assert L1.from_compact(actual) == cps_convert_program(PROGRAM, SequentialNameGenerator())
+
+
+# Anything else falls through every case of a pass.
+UNKNOWN: Any = object()
+
+
+@pytest.mark.parametrize(
+    "run",
+    [
+        lambda: free_variables(UNKNOWN),
+        lambda: optimize_term(UNKNOWN, {}),
+        lambda: optimize_program(UNKNOWN),
+        lambda: cps_convert_term(UNKNOWN, "k", SequentialNameGenerator()),
+        lambda: cps_convert_program(UNKNOWN, SequentialNameGenerator()),
+        lambda: to_ast_term(UNKNOWN),
+        lambda: to_ast_module(UNKNOWN),
+    ],
+)
+def test_passes_reject_unknown(run: Callable[[], object]):
+    with pytest.raises(TypeError):
+        run()
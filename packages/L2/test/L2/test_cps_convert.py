@@ -157,6 +157,106 @@ def test_cps_convert_term_branch():
     assert actual == expected
 
 
+def test_cps_convert_term_apply_dynamic():
+    term = L2.Apply(
+        target=L2.Reference(name="f"),
+        arguments=[
+            L2.Reference(name="y"),
+        ],
+    )
+
+    fresh = SequentialNameGenerator()
+    actual = cps_convert_term(term, "k", fresh)
+
+    expected = L1.Apply(target="f", arguments=["y", "k"])
+
+    assert actual == expected
+
+
+def test_cps_convert_term_branch_dynamic():
+    term = L2.Branch(
+        operator="<",
+        left=L2.Reference(name="x"),
+        right=L2.Reference(name="y"),
+        consequent=L2.Reference(name="a"),
+        otherwise=L2.Apply(target=L2.Reference(name="f"), arguments=[]),
+    )
+
+    fresh = SequentialNameGenerator()
+    actual = cps_convert_term(term, "k", fresh)
+
+    expected = L1.Branch(
+        operator="<",
+        left="x",
+        right="y",
+        then=L1.Apply(target="k", arguments=["a"]),
+        otherwise=L1.Apply(target="f", arguments=["k"]),
+    )
+
+    assert actual == expected
+
+
+def test_cps_convert_term_abstract_tail_call():
+    term = L2.Abstract(
+        parameters=["x"],
+        body=L2.Branch(
+            operator="==",
+            left=L2.Reference(name="x"),
+            right=L2.Reference(name="x"),
+            consequent=L2.Apply(target=L2.Reference(name="x"), arguments=[L2.Reference(name="x")]),
+            otherwise=L2.Reference(name="x"),
+        ),
+    )
+
+    fresh = SequentialNameGenerator()
+    actual = cps_convert_term(term, k, fresh)
+
+    # The body passes the continuation parameter on, so it needs neither a join point nor a continuation of its own.
+    expected = L1.Abstract(
+        destination="t0",
+        parameters=["x", "k0"],
+        body=L1.Branch(
+            operator="==",
+            left="x",
+            right="x",
+            then=L1.Apply(target="x", arguments=["x", "k0"]),
+            otherwise=L1.Apply(target="k0", arguments=["x"]),
+        ),
+        then=L1.Halt(value="t0"),
+    )
+
+    assert actual == expected
+
+
+def test_cps_convert_term_branch_apply():
+    term = L2.Branch(
+        operator="==",
+        left=L2.Reference(name="x"),
+        right=L2.Reference(name="y"),
+        consequent=L2.Apply(target=L2.Reference(name="f"), arguments=[]),
+        otherwise=L2.Reference(name="b"),
+    )
+
+    fresh = SequentialNameGenerator()
+    actual = cps_convert_term(term, k, fresh)
+
+    # A call in an arm continues to the join point itself.
+    expected = L1.Abstract(
+        destination="j0",
+        parameters=["t0"],
+        body=L1.Halt(value="t0"),
+        then=L1.Branch(
+            operator="==",
+            left="x",
+            right="y",
+            then=L1.Apply(target="f", arguments=["j0"]),
+            otherwise=L1.Apply(target="j0", arguments=["b"]),
+        ),
+    )
+
+    assert actual == expected
+
+
 def test_cps_convert_term_allocate():
     term = L2.Allocate(count=0)
 
@@ -230,6 +330,22 @@ def test_cps_convert_term_begin():
     assert actual == expected
 
 
+def test_cps_convert_term_begin_dynamic():
+    term = L2.Begin(
+        effects=[
+            L2.Reference(name="x"),
+        ],
+        value=L2.Apply(target=L2.Reference(name="f"), arguments=[]),
+    )
+
+    fresh = SequentialNameGenerator()
+    actual = cps_convert_term(term, "k", fresh)
+
+    expected = L1.Apply(target="f", arguments=["k"])
+
+    assert actual == expected
+
+
 def test_cps_convert_term_primitive_with_immediates():
     term = L2.Primitive(
         operator="*",
@@ -355,3 +471,55 @@ def test_cps_convert_program_with_immediate():
     )
 
     assert actual == expected
+
+
+def test_cps_convert_program_deep_let():
+    depth = 100_000
+    body: L2.Term = L2.Reference(name="x")
+    for _ in range(depth):
+        body = L2.Let(
+            bindings=[("x", L2.Primitive(operator="+", left=L2.Reference(name="x"), right=L2.Immediate(value=1)))],
+            body=body,
+        )
+
+    program = cps_convert_program(L2.Program(parameters=["x"], body=body), SequentialNameGenerator())
+
+    # Each let becomes an immediate, a primitive and a copy to x, one after another.
+    statement = program.body
+    for _ in range(depth):
+        assert isinstance(statement, L1.Immediate)
+        assert isinstance(statement.then, L1.Primitive)
+        assert isinstance(statement.then.then, L1.Copy)
+        assert statement.then.then.destination == "x"
+        statement = statement.then.then.then
+    assert statement == L1.Halt(value="x")
+
+
+def test_cps_convert_term_let_many_bindings():
+    count = 10_000
+    term = L2.Let(
+        bindings=[(f"x{i}", L2.Reference(name="y")) for i in range(count)],
+        body=L2.Reference(name="y"),
+    )
+
+    actual = cps_convert_term(term, k, SequentialNameGenerator())
+
+    # The bindings become copies in order.
+    for i in range(count):
+        assert isinstance(actual, L1.Copy)
+        assert (actual.destination, actual.source) == (f"x{i}", "y")
+        actual = actual.then
+    assert actual == L1.Halt(value="y")
+
+
+def test_cps_convert_program_deep_begin():
+    depth = 100_000
+    program = L2.Program(
+        parameters=["x"],
+        body=L2.Begin(effects=[L2.Reference(name="x")] * depth, value=L2.Immediate(value=0)),
+    )
+
+    actual = cps_convert_program(program, SequentialNameGenerator())
+
+    assert isinstance(actual.body, L1.Immediate)
+    assert actual.body.then == L1.Halt(value=actual.body.destination)
@@ -1,4 +1,8 @@
-from L2.optimize import Environment, free_variables, optimize_program, optimize_term
+from typing import Any
+
+import pytest
+from L2 import optimize
+from L2.optimize import Environment, Settled, free_variables, interner, optimize_program, optimize_term
 from L2.syntax import (
     Abstract,
     Allocate,
@@ -12,9 +16,9 @@ from L2.syntax import (
     Program,
     Reference,
     Store,
+    Term,
 )
 
-
 # free_variables tests
 
 
@@ -72,6 +76,15 @@ def test_free_variables_store():
     assert free_variables(Store(base=Reference(name="x"), index=0, value=Reference(name="v"))) == {"x", "v"}
 
 
+def test_free_variables_cache():
+    term = Primitive(operator="+", left=Reference(name="x"), right=Reference(name="y"))
+    cache: dict[int, frozenset[str]] = {}
+    free = free_variables(term, cache)
+    assert free == {"x", "y"}
+    assert cache[id(term.left)] == {"x"}
+    assert free_variables(term, cache) is free
+
+
 def test_free_variables_begin():
     term = Begin(effects=[Reference(name="x")], value=Reference(name="y"))
     assert free_variables(term) == {"x", "y"}
@@ -292,6 +305,113 @@ def test_dce_keeps_used():
     assert optimize_term(term, {}) == term
 
 
+# change tracking
+
+
+def test_optimize_term_unchanged_is_identical():
+    term = Begin(
+        effects=[
+            Store(base=Reference(name="m"), index=0, value=Reference(name="v")),
+            Apply(target=Reference(name="f"), arguments=[Load(base=Reference(name="m"), index=0)]),
+        ],
+        value=Let(
+            bindings=[("x", Apply(target=Reference(name="f"), arguments=[]))],
+            body=Abstract(
+                parameters=["y"],
+                body=Branch(
+                    operator="<",
+                    left=Reference(name="x"),
+                    right=Reference(name="y"),
+                    consequent=Primitive(operator="+", left=Reference(name="x"), right=Immediate(value=1)),
+                    otherwise=Allocate(count=1),
+                ),
+            ),
+        ),
+    )
+    assert optimize_term(term, {}) is term
+
+
+def test_optimize_term_rebuilds_changed_let():
+    term = Let(
+        bindings=[("x", Apply(target=Reference(name="f"), arguments=[Reference(name="a")]))],
+        body=Reference(name="x"),
+    )
+    env: Environment = {"a": Immediate(value=1)}
+    expected = Let(
+        bindings=[("x", Apply(target=Reference(name="f"), arguments=[Immediate(value=1)]))],
+        body=Reference(name="x"),
+    )
+    assert optimize_term(term, env) == expected
+
+
+def test_optimize_term_rebuilds_changed_branch():
+    term = Branch(
+        operator="==",
+        left=Reference(name="a"),
+        right=Reference(name="b"),
+        consequent=Immediate(value=1),
+        otherwise=Immediate(value=2),
+    )
+    env: Environment = {"a": Reference(name="c")}
+    assert optimize_term(term, env) == Branch(
+        operator="==",
+        left=Reference(name="c"),
+        right=Reference(name="b"),
+        consequent=Immediate(value=1),
+        otherwise=Immediate(value=2),
+    )
+
+
+def test_optimize_term_skips_settled(monkeypatch: pytest.MonkeyPatch):
+    rewritten: list[Term] = []
+    original = optimize.rewrite_term
+
+    def rewrite_term(term: Term, *arguments: Any) -> Term:
+        rewritten.append(term)
+        return original(term, *arguments)
+
+    monkeypatch.setattr(optimize, "rewrite_term", rewrite_term)
+
+    x = Reference(name="x")
+    term = Primitive(operator="+", left=x, right=Reference(name="y"))
+    settled = Settled()
+    env: Environment = {"x": x}
+
+    assert optimize_term(term, env, settled=settled) is term
+    assert rewritten == [term, term.left, term.right]
+
+    rewritten.clear()
+    assert optimize_term(term, {**env, "z": Immediate(value=1)}, settled=settled) is term
+    assert rewritten == []
+
+    assert optimize_term(term, {"x": Immediate(value=1), "y": Immediate(value=2)}, settled=settled) == Immediate(
+        value=3
+    )
+    assert rewritten == [term, term.left, term.right]
+
+
+def test_optimize_term_settled_matches_unsettled():
+    term = Let(
+        bindings=[("x", Immediate(value=2)), ("f", Abstract(parameters=["y"], body=Reference(name="x")))],
+        body=Apply(target=Reference(name="f"), arguments=[Reference(name="x")]),
+    )
+    assert optimize_term(term, {}, settled=Settled()) == optimize_term(term, {})
+
+
+def test_dce_uses_cached_free_variables():
+    body = Apply(target=Reference(name="g"), arguments=[Reference(name="x")])
+    term = Let(bindings=[("x", Apply(target=Reference(name="f"), arguments=[]))], body=body)
+    settled = Settled()
+
+    assert optimize_term(term, {}, settled=settled) is term
+    assert settled.free[id(body)] == {"g", "x"}
+
+    # Only the cached free variables of the body decide whether x is used.
+    settled = Settled()
+    settled.free[id(body)] = frozenset(["g"])
+    assert optimize_term(term, {}, settled=settled) is body
+
+
 # optimize_program
 
 
@@ -317,7 +437,20 @@ def test_optimize_program():
 
 def test_optimize_program_no_change():
     program = Program(parameters=["x"], body=Reference(name="x"))
-    assert optimize_program(program) == program
+    assert optimize_program(program) is program
+
+
+def test_optimize_program_interned():
+    intern = interner()
+    one = intern(Immediate, value=1)
+    program = intern(Program, parameters=[], body=intern(Primitive, operator="+", left=one, right=one))
+
+    actual = optimize_program(program, intern)
+
+    # Built by the same interner, the result shares the nodes it is equal to and is hashable.
+    assert actual.body is intern(Immediate, value=2)
+    assert actual in {intern(Program, parameters=[], body=intern(Immediate, value=2))}
+    assert optimize_program(actual, intern) is actual
 
 
 def test_optimize_program_multiple_passes():
@@ -335,3 +468,15 @@ def test_optimize_program_multiple_passes():
     expected = Program(parameters=[], body=Immediate(value=5))
 
     assert optimize_program(program) == expected
+
+
+def test_optimize_program_deep_let():
+    depth = 100_000
+    body: Term = Reference(name="x")
+    for _ in range(depth):
+        body = Let(
+            bindings=[("x", Primitive(operator="+", left=Reference(name="x"), right=Immediate(value=1)))], body=body
+        )
+    body = Let(bindings=[("x", Immediate(value=0))], body=body)
+
+    assert optimize_program(Program(parameters=[], body=body)) == Program(parameters=[], body=Immediate(value=depth))
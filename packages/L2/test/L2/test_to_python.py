@@ -0,0 +1,83 @@
+import runpy
+from pathlib import Path
+
+import pytest
+from L2.syntax import (
+    Abstract,
+    Allocate,
+    Apply,
+    Begin,
+    Branch,
+    Immediate,
+    Let,
+    Load,
+    Primitive,
+    Program,
+    Reference,
+    Store,
+)
+from L2.to_python import to_ast_program, to_pyc_program
+
+PROGRAMS = [
+    (
+        Program(
+            parameters=["x", "y"],
+            body=Let(
+                bindings=[
+                    ("a", Primitive(operator="+", left=Reference(name="x"), right=Reference(name="y"))),
+                    ("b", Primitive(operator="-", left=Reference(name="x"), right=Reference(name="y"))),
+                ],
+                body=Primitive(operator="*", left=Reference(name="a"), right=Reference(name="b")),
+            ),
+        ),
+        [3, 2],
+        5,
+    ),
+    (
+        Program(
+            parameters=["x"],
+            body=Let(
+                bindings=[
+                    ("m", Allocate(count=1)),
+                    (
+                        "f",
+                        Abstract(
+                            parameters=["y"],
+                            body=Branch(
+                                operator="<",
+                                left=Reference(name="y"),
+                                right=Immediate(value=1),
+                                consequent=Reference(name="y"),
+                                otherwise=Primitive(operator="*", left=Reference(name="y"), right=Immediate(value=2)),
+                            ),
+                        ),
+                    ),
+                ],
+                body=Begin(
+                    effects=[Store(base=Reference(name="m"), index=0, value=Reference(name="x"))],
+                    value=Branch(
+                        operator="==",
+                        left=Load(base=Reference(name="m"), index=0),
+                        right=Reference(name="x"),
+                        consequent=Apply(target=Reference(name="f"), arguments=[Reference(name="x")]),
+                        otherwise=Immediate(value=0),
+                    ),
+                ),
+            ),
+        ),
+        [3],
+        6,
+    ),
+]
+
+
+@pytest.mark.parametrize("pyc", [False, True])
+@pytest.mark.parametrize(("program", "arguments", "expected"), PROGRAMS)
+def test_to_python(tmp_path: Path, program: Program, arguments: list[int], expected: int, pyc: bool):
+    path = tmp_path / ("module.pyc" if pyc else "module.py")
+    if pyc:
+        path.write_bytes(to_pyc_program(program, str(path)))
+    else:
+        path.write_text(to_ast_program(program))
+
+    assert runpy.run_path(str(path))["l2"](*arguments) == expected
@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import click
+from L3.batch import compile_files
+
+MAIN = "from L3.main import main; main()"
+
+
+def generate(i: int, size: int) -> str:
+    # A program of size independent functions, each called in turn.
+    effects = " ".join(f"(let ((f{j} (\\ (y) (if (< y {i + j}) (+ y x) (* y 2))))) (f{j} x))" for j in range(size))
+    return f"(l3 (x) (begin {effects} x))"
+
+
+@click.command()
+@click.option("--files", default=200, show_default=True, help="Programs to compile")
+@click.option("--size", default=20, show_default=True, help="Functions in each program")
+@click.option(
+    "--jobs",
+    "jobs",
+    multiple=True,
+    type=int,
+    default=[1, 2, os.cpu_count() or 1],
+    show_default=True,
+    help="Worker processes for the batch",
+)
+def main(files: int, size: int, jobs: list[int]) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        sources = [Path(directory) / f"program_{i}.l3" for i in range(files)]
+        for i, source in enumerate(sources):
+            source.write_text(generate(i, size))
+
+        # One interpreter per file, as a build that runs l3 on each file does.
+        start = time.perf_counter()
+        for source in sources:
+            subprocess.run([sys.executable, "-c", MAIN, str(source)], check=True)
+        baseline = time.perf_counter() - start
+        click.echo(f"{'processes':>10}  {baseline:9.4f}s  {files / baseline:8.1f} files/s")
+
+        for workers in jobs:
+            start = time.perf_counter()
+            errors = compile_files([(source, source.with_suffix(".py")) for source in sources], workers)
+            elapsed = time.perf_counter() - start
+            assert not any(errors)
+            click.echo(
+                f"{f'-j {workers}':>10}  {elapsed:9.4f}s  {files / elapsed:8.1f} files/s  {baseline / elapsed:6.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import gc
+import time
+
+import click
+from L2 import syntax as L2
+from L2.cps_convert import cps_convert_program
+from util.sequential_name_generator import SequentialNameGenerator
+
+
+def generate(count: int) -> L2.Program:
+    # One let with count bindings, each adding one to the one before.
+    bindings = [
+        (f"x{i + 1}", L2.Primitive(operator="+", left=L2.Reference(name=f"x{i}"), right=L2.Immediate(value=1)))
+        for i in range(count)
+    ]
+    return L2.Program(parameters=["x0"], body=L2.Let(bindings=bindings, body=L2.Reference(name=f"x{count}")))
+
+
+@click.command()
+@click.option(
+    "--count",
+    "counts",
+    multiple=True,
+    type=int,
+    default=[1_000, 2_500, 5_000, 10_000],
+    show_default=True,
+    help="Bindings in the let",
+)
+@click.option("--repeat", default=5, show_default=True, help="Timed runs per count (the best is reported)")
+def main(counts: list[int], repeat: int) -> None:
+    # Without the cyclic garbage collector too, since its full collections walk every live object and so grow with
+    # the chain of statements under construction.
+    click.echo(f"{'bindings':>8}  {'cps_convert':>11}  {'per binding':>11}  {'without gc':>11}  {'per binding':>11}")
+    for count in counts:
+        program = generate(count)
+
+        best: dict[bool, float] = {}
+        for _ in range(repeat):
+            for collect in (True, False):
+                gc.collect()
+                if not collect:
+                    gc.disable()
+                start = time.perf_counter()
+                cps_convert_program(program, SequentialNameGenerator())
+                elapsed = time.perf_counter() - start
+                gc.enable()
+                best[collect] = min(best.get(collect, elapsed), elapsed)
+
+        click.echo(
+            f"{count:>8}  {best[True]:10.4f}s  {best[True] / count * 1e6:9.2f}us"
+            f"  {best[False]:10.4f}s  {best[False] / count * 1e6:9.2f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
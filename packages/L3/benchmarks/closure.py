@@ -0,0 +1,72 @@
+import gc
+import sys
+import time
+from collections.abc import Callable
+from typing import Any
+
+import click
+from L1 import syntax as L1
+from L1.close import close_program, free_variables
+from L2.cps_convert import cps_convert_program
+from L3.eliminate_letrec import eliminate_letrec_program
+from L3.reader import read_program
+from L3.uniqify import uniqify_program
+
+
+def generate(depth: int) -> str:
+    # depth lambdas, each the body of the one outside it, and all of them capturing x.
+    body = "(+ x y)"
+    for _ in range(depth):
+        body = f"(\\ (y) {body})"
+    return f"(l3 (x) {body})"
+
+
+def lower(depth: int) -> tuple[Callable[[str], str], L1.Program]:
+    fresh, program = uniqify_program(read_program(generate(depth)))
+    return fresh, cps_convert_program(eliminate_letrec_program(program), fresh)
+
+
+def walks(program: L1.Program) -> None:
+    # What closure conversion did before the annotation: walk the body of every lambda on its own.
+    stack: list[Any] = [program.body]
+    while stack:
+        statement = stack.pop()
+        if isinstance(statement, L1.Abstract):
+            free_variables(statement.body)
+            stack.append(statement.body)
+        stack.extend(getattr(statement, name) for name in ("then", "otherwise") if hasattr(statement, name))
+
+
+@click.command()
+@click.option(
+    "--depth",
+    "depths",
+    multiple=True,
+    type=int,
+    default=[250, 500, 1_000, 2_000],
+    show_default=True,
+    help="Nesting depths to time",
+)
+@click.option("--repeat", default=5, show_default=True, help="Timed runs per depth (the best is reported)")
+def main(depths: list[int], repeat: int) -> None:
+    # Closure conversion recurses once per statement, and every lambda nests the next.
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 20 * max(depths)))
+
+    click.echo(f"{'depth':>6}  {'close':>10}  {'per lambda':>10}  {'walks':>10}")
+    for depth in depths:
+        best: dict[str, float] = {}
+        for _ in range(repeat):
+            fresh, program = lower(depth)
+            for name, function, arguments in (("close", close_program, (program, fresh)), ("walks", walks, (program,))):
+                gc.collect()
+                start = time.perf_counter()
+                function(*arguments)
+                elapsed = time.perf_counter() - start
+                best[name] = min(best.get(name, elapsed), elapsed)
+
+        per_lambda = best["close"] / depth * 1e6
+        click.echo(f"{depth:>6}  {best['close']:9.4f}s  {per_lambda:8.2f}us  {best['walks']:9.4f}s")
+
+
+if __name__ == "__main__":
+    main()
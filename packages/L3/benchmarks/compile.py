@@ -0,0 +1,75 @@
+import gc
+import runpy
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import click
+from L1.to_python import to_ast_program
+from L3.parse import parse_program
+from L3.pipeline import compile_program, lower_program
+
+EXAMPLES = Path(__file__).parent.parent / "examples"
+
+# Each example with the arguments to run it on.
+SUITE: dict[str, tuple[int, ...]] = {
+    "add_simple": (20, 22),
+    "add_complex": (20, 22),
+    "fact": (20,),
+    "fib": (10,),
+}
+
+
+def process(source: str, module: Path, arguments: tuple[int, ...]) -> None:
+    module.write_text(to_ast_program(lower_program(parse_program(source))))
+    subprocess.run([sys.executable, str(module), *map(str, arguments)], check=True, capture_output=True)
+
+
+def loaded(source: str, module: Path, arguments: tuple[int, ...]) -> None:
+    module.write_text(to_ast_program(lower_program(parse_program(source))))
+    runpy.run_path(str(module))["l1"](*arguments)
+
+
+def compiled(source: str, module: Path, arguments: tuple[int, ...]) -> None:
+    compile_program(source)(*arguments)
+
+
+def best(
+    function: Callable[[str, Path, tuple[int, ...]], None],
+    source: str,
+    module: Path,
+    arguments: tuple[int, ...],
+    repeat: int,
+) -> float:
+    elapsed = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function(source, module, arguments)
+        elapsed = min(elapsed, time.perf_counter() - start)
+    return elapsed
+
+
+@click.command()
+@click.option("--repeat", default=10, show_default=True, help="Timed runs per example (the best is reported)")
+def main(repeat: int) -> None:
+    # Each column compiles the example and runs it once: in a new interpreter given the module, by writing the module
+    # and loading it in this one, and with compile_program.
+    click.echo(f"{'example':>12}  {'process':>10}  {'module':>10}  {'in-process':>10}  {'speedup':>7}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, arguments in SUITE.items():
+            source = (EXAMPLES / f"{name}.l3").read_text()
+            module = Path(directory) / f"{name}.py"
+            slow, medium, fast = (
+                best(function, source, module, arguments, repeat) for function in (process, loaded, compiled)
+            )
+            click.echo(
+                f"{name:>12}  {slow * 1e3:8.2f}ms  {medium * 1e3:8.2f}ms  {fast * 1e3:8.2f}ms  {medium / fast:6.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import gc
+import runpy
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+import click
+from L1 import syntax as L1
+from L1.to_python import to_ast_program
+from L3.pipeline import lower_program
+from L3.syntax import Program
+
+EXAMPLES = Path(__file__).parent.parent / "examples"
+
+# Each example with the arguments to run it on.
+SUITE: dict[str, tuple[int, ...]] = {
+    "add_simple": (20, 22),
+    "add_complex": (20, 22),
+    "fact": (200,),
+    "fib": (18,),
+    "sum": (1_000,),
+}
+
+
+def size(program: L1.Program) -> tuple[int, int]:
+    # Statements in the program, and how many of them allocate a closure.
+    statements = abstracts = 0
+    stack: list[Any] = [program.body]
+    while stack:
+        statement = stack.pop()
+        statements += 1
+        if isinstance(statement, L1.Abstract):
+            abstracts += 1
+            stack.append(statement.body)
+        stack.extend(getattr(statement, name) for name in ("then", "otherwise") if hasattr(statement, name))
+    return statements, abstracts
+
+
+@click.command()
+@click.option("--repeat", default=20, show_default=True, help="Timed runs per example (the best is reported)")
+def main(repeat: int) -> None:
+    # The generated code makes a Python call for every call and every return, none of them in tail position.
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 100_000))
+
+    click.echo(f"{'example':>12}  {'statements':>10}  {'lambdas':>7}  {'run':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, arguments in SUITE.items():
+            program = lower_program(Program.model_validate_json((EXAMPLES / f"{name}.json").read_text()))
+            statements, abstracts = size(program)
+
+            module = Path(directory) / f"{name}.py"
+            module.write_text(to_ast_program(program))
+            function = runpy.run_path(str(module))["l1"]
+
+            best = float("inf")
+            for _ in range(repeat):
+                gc.collect()
+                start = time.perf_counter()
+                function(*arguments)
+                best = min(best, time.perf_counter() - start)
+
+            click.echo(f"{name:>12}  {statements:>10}  {abstracts:>7}  {best * 1e3:8.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
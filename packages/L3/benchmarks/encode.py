@@ -0,0 +1,115 @@
+import ast
+import gc
+import io
+import keyword
+import time
+from collections.abc import Callable
+from typing import Any
+
+import click
+from L1 import syntax as L1
+from L1 import to_python, write_python
+from L3.parse import parse_program
+from L3.pipeline import lower_program
+from util.encode import encode
+
+
+def uncached(name: str) -> str:
+    # encode as it was, escaping every name a character at a time.
+    def escape(c: str) -> str:
+        if c.isidentifier() or c.isdigit() or c == "_":
+            return c
+
+        return f"_x{ord(c):02X}_"
+
+    encoded = "".join(escape(c) for c in name)
+
+    if not encoded or not (encoded[0].isalpha() or encoded[0] == "_"):
+        encoded = "_" + encoded
+
+    if keyword.iskeyword(encoded):
+        encoded = "_" + encoded
+
+    return encoded
+
+
+ENCODERS: dict[str, Callable[[str], str]] = {"uncached": uncached, "cached": encode}
+
+
+def generate(size: int) -> str:
+    # size functions, each stored in m in turn.
+    effects = " ".join(f"(store m 0 (\\ (y) (if (< y {i}) (+ y x) (* y 2))))" for i in range(size))
+    return f"(l3 (x) (let ((m (allocate 1))) (begin {effects} x)))"
+
+
+def unparse(program: L1.Program) -> Any:
+    return to_python.to_ast_program(program)
+
+
+def stream(program: L1.Program) -> Any:
+    write_python.write_program(program, io.StringIO())
+
+
+WRITERS: dict[str, Callable[[L1.Program], Any]] = {"unparse": unparse, "stream": stream}
+
+
+def names(program: L1.Program) -> list[str]:
+    # Every name the generated module refers to, as many times as it does.
+    return [node.id for node in ast.walk(to_python.to_ast_module(program)) if isinstance(node, ast.Name)]
+
+
+def encode_names(names: list[str], encoder: Callable[[str], str], repeat: int) -> float:
+    elapsed = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for name in names:
+            encoder(name)
+        elapsed = min(elapsed, time.perf_counter() - start)
+    return elapsed
+
+
+def best(
+    function: Callable[[L1.Program], Any], program: L1.Program, encoder: Callable[[str], str], repeat: int
+) -> float:
+    # Both backends call encode through the name they imported.
+    to_python.encode = write_python.encode = encoder
+    try:
+        elapsed = float("inf")
+        for _ in range(repeat):
+            # Without the cyclic garbage collector, whose full collections would otherwise swamp the difference.
+            gc.collect()
+            gc.disable()
+            start = time.perf_counter()
+            function(program)
+            elapsed = min(elapsed, time.perf_counter() - start)
+            gc.enable()
+        return elapsed
+    finally:
+        to_python.encode = write_python.encode = encode
+
+
+@click.command()
+@click.option(
+    "--size",
+    "sizes",
+    multiple=True,
+    type=int,
+    default=[1_000, 5_000],
+    show_default=True,
+    help="Functions in the generated programs",
+)
+@click.option("--repeat", default=5, show_default=True, help="Timed runs per writer and encoder (the best is reported)")
+def main(sizes: list[int], repeat: int) -> None:
+    click.echo(f"{'size':>6}  {'writer':>8}  {'uncached':>10}  {'cached':>10}  speedup")
+    for size in sizes:
+        program = lower_program(parse_program(generate(size)))
+
+        slow, fast = (encode_names(names(program), encoder, repeat) for encoder in ENCODERS.values())
+        click.echo(f"{size:>6}  {'encode':>8}  {slow:9.4f}s  {fast:9.4f}s  {slow / fast:6.2f}x")
+        for name, function in WRITERS.items():
+            slow, fast = (best(function, program, encoder, repeat) for encoder in ENCODERS.values())
+            click.echo(f"{size:>6}  {name:>8}  {slow:9.4f}s  {fast:9.4f}s  {slow / fast:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import gc
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+import click
+from L3.check import check_program
+from L3.eliminate_letrec import eliminate_letrec_program
+from L3.front_end import front_end_program
+from L3.reader import read_program
+from L3.syntax import Program
+from L3.uniqify import uniqify_program
+
+
+def sequential(program: Program) -> Any:
+    check_program(program)
+    fresh, program = uniqify_program(program)
+    return fresh, eliminate_letrec_program(program)
+
+
+FRONT_ENDS: dict[str, Callable[[Program], Any]] = {"sequential": sequential, "fused": front_end_program}
+
+
+def generate(size: int) -> str:
+    effects = " ".join(
+        f"(let ((f{i} (\\ (y) (if (< y {i}) (+ y x) (* y 2)))) (m{i} (allocate 2)))"
+        f" (begin (store m{i} 0 {i}) (f{i} (+ (load m{i} 0) (g x)))))"
+        for i in range(size)
+    )
+    return f"(l3 (x) (letrec ((g (\\ (n) (g n)))) (begin {effects} x)))"
+
+
+def measure(function: Callable[[Program], Any], program: Program) -> tuple[float, int]:
+    gc.collect()
+    start = time.perf_counter()
+    function(program)
+    elapsed = time.perf_counter() - start
+
+    # Peak memory comes from a second run, since tracing slows everything down.
+    gc.collect()
+    tracemalloc.start()
+    function(program)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak
+
+
+@click.command()
+@click.option(
+    "--size",
+    "sizes",
+    multiple=True,
+    type=int,
+    default=[1_000, 3_000, 10_000],
+    show_default=True,
+    help="Independent lets in the generated programs",
+)
+@click.option("--repeat", default=3, show_default=True, help="Timed runs per front end (the best is reported)")
+def main(sizes: list[int], repeat: int) -> None:
+    click.echo(f"{'size':>6}  {'sequential':>10}  {'fused':>10}  speedup  {'sequential':>10}  {'fused':>10}")
+    for size in sizes:
+        program = read_program(generate(size))
+
+        best: dict[str, tuple[float, int]] = {}
+        for _ in range(repeat):
+            for name, function in FRONT_ENDS.items():
+                elapsed, peak = measure(function, program)
+                previous, _ = best.get(name, (elapsed, peak))
+                best[name] = (min(previous, elapsed), peak)
+
+        (slow, heavy), (fast, light) = best["sequential"], best["fused"]
+        click.echo(
+            f"{size:>6}  {slow:9.4f}s  {fast:9.4f}s  {slow / fast:6.2f}x  {heavy / 2**20:8.2f}MB  {light / 2**20:8.2f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import gc
+import runpy
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import click
+from L1 import to_python
+from L3.parse import parse_program
+from L3.pipeline import lower_program
+from L3.syntax import Program
+
+EXAMPLES = Path(__file__).parent.parent / "examples"
+
+COUNT = "(l3 (n) (letrec ((count (\\ (i) (if (== i 0) i (count (- i 1)))))) (count n)))"
+
+ACCUMULATE = "(l3 (n) (letrec ((loop (\\ (i acc) (if (== i 0) acc (loop (- i 1) (+ acc i)))))) (loop n 0)))"
+
+# Each program counts n down to zero. sum keeps its counter and total in memory, so its loop takes no arguments.
+SUITE: dict[str, Program] = {
+    "count": parse_program(COUNT),
+    "accumulate": parse_program(ACCUMULATE),
+    "sum": Program.model_validate_json((EXAMPLES / "sum.json").read_text()),
+}
+
+
+def compile(program: Program, directory: Path, name: str, loops: bool) -> Callable[..., Any]:
+    # Without loops every self tail call is emitted as a Python call, as before.
+    original = to_python.self_calls
+    if not loops:
+        to_python.self_calls = lambda *_: set()
+    try:
+        source = to_python.to_ast_program(lower_program(program))
+    finally:
+        to_python.self_calls = original
+
+    module = directory / f"{name}_{loops}.py"
+    module.write_text(source)
+    return runpy.run_path(str(module))["l1"]
+
+
+def best(function: Callable[..., Any], argument: int, repeat: int) -> float:
+    elapsed = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function(argument)
+        elapsed = min(elapsed, time.perf_counter() - start)
+    return elapsed
+
+
+@click.command()
+@click.option(
+    "--count",
+    "counts",
+    multiple=True,
+    type=int,
+    default=[1_000, 10_000, 1_000_000],
+    show_default=True,
+    help="Iterations of each loop",
+)
+@click.option("--repeat", default=5, show_default=True, help="Timed runs per program (the best is reported)")
+def main(counts: list[int], repeat: int) -> None:
+    # Enough frames for loops of 10,000 made of calls.
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 50_000))
+
+    click.echo(f"{'program':>10}  {'count':>9}  {'calls':>10}  {'loops':>10}  {'speedup':>7}  {'per iteration':>13}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, program in SUITE.items():
+            functions = {loops: compile(program, Path(directory), name, loops) for loops in (False, True)}
+            for count in counts:
+                fast = best(functions[True], count, repeat)
+                per = f"{fast / count * 1e9:10.1f}ns"
+                try:
+                    slow = best(functions[False], count, repeat)
+                except RecursionError:
+                    click.echo(f"{name:>10}  {count:>9}  {'overflow':>10}  {fast:9.4f}s  {'':>7}  {per:>13}")
+                    continue
+                click.echo(f"{name:>10}  {count:>9}  {slow:9.4f}s  {fast:9.4f}s  {slow / fast:6.2f}x  {per:>13}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import sys
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import fields, is_dataclass
+from typing import Any
+
+import click
+from L0 import compact as L0
+from L1 import compact as L1
+from L1.close import close_program
+from L2 import compact as L2
+from L2.cps_convert import cps_convert_program
+from L2.optimize import optimize_program
+from L3 import compact as L3
+from L3.eliminate_letrec import eliminate_letrec_program
+from L3.reader import read_program
+from L3.uniqify import uniqify_program
+from util.trusted import trusted
+
+
+def generate(size: int) -> str:
+    effects = " ".join(
+        f"(let ((f{i} (\\ (y) (if (< y {i}) (+ y x) (* y 2)))) (m{i} (allocate 2)))"
+        f" (begin (store m{i} 0 {i}) (f{i} (+ (load m{i} 0) x))))"
+        for i in range(size)
+    )
+    return f"(l3 (x) (begin {effects} x))"
+
+
+def nodes(root: Any) -> int:
+    count = 0
+    stack = [root]
+    while stack:
+        value = stack.pop()
+        if is_dataclass(value):
+            count += 1
+            stack.extend(getattr(value, field.name) for field in fields(value))
+        elif isinstance(value, tuple):
+            stack.extend(value)  # pyright: ignore[reportUnknownArgumentType]
+    return count
+
+
+def allocated(function: Callable[..., Any], *arguments: Any) -> tuple[Any, int, int]:
+    # The memory still held once the conversion returns, which is the tree it built, and the most held along the way.
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    result = function(*arguments)
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, after - before, peak - before
+
+
+@click.command()
+@click.option("--size", default=100, show_default=True, help="Independent lets in the generated program")
+def main(size: int) -> None:
+    # The passes recurse once per nested node, and CPS turns the begin into one long chain of statements.
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 1_000 * size))
+
+    source = generate(size)
+    fresh, l3 = uniqify_program(read_program(source))
+    l2 = optimize_program(eliminate_letrec_program(l3))
+    l1 = cps_convert_program(l2, fresh)
+    l0 = close_program(l1, fresh)
+
+    levels = {"L3": (L3, l3), "L2": (L2, l2), "L1": (L1, l1), "L0": (L0, l0)}
+
+    click.echo(f"{'':>4}  {'nodes':>8}  {'pydantic':>10}  {'compact':>10}  (bytes per node)")
+    for name, (module, program) in levels.items():
+        compact, compact_bytes, _ = allocated(module.to_compact, program)
+        _, model_bytes, _ = allocated(module.from_compact, compact)
+
+        count = nodes(compact)
+        click.echo(f"{name:>4}  {count:>8}  {model_bytes / count:10.1f}  {compact_bytes / count:10.1f}")
+
+    # The L1 program as the pipeline builds it, compact from the start rather than converted afterwards.
+    click.echo()
+    click.echo(f"{'cps_convert':>11}  {'retained':>10}  {'peak':>10}  (bytes per node)")
+    for name, new in {"pydantic": trusted, "compact": L1.new}.items():
+        fresh, l3 = uniqify_program(read_program(source))
+        l2 = optimize_program(eliminate_letrec_program(l3))
+        _, retained, peak = allocated(cps_convert_program, l2, fresh, new)
+
+        count = nodes(L1.to_compact(l1))
+        click.echo(f"{name:>11}  {retained / count:10.1f}  {peak / count:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
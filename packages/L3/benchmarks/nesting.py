@@ -0,0 +1,65 @@
+import gc
+import sys
+import time
+from collections.abc import Callable
+from typing import Any
+
+import click
+from L2.optimize import optimize_program, optimize_term
+from L2.syntax import Apply, Let, Program, Reference, Term
+
+
+def generate(depth: int) -> Program:
+    # depth lets nested in each other's bodies, each binding a call on the one outside it.
+    body: Term = Reference(name=f"x{depth}")
+    for i in reversed(range(depth)):
+        call = Apply(target=Reference(name="g"), arguments=[Reference(name=f"x{i}")])
+        body = Let(bindings=[(f"x{i + 1}", call)], body=body)
+    return Program(parameters=["g", "x0"], body=body)
+
+
+def uncached(program: Program) -> Any:
+    # One round as optimize_term does it without a cache, so every let walks its whole body again.
+    return optimize_term(program.body, {})
+
+
+def cached(program: Program) -> Any:
+    return optimize_program(program)
+
+
+MODES: dict[str, Callable[[Program], Any]] = {"uncached": uncached, "cached": cached}
+
+
+@click.command()
+@click.option(
+    "--depth",
+    "depths",
+    multiple=True,
+    type=int,
+    default=[100, 200, 400, 800],
+    show_default=True,
+    help="Nesting depths to time",
+)
+@click.option("--repeat", default=3, show_default=True, help="Timed runs per mode (the best is reported)")
+def main(depths: list[int], repeat: int) -> None:
+    # Every pass recurses once per nested let.
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10 * max(depths)))
+
+    click.echo(f"{'depth':>6}  {'uncached':>10}  {'cached':>10}  {'per let':>10}")
+    for depth in depths:
+        program = generate(depth)
+        best: dict[str, float] = {}
+        for _ in range(repeat):
+            for mode, function in MODES.items():
+                gc.collect()
+                start = time.perf_counter()
+                function(program)
+                elapsed = time.perf_counter() - start
+                best[mode] = min(best.get(mode, elapsed), elapsed)
+
+        per_let = best["cached"] / depth * 1e6
+        click.echo(f"{depth:>6}  {best['uncached']:9.4f}s  {best['cached']:9.4f}s  {per_let:8.2f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import gc
+import time
+from collections.abc import Callable
+from typing import Any
+
+import click
+from L2.optimize import optimize_program, optimize_term
+from L2.syntax import (
+    Allocate,
+    Apply,
+    Begin,
+    Branch,
+    Immediate,
+    Let,
+    Load,
+    Primitive,
+    Program,
+    Reference,
+    Store,
+    Term,
+)
+
+
+def generate(size: int, every: int) -> Program:
+    # size lets, one in every `every` of which folds a constant bound outside of them. The first round rewrites those,
+    # and the rest of the rounds rewrite nothing.
+    effects: list[Term] = [
+        Let(
+            bindings=[
+                (f"y{i}", Apply(target=Reference(name="g"), arguments=[Reference(name="x")])),
+                (f"m{i}", Allocate(count=1)),
+            ],
+            body=Branch(
+                operator="<",
+                left=Reference(name=f"y{i}"),
+                right=Primitive(
+                    operator="*", left=Reference(name="k" if i % every == 0 else "x"), right=Immediate(value=i)
+                ),
+                consequent=Store(base=Reference(name=f"m{i}"), index=0, value=Reference(name=f"y{i}")),
+                otherwise=Load(base=Reference(name=f"m{i}"), index=0),
+            ),
+        )
+        for i in range(size)
+    ]
+    body = Let(bindings=[("k", Immediate(value=2))], body=Begin(effects=effects, value=Reference(name="x")))
+    return Program(parameters=["g", "x"], body=body)
+
+
+def fixpoint(program: Program) -> tuple[Program, int]:
+    # Every round optimizes the whole tree, then compares it with the previous one.
+    count = 1
+    optimized = Program(parameters=program.parameters, body=optimize_term(program.body, {}))
+    while optimized != program:
+        program = optimized
+        optimized = Program(parameters=program.parameters, body=optimize_term(program.body, {}))
+        count += 1
+    return optimized, count
+
+
+def tracked(program: Program) -> tuple[Program, int]:
+    return optimize_program(program), 0
+
+
+MODES: dict[str, Callable[[Program], tuple[Program, int]]] = {"fixpoint": fixpoint, "tracked": tracked}
+
+
+@click.command()
+@click.option("--size", default=2_000, show_default=True, help="Lets that no round changes")
+@click.option("--every", default=10, show_default=True, help="How far apart the lets that fold are")
+@click.option("--repeat", default=5, show_default=True, help="Timed runs per mode (the best is reported)")
+def main(size: int, every: int, repeat: int) -> None:
+    program = generate(size, every)
+
+    best: dict[str, float] = {}
+    results: dict[str, Any] = {}
+    for _ in range(repeat):
+        for mode, function in MODES.items():
+            gc.collect()
+            start = time.perf_counter()
+            results[mode] = function(program)
+            elapsed = time.perf_counter() - start
+            best[mode] = min(best.get(mode, elapsed), elapsed)
+
+    (optimized, count), (same, _) = results["fixpoint"], results["tracked"]
+    assert same == optimized
+    click.echo(f"{size} lets, {count} rounds")
+    click.echo(f"fixpoint  {best['fixpoint']:8.4f}s")
+    click.echo(f"tracked   {best['tracked']:8.4f}s  {best['fixpoint'] / best['tracked']:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import time
+import tracemalloc
+
+import click
+from L3.parse import Mode, parse_program
+
+
+def generate(size: int) -> str:
+    effects: list[str] = []
+    length = 0
+    i = 0
+    while length < size:
+        effect = (
+            f"(let ((a{i} (+ x {i})) (b{i} (* a{i} 2)))"
+            f" (if (< a{i} b{i}) (store m 0 (+ a{i} b{i})) ((\\ (y) (+ y (load m 0))) 0)))"
+        )
+        effects.append(effect)
+        length += len(effect) + 1
+        i += 1
+    return f"(l3 (x) (let ((m (allocate 1))) (begin {' '.join(effects)} x)))"
+
+
+@click.command()
+@click.option("--megabytes", default=2, show_default=True, help="Approximate size of the generated program")
+@click.option("--repeat", default=3, show_default=True, help="Timed runs per mode (the best is reported)")
+def main(megabytes: int, repeat: int) -> None:
+    source = generate(megabytes * 1024 * 1024)
+    click.echo(f"source: {len(source) / 1024 / 1024:.1f} MiB")
+
+    modes: list[Mode] = ["tree", "inline", "reader"]
+    for mode in modes:
+        parse_program("(l3 () 0)", mode)
+
+        times: list[float] = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            parse_program(source, mode)
+            times.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        parse_program(source, mode)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        click.echo(f"{mode:>6}: {min(times):6.2f} s, peak {peak / 1024 / 1024:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
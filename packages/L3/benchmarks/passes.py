@@ -0,0 +1,82 @@
+import gc
+import sys
+import time
+from collections.abc import Callable
+from typing import Any
+
+import click
+from L1 import close
+from L1.close import close_program
+from L2 import cps_convert, optimize
+from L2.cps_convert import cps_convert_program
+from L2.optimize import optimize_program
+from L3 import eliminate_letrec, uniqify
+from L3.eliminate_letrec import eliminate_letrec_program
+from L3.reader import read_program
+from L3.uniqify import uniqify_program
+from util import interner
+from util.trusted import trusted
+
+# The modules that build nodes with util.trusted.trusted (the optimizer builds its nodes through an interner).
+MODULES = [uniqify, eliminate_letrec, optimize, interner, cps_convert, close]
+
+
+def validated(cls: type, **fields: Any) -> Any:
+    return cls(**fields)
+
+
+CONSTRUCTORS: dict[str, Callable[..., Any]] = {"validated": validated, "trusted": trusted}
+
+
+def generate(size: int) -> str:
+    effects = " ".join(
+        f"(let ((f{i} (\\ (y) (if (< y {i}) (+ y x) (* y 2)))) (m{i} (allocate 2)))"
+        f" (begin (store m{i} 0 {i}) (f{i} (+ (load m{i} 0) (g x)))))"
+        for i in range(size)
+    )
+    return f"(l3 (x) (letrec ((g (\\ (n) (g n)))) (begin {effects} x)))"
+
+
+def run(program: Any) -> dict[str, float]:
+    times: dict[str, float] = {}
+
+    def timed(name: str, function: Callable[..., Any], *arguments: Any) -> Any:
+        gc.collect()
+        start = time.perf_counter()
+        result = function(*arguments)
+        times[name] = time.perf_counter() - start
+        return result
+
+    fresh, program = timed("uniqify", uniqify_program, program)
+    program = timed("eliminate_letrec", eliminate_letrec_program, program)
+    program = timed("optimize", optimize_program, program)
+    program = timed("cps_convert", cps_convert_program, program, fresh)
+    timed("close", close_program, program, fresh)
+    return times
+
+
+@click.command()
+@click.option("--size", default=100, show_default=True, help="Independent lets in the generated program")
+@click.option("--repeat", default=10, show_default=True, help="Timed runs per pass (the best is reported)")
+def main(size: int, repeat: int) -> None:
+    # The passes recurse once per nested node, and CPS turns the begin into one long chain of statements.
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 1_000 * size))
+    program = read_program(generate(size))
+
+    best: dict[str, dict[str, float]] = {mode: {} for mode in CONSTRUCTORS}
+    for _ in range(repeat):
+        for mode, constructor in CONSTRUCTORS.items():
+            for module in MODULES:
+                module.trusted = constructor  # pyright: ignore[reportAttributeAccessIssue]
+
+            for name, elapsed in run(program).items():
+                best[mode][name] = min(best[mode].get(name, elapsed), elapsed)
+
+    checked, fast = best["validated"], best["trusted"]
+    click.echo(f"{'pass':>16}  {'validated':>10}  {'trusted':>10}  speedup")
+    for name in fast:
+        click.echo(f"{name:>16}  {checked[name]:9.4f}s  {fast[name]:9.4f}s  {checked[name] / fast[name]:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
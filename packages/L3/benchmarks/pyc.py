@@ -0,0 +1,73 @@
+import gc
+import runpy
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import click
+from L1 import syntax as L1
+from L1.to_python import to_ast_program, to_pyc_program
+from L3.parse import parse_program
+from L3.pipeline import lower_program
+
+
+def generate(size: int) -> str:
+    # size stores, each adding to the total in m.
+    effects = " ".join(f"(store m 0 (+ (load m 0) {i}))" for i in range(size))
+    return f"(l3 (x) (let ((m (allocate 1))) (begin (store m 0 x) {effects} (load m 0))))"
+
+
+def source(program: L1.Program, module: Path) -> Path:
+    module = module.with_suffix(".py")
+    module.write_text(to_ast_program(program))
+    return module
+
+
+def pyc(program: L1.Program, module: Path) -> Path:
+    module = module.with_suffix(".pyc")
+    module.write_bytes(to_pyc_program(program, filename=str(module)))
+    return module
+
+
+WRITERS: dict[str, Callable[[L1.Program, Path], Path]] = {"source": source, "pyc": pyc}
+
+
+@click.command()
+@click.option(
+    "--size",
+    "sizes",
+    multiple=True,
+    type=int,
+    default=[1_000, 10_000, 50_000],
+    show_default=True,
+    help="Stores in the generated programs",
+)
+@click.option("--repeat", default=3, show_default=True, help="Timed runs per output (the best is reported)")
+def main(sizes: list[int], repeat: int) -> None:
+    # Time to write the module and then to load it, which for source means tokenizing, parsing and compiling it again.
+    # Both writers build the same syntax tree first, so the speedup is for loading.
+    header = "  ".join(f"{f'{name} {column}':>12}" for name in WRITERS for column in ("write", "load"))
+    click.echo(f"{'size':>6}  {header}  {'speedup':>7}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            program = lower_program(parse_program(generate(size)))
+
+            best: dict[str, tuple[float, float]] = {}
+            for _ in range(repeat):
+                for name, write in WRITERS.items():
+                    gc.collect()
+                    start = time.perf_counter()
+                    module = write(program, Path(directory) / f"{name}_{size}")
+                    written = time.perf_counter()
+                    runpy.run_path(str(module))
+                    loaded = time.perf_counter()
+                    previous = best.get(name, (float("inf"), float("inf")))
+                    best[name] = (min(previous[0], written - start), min(previous[1], loaded - written))
+
+            times = "  ".join(f"{elapsed:11.4f}s" for name in WRITERS for elapsed in best[name])
+            click.echo(f"{size:>6}  {times}  {best['source'][1] / best['pyc'][1]:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
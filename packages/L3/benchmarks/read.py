@@ -0,0 +1,29 @@
+import time
+
+import click
+from L3.reader import read_term
+
+SHAPES = {
+    "let": ("(let ((x 0)) ", "x", ")"),
+    "begin": ("(begin x ", "x", ")"),
+    "apply": ("(f ", "0", ")"),
+}
+
+
+@click.command()
+@click.option("--depth", default=10_000, show_default=True, help="Smallest nesting depth")
+@click.option("--doublings", default=4, show_default=True, help="How many times to double the depth")
+def main(depth: int, doublings: int) -> None:
+    for shape, (prefix, leaf, suffix) in SHAPES.items():
+        for n in (depth * 2**i for i in range(doublings + 1)):
+            source = prefix * n + leaf + suffix * n
+
+            start = time.perf_counter()
+            read_term(source)
+            elapsed = time.perf_counter() - start
+
+            click.echo(f"{shape:>6} depth {n:>8}: {elapsed:6.2f} s, {elapsed / n * 1e6:5.1f} us per level")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import time
+
+import click
+from L3.incremental import parse_document, reparse_document
+
+
+def generate(lines: int) -> str:
+    bindings = "\n".join(f"    (f{i} (\\ (y) (let ((a (+ y {i}))) (if (< a x) a (* a 2)))))" for i in range(lines))
+    return f"(l3 (x)\n  (letrec (\n{bindings})\n    (f0 x)))"
+
+
+@click.command()
+@click.option("--lines", default=100_000, show_default=True, help="Bindings in the generated program, one per line")
+@click.option("--edits", default=100, show_default=True, help="Single-character edits to time")
+def main(lines: int, edits: int) -> None:
+    source = generate(lines)
+
+    start = time.perf_counter()
+    document = parse_document(source)
+    elapsed = time.perf_counter() - start
+    click.echo(f"{lines} lines, {len(source) / 1024 / 1024:.1f} MiB: full parse {elapsed * 1e3:8.1f} ms")
+
+    # Rewrite the literal in the binding in the middle of the file, one keystroke at a time.
+    literal = f"(+ y {lines // 2})"
+    offset = source.index(literal) + len(literal) - 2
+    start = time.perf_counter()
+    for i in range(edits):
+        document = reparse_document(document, offset, 1, str(i % 10))
+    elapsed = time.perf_counter() - start
+    click.echo(f"{'':>{len(str(lines)) + 21}}  reparse {elapsed / edits * 1e3:8.1f} ms per edit")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import gc
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable, Iterable, Mapping
+from typing import Any
+
+import click
+from L2 import optimize
+from L2.optimize import optimize_program
+from L3 import check, eliminate_letrec, uniqify
+from L3.check import check_program
+from L3.eliminate_letrec import eliminate_letrec_program
+from L3.reader import read_program
+from L3.uniqify import uniqify_program
+from util import persistent_map
+
+# The modules that derive scopes with util.persistent_map.extend and remove.
+MODULES = [check, uniqify, eliminate_letrec, optimize]
+
+
+def copying_extend(mapping: Mapping[Any, Any], items: Mapping[Any, Any]) -> Mapping[Any, Any]:
+    return {**mapping, **items}
+
+
+def copying_remove(mapping: Mapping[Any, Any], keys: Iterable[Any]) -> Mapping[Any, Any]:
+    removed = set(keys)
+    return {key: value for key, value in mapping.items() if key not in removed}
+
+
+SCOPES: dict[str, tuple[Callable[..., Any], Callable[..., Any]]] = {
+    "copying": (copying_extend, copying_remove),
+    "persistent": (persistent_map.extend, persistent_map.remove),
+}
+
+
+def generate(depth: int) -> str:
+    # depth nested lets, each binding a constant the optimizer propagates and a sum it keeps, inside a lambda that
+    # hides every name bound so far from eliminate_letrec.
+    body = f"(+ x{depth} c0)"
+    for i in reversed(range(1, depth + 1)):
+        body = f"(let ((x{i} (+ x{i - 1} y)) (c{i} {i})) {body})"
+    return f"(l3 (y) (letrec ((g (\\ (x0) (let ((c0 0)) {body})))) (g y)))"
+
+
+def run(program: Any) -> dict[str, tuple[float, int]]:
+    results: dict[str, tuple[float, int]] = {}
+
+    def measured(name: str, function: Callable[..., Any], *arguments: Any) -> Any:
+        gc.collect()
+        start = time.perf_counter()
+        function(*arguments)
+        elapsed = time.perf_counter() - start
+
+        # Peak memory comes from a second run, since tracing slows everything down.
+        gc.collect()
+        tracemalloc.start()
+        result = function(*arguments)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results[name] = (elapsed, peak)
+        return result
+
+    measured("check", check_program, program)
+    _, program = measured("uniqify", uniqify_program, program)
+    program = measured("eliminate_letrec", eliminate_letrec_program, program)
+    measured("optimize", optimize_program, program)
+    return results
+
+
+@click.command()
+@click.option("--depth", default=2_000, show_default=True, help="Nested lets in the generated program")
+@click.option("--repeat", default=3, show_default=True, help="Timed runs per mode (the best is reported)")
+def main(depth: int, repeat: int) -> None:
+    # Every pass recurses a few times per nested let.
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 20 * depth))
+    program = read_program(generate(depth))
+
+    best: dict[str, dict[str, tuple[float, int]]] = {mode: {} for mode in SCOPES}
+    for _ in range(repeat):
+        for mode, (extend, remove) in SCOPES.items():
+            for module in MODULES:
+                module.extend = extend  # pyright: ignore[reportAttributeAccessIssue]
+                if hasattr(module, "remove"):
+                    module.remove = remove  # pyright: ignore[reportAttributeAccessIssue]
+
+            for name, (elapsed, peak) in run(program).items():
+                previous, _ = best[mode].get(name, (elapsed, peak))
+                best[mode][name] = (min(previous, elapsed), peak)
+
+    copying, persistent = best["copying"], best["persistent"]
+    click.echo(f"{'pass':>16}  {'copying':>10}  {'persistent':>10}  speedup  {'copying':>10}  {'persistent':>10}")
+    for name in persistent:
+        (slow, heavy), (fast, light) = copying[name], persistent[name]
+        click.echo(
+            f"{name:>16}  {slow:9.4f}s  {fast:9.4f}s  {slow / fast:6.2f}x"
+            f"  {heavy / 2**20:8.2f}MB  {light / 2**20:8.2f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import gc
+import runpy
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import click
+from L1.to_python import to_ast_program
+from L3.parse import parse_program
+from L3.pipeline import lower_program
+
+LOOP = "(l3 (n) (letrec ((loop (\\ (i acc) (if (== i 0) acc (loop (- i 1) (+ acc i)))))) (loop n 0)))"
+
+FIB = "(l3 (n) (letrec ((fib (\\ (n) (if (< n 2) n (+ (fib (- n 1)) (fib (- n 2))))))) (fib n)))"
+
+# Each program with the arguments to run it on. With direct calls nothing returns until the program halts, so every
+# call made holds a frame, and the larger loops only finish with the trampoline.
+SUITE: list[tuple[str, str, tuple[int, ...]]] = [
+    ("fib", FIB, (20,)),
+    ("loop", LOOP, (10_000,)),
+    ("loop", LOOP, (100_000,)),
+    ("loop", LOOP, (1_000_000,)),
+]
+
+
+def best(function: Callable[..., Any], arguments: tuple[int, ...], repeat: int) -> float:
+    elapsed = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function(*arguments)
+        elapsed = min(elapsed, time.perf_counter() - start)
+    return elapsed
+
+
+@click.command()
+@click.option("--repeat", default=5, show_default=True, help="Timed runs per program (the best is reported)")
+def main(repeat: int) -> None:
+    # Enough frames for every call fib and the loop of 10,000 make.
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 50_000))
+
+    click.echo(f"{'program':>8}  {'argument':>9}  {'direct':>10}  {'trampoline':>10}  {'ratio':>6}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, source, arguments in SUITE:
+            program = lower_program(parse_program(source))
+            functions: dict[bool, Callable[..., Any]] = {}
+            for trampoline in (False, True):
+                module = Path(directory) / f"{name}_{trampoline}.py"
+                module.write_text(to_ast_program(program, trampoline))
+                functions[trampoline] = runpy.run_path(str(module))["l1"]
+
+            bounced = best(functions[True], arguments, repeat)
+            try:
+                direct = best(functions[False], arguments, repeat)
+            except RecursionError:
+                click.echo(f"{name:>8}  {arguments[0]:>9}  {'overflow':>10}  {bounced:9.4f}s")
+                continue
+            click.echo(f"{name:>8}  {arguments[0]:>9}  {direct:9.4f}s  {bounced:9.4f}s  {bounced / direct:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import gc
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import TextIO
+
+import click
+from L1 import syntax as L1
+from L1.to_python import to_ast_program
+from L1.write_python import write_program
+from L3.parse import parse_program
+from L3.pipeline import lower_program
+
+
+def generate(size: int) -> str:
+    # size functions, each stored in m in turn, so the output is long but never nested deeply.
+    effects = " ".join(f"(store m 0 (\\ (y) (if (< y {i}) (+ y x) (* y 2))))" for i in range(size))
+    return f"(l3 (x) (let ((m (allocate 1))) (begin {effects} x)))"
+
+
+def unparse(program: L1.Program, output: TextIO) -> None:
+    output.write(to_ast_program(program))
+
+
+WRITERS: dict[str, Callable[[L1.Program, TextIO], None]] = {"unparse": unparse, "stream": write_program}
+
+
+def measure(write: Callable[[L1.Program, TextIO], None], program: L1.Program, path: Path) -> tuple[float, int]:
+    gc.collect()
+    start = time.perf_counter()
+    with path.open("w") as output:
+        write(program, output)
+    elapsed = time.perf_counter() - start
+
+    # Peak memory comes from a second run, since tracing slows everything down. Only what writing allocates is traced,
+    # not the program, which is already in memory.
+    gc.collect()
+    tracemalloc.start()
+    with path.open("w") as output:
+        write(program, output)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak
+
+
+@click.command()
+@click.option(
+    "--size",
+    "sizes",
+    multiple=True,
+    type=int,
+    default=[1_000, 5_000, 20_000],
+    show_default=True,
+    help="Functions in the generated programs",
+)
+@click.option("--repeat", default=3, show_default=True, help="Timed runs per writer (the best is reported)")
+def main(sizes: list[int], repeat: int) -> None:
+    click.echo(f"{'size':>6}  {'output':>9}  {'unparse':>10}  {'stream':>10}  speedup  {'unparse':>10}  {'stream':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "module.py"
+        for size in sizes:
+            program = lower_program(parse_program(generate(size)))
+
+            best: dict[str, tuple[float, int]] = {}
+            for _ in range(repeat):
+                for name, write in WRITERS.items():
+                    elapsed, peak = measure(write, program, path)
+                    previous, _ = best.get(name, (elapsed, peak))
+                    best[name] = (min(previous, elapsed), peak)
+
+            (slow, heavy), (fast, light) = best["unparse"], best["stream"]
+            click.echo(
+                f"{size:>6}  {path.stat().st_size / 2**20:7.2f}MB  {slow:9.4f}s  {fast:9.4f}s  {slow / fast:6.2f}x"
+                f"  {heavy / 2**20:8.2f}MB  {light / 2**20:8.2f}MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import glob
+import os
+import re
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+from L1.to_python import to_pyc_program
+from L1.write_python import write_program
+
+from .parse import get_parser, parse_program
+from .pipeline import lower_program
+
+PATTERN = re.compile(r"[*?[]")
+
+
+def expand_inputs(
+    inputs: Sequence[str],
+) -> list[Path]:
+    # A directory stands for the .l3 files under it and a pattern for the files it matches, each in sorted order, so the
+    # same inputs always name the same files in the same order.
+    paths: dict[Path, None] = {}
+    for input in inputs:
+        path = Path(input)
+        if PATTERN.search(input):
+            matches = sorted(match for match in map(Path, glob.glob(input, recursive=True)) if match.is_file())
+            if not matches:
+                raise ValueError(f"{input!r} matches no files")
+        elif path.is_dir():
+            matches = sorted(match for match in path.rglob("*.l3") if match.is_file())
+        elif path.is_file():
+            matches = [path]
+        else:
+            raise ValueError(f"{input!r} does not exist")
+
+        paths.update(dict.fromkeys(matches))
+    return list(paths)
+
+
+def compile_file(
+    source: Path,
+    target: Path,
+    check: bool = True,
+    optimize: bool = True,
+    trampoline: bool = False,
+    pyc: bool = False,
+) -> str | None:
+    # A failure comes back as its message, so it neither stops the other files nor has to be pickled. Any exception is
+    # caught, since with --no-check an ill-formed program fails inside a pass with whatever error that pass raises.
+    try:
+        program = lower_program(parse_program(source.read_text()), check, optimize)
+        if pyc:
+            target.write_bytes(to_pyc_program(program, trampoline, str(target)))
+        else:
+            with target.open("w") as module:
+                write_program(program, module, trampoline)
+    except Exception as error:  # noqa: BLE001
+        return f"{type(error).__name__}: {error}"
+    return None
+
+
+def warm() -> None:
+    # Builds the parser as a worker starts, so every file the worker compiles reuses it.
+    get_parser("program")
+
+
+def compile_files(
+    files: Sequence[tuple[Path, Path]],
+    jobs: int = 1,
+    check: bool = True,
+    optimize: bool = True,
+    trampoline: bool = False,
+    pyc: bool = False,
+) -> list[str | None]:
+    _file = partial(compile_file, check=check, optimize=optimize, trampoline=trampoline, pyc=pyc)
+    sources = [source for source, _ in files]
+    targets = [target for _, target in files]
+
+    if jobs == 1:
+        return list(map(_file, sources, targets))
+
+    # Results come back in the order of files whichever worker finishes first, and each output depends only on its own
+    # input, so nothing depends on the scheduling. Chunks keep the workers from waiting on one file at a time.
+    workers = jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=warm) as executor:
+        return list(executor.map(_file, sources, targets, chunksize=max(1, len(files) // (4 * workers))))
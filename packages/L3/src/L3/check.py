@@ -2,6 +2,9 @@ from collections import Counter
 from collections.abc import Mapping
 from functools import partial
 
+from util.persistent_map import extend
+from util.trampoline import Steps, trampoline
+
 from .syntax import (
     Abstract,
     Allocate,
@@ -23,11 +26,12 @@ from .syntax import (
 type Context = Mapping[Identifier, None]
 
 
+@trampoline
 def check_term(
     term: Term,
     context: Context,
-) -> None:
-    recur = partial(check_term, context=context)
+) -> Steps[None]:
+    recur = partial(check_term.steps, context=context)
 
     match term:
         case Let(bindings=bindings, body=body):
@@ -37,10 +41,10 @@ def check_term(
                 raise ValueError(f"duplicate binders: {duplicates}")
 
             for _, value in bindings:
-                recur(value)
+                yield recur(value)
 
             local = dict.fromkeys([name for name, _ in bindings])
-            recur(body, context={**context, **local})
+            yield recur(body, context=extend(context, local))
 
         case LetRec(bindings=bindings, body=body):
             counts = Counter(name for name, _ in bindings)
@@ -48,12 +52,12 @@ def check_term(
             if duplicates:
                 raise ValueError(f"duplicate binders: {duplicates}")
 
-            local = dict.fromkeys([name for name, _ in bindings])
+            new_context = extend(context, dict.fromkeys([name for name, _ in bindings]))
 
             for name, value in bindings:
-                recur(value, context={**context, **local})
+                yield recur(value, context=new_context)
 
-            check_term(body, {**context, **local})
+            yield check_term.steps(body, new_context)
 
         case Reference(name=name):
             if name not in context:
@@ -66,47 +70,50 @@ def check_term(
                 raise ValueError(f"duplicate parameters: {duplicates}")
 
             local = dict.fromkeys(parameters, None)
-            recur(body, context={**context, **local})
+            yield recur(body, context=extend(context, local))
 
         case Apply(target=target, arguments=arguments):
-            recur(target)
+            yield recur(target)
             for argument in arguments:
-                recur(argument)
+                yield recur(argument)
 
         case Immediate(value=_value):
             pass
 
         case Primitive(operator=_operator, left=left, right=right):
-            recur(left)
-            recur(right)
+            yield recur(left)
+            yield recur(right)
 
         case Branch(operator=_operator, left=left, right=right, consequent=consequent, otherwise=otherwise):
-            recur(left)
-            recur(right)
-            recur(consequent)
-            recur(otherwise)
+            yield recur(left)
+            yield recur(right)
+            yield recur(consequent)
+            yield recur(otherwise)
 
         case Allocate(count=_count):
             pass
 
         case Load(base=base, index=_index):
-            recur(base)
+            yield recur(base)
 
         case Store(base=base, index=_index, value=value):
-            recur(base)
-            recur(value)
+            yield recur(base)
+            yield recur(value)
 
-        case Begin(effects=effects, value=value):  # pragma: no branch
+        case Begin(effects=effects, value=value):
             for effect in effects:
-                recur(effect)
-            recur(value)
+                yield recur(effect)
+            yield recur(value)
+
+        case _:
+            raise TypeError(f"not an L3 term: {type(term)!r}")
 
 
 def check_program(
     program: Program,
 ) -> None:
     match program:
-        case Program(parameters=parameters, body=body):  # pragma: no branch
+        case Program(parameters=parameters, body=body):
             counts = Counter(parameters)
             duplicates = {name for name, count in counts.items() if count > 1}
             if duplicates:
@@ -114,3 +121,6 @@ def check_program(
 
             local = dict.fromkeys(parameters, None)
             check_term(body, context=local)
+
+        case _:
+            raise TypeError(f"not an L3 program: {type(program)!r}")
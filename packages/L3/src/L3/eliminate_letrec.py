@@ -1,114 +1,134 @@
 # noqa: F841
-from collections.abc import Mapping
+from collections.abc import Callable, Mapping
 from functools import partial
+from typing import Any
 
 from L2 import syntax as L2
+from util.persistent_map import extend, remove
+from util.trampoline import Steps, each, trampoline
+from util.trusted import trusted
 
 from . import syntax as L3
 
 type Context = Mapping[L3.Identifier, None]
 
 
+@trampoline
 def eliminate_letrec_term(
     term: L3.Term,
     context: Context,
-) -> L2.Term:
-    recur = partial(eliminate_letrec_term, context=context)
+    new: Callable[..., Any] = trusted,
+) -> Steps[L2.Term]:
+    recur = partial(eliminate_letrec_term.steps, context=context, new=new)
 
     match term:
         case L3.Let(bindings=bindings, body=body):
             new_bindings = []
             for name, value in bindings:
-                new_bindings.append((name, recur(value)))
-            let_names = {name for name, _ in bindings}
-            body_context = {k: v for k, v in context.items() if k not in let_names}
-            return L2.Let(
+                new_bindings.append((name, (yield recur(value))))
+            body_context = remove(context, [name for name, _ in bindings])
+            return new(
+                L2.Let,
                 bindings=new_bindings,
-                body=eliminate_letrec_term(body, body_context),
+                body=(yield eliminate_letrec_term.steps(body, body_context, new)),
             )
 
         case L3.LetRec(bindings=bindings, body=body):
             letrec_names = [name for name, _ in bindings]
-            new_context = {**context, **dict.fromkeys(letrec_names)}
-            new_recur = partial(eliminate_letrec_term, context=new_context)
-            return L2.Let(
-                bindings=[(name, L2.Allocate(count=1)) for name, _ in bindings],
-                body=L2.Begin(
-                    effects=[
-                        L2.Store(base=L2.Reference(name=name), index=0, value=new_recur(value))
-                        for name, value in bindings
-                    ],
-                    value=new_recur(body),
-                ),
+            new_context = extend(context, dict.fromkeys(letrec_names))
+            new_recur = partial(eliminate_letrec_term.steps, context=new_context, new=new)
+            effects = []
+            for name, value in bindings:
+                effects.append(
+                    new(L2.Store, base=new(L2.Reference, name=name), index=0, value=(yield new_recur(value)))
+                )
+            return new(
+                L2.Let,
+                bindings=[(name, new(L2.Allocate, count=1)) for name, _ in bindings],
+                body=new(L2.Begin, effects=effects, value=(yield new_recur(body))),
             )
 
         case L3.Reference(name=name):
             if name in context:
-                return L2.Load(base=L2.Reference(name=name), index=0)
-            return L2.Reference(name=name)
+                return new(L2.Load, base=new(L2.Reference, name=name), index=0)
+            return new(L2.Reference, name=name)
 
         case L3.Abstract(parameters=parameters, body=body):
-            param_set = set(parameters)
-            body_context = {k: v for k, v in context.items() if k not in param_set}
-            return L2.Abstract(
+            body_context = remove(context, parameters)
+            return new(
+                L2.Abstract,
                 parameters=parameters,
-                body=eliminate_letrec_term(body, body_context),
+                body=(yield eliminate_letrec_term.steps(body, body_context, new)),
             )
 
         case L3.Apply(target=target, arguments=arguments):
-            return L2.Apply(
-                target=recur(target),
-                arguments=[recur(arg) for arg in arguments],
+            return new(
+                L2.Apply,
+                target=(yield recur(target)),
+                arguments=(yield each(recur(arg) for arg in arguments)),
             )
 
         case L3.Immediate(value=value):
-            return L2.Immediate(value=value)
+            return new(L2.Immediate, value=value)
 
         case L3.Primitive(operator=operator, left=left, right=right):
-            return L2.Primitive(
+            return new(
+                L2.Primitive,
                 operator=operator,
-                left=recur(left),
-                right=recur(right),
+                left=(yield recur(left)),
+                right=(yield recur(right)),
             )
 
         case L3.Branch(operator=operator, left=left, right=right, consequent=consequent, otherwise=otherwise):
-            return L2.Branch(
+            return new(
+                L2.Branch,
                 operator=operator,
-                left=recur(left),
-                right=recur(right),
-                consequent=recur(consequent),
-                otherwise=recur(otherwise),
+                left=(yield recur(left)),
+                right=(yield recur(right)),
+                consequent=(yield recur(consequent)),
+                otherwise=(yield recur(otherwise)),
             )
 
         case L3.Allocate(count=count):
-            return L2.Allocate(count=count)
+            return new(L2.Allocate, count=count)
 
         case L3.Load(base=base, index=index):
-            return L2.Load(
-                base=recur(base),
+            return new(
+                L2.Load,
+                base=(yield recur(base)),
                 index=index,
             )
 
         case L3.Store(base=base, index=index, value=value):
-            return L2.Store(
-                base=recur(base),
+            return new(
+                L2.Store,
+                base=(yield recur(base)),
                 index=index,
-                value=recur(value),
+                value=(yield recur(value)),
             )
 
-        case L3.Begin(effects=effects, value=value):  # pragma: no branch
-            return L2.Begin(
-                effects=[recur(effect) for effect in effects],
-                value=recur(value),
+        case L3.Begin(effects=effects, value=value):
+            return new(
+                L2.Begin,
+                effects=(yield each(recur(effect) for effect in effects)),
+                value=(yield recur(value)),
             )
 
+        case _:
+            raise TypeError(f"not an L3 term: {type(term)!r}")
+
 
 def eliminate_letrec_program(
     program: L3.Program,
+    new: Callable[..., Any] = trusted,
 ) -> L2.Program:
     match program:
-        case L3.Program(parameters=parameters, body=body):  # pragma: no branch
-            return L2.Program(
+        case L3.Program(parameters=parameters, body=body):
+            return new(
+                L2.Program,
                 parameters=parameters,
-                body=eliminate_letrec_term(body, {}),
+                body=eliminate_letrec_term(body, {}, new),
             )
+
+        case _:
+            raise TypeError(f"not an L3 program: {type(program)!r}")
@@ -0,0 +1,168 @@
+from collections import Counter
+from collections.abc import Callable, Mapping, Sequence
+from functools import partial
+from typing import Any
+
+from L2 import syntax as L2
+from util.persistent_map import extend
+from util.sequential_name_generator import SequentialNameGenerator
+from util.trampoline import Steps, each, trampoline
+from util.trusted import trusted
+
+from . import syntax as L3
+
+# Each name in scope maps to its fresh name, and to whether letrec bound it (which makes it a box to load from).
+type Context = Mapping[L3.Identifier, tuple[L2.Identifier, bool]]
+
+
+def check_distinct(names: Sequence[L3.Identifier], kind: str) -> None:
+    counts = Counter(names)
+    duplicates = {name: count for name, count in counts.items() if count > 1}
+    if duplicates:
+        raise ValueError(f"duplicate {kind}: {duplicates}")
+
+
+@trampoline
+def front_end_term(
+    term: L3.Term,
+    context: Context,
+    fresh: Callable[[str], str],
+    check: bool = True,
+    new: Callable[..., Any] = trusted,
+) -> Steps[L2.Term]:
+    # check_term, uniqify_term and eliminate_letrec_term in one walk. Names come from fresh in the same order as
+    # uniqify_term takes them, so the result is the same as running the three in sequence.
+    _term = partial(front_end_term.steps, context=context, fresh=fresh, check=check, new=new)
+
+    match term:
+        case L3.Let(bindings=bindings, body=body):
+            if check:
+                check_distinct([name for name, _ in bindings], "binders")
+
+            new_values = yield each(_term(value) for _, value in bindings)
+            local = {name: (fresh(name), False) for name, _ in bindings}
+            return new(
+                L2.Let,
+                bindings=[(local[name][0], value) for (name, _), value in zip(bindings, new_values)],
+                body=(yield _term(body, context=extend(context, local))),
+            )
+
+        case L3.LetRec(bindings=bindings, body=body):
+            if check:
+                check_distinct([name for name, _ in bindings], "binders")
+
+            local = {name: (fresh(name), True) for name, _ in bindings}
+            new_context = extend(context, local)
+            effects = []
+            for name, value in bindings:
+                effects.append(
+                    new(
+                        L2.Store,
+                        base=new(L2.Reference, name=local[name][0]),
+                        index=0,
+                        value=(yield _term(value, context=new_context)),
+                    )
+                )
+            return new(
+                L2.Let,
+                bindings=[(local[name][0], new(L2.Allocate, count=1)) for name, _ in bindings],
+                body=new(L2.Begin, effects=effects, value=(yield _term(body, context=new_context))),
+            )
+
+        case L3.Reference(name=name):
+            if check and name not in context:
+                raise ValueError(f"unknown variable: {name}")
+
+            new_name, boxed = context[name]
+            if boxed:
+                return new(L2.Load, base=new(L2.Reference, name=new_name), index=0)
+            return new(L2.Reference, name=new_name)
+
+        case L3.Abstract(parameters=parameters, body=body):
+            if check:
+                check_distinct(parameters, "parameters")
+
+            local = {parameter: (fresh(parameter), False) for parameter in parameters}
+            return new(
+                L2.Abstract,
+                parameters=[local[parameter][0] for parameter in parameters],
+                body=(yield _term(body, context=extend(context, local))),
+            )
+
+        case L3.Apply(target=target, arguments=arguments):
+            return new(
+                L2.Apply,
+                target=(yield _term(target)),
+                arguments=(yield each(_term(argument) for argument in arguments)),
+            )
+
+        case L3.Immediate(value=value):
+            return new(L2.Immediate, value=value)
+
+        case L3.Primitive(operator=operator, left=left, right=right):
+            return new(
+                L2.Primitive,
+                operator=operator,
+                left=(yield _term(left)),
+                right=(yield _term(right)),
+            )
+
+        case L3.Branch(operator=operator, left=left, right=right, consequent=consequent, otherwise=otherwise):
+            return new(
+                L2.Branch,
+                operator=operator,
+                left=(yield _term(left)),
+                right=(yield _term(right)),
+                consequent=(yield _term(consequent)),
+                otherwise=(yield _term(otherwise)),
+            )
+
+        case L3.Allocate(count=count):
+            return new(L2.Allocate, count=count)
+
+        case L3.Load(base=base, index=index):
+            return new(L2.Load, base=(yield _term(base)), index=index)
+
+        case L3.Store(base=base, index=index, value=value):
+            return new(
+                L2.Store,
+                base=(yield _term(base)),
+                index=index,
+                value=(yield _term(value)),
+            )
+
+        case L3.Begin(effects=effects, value=value):
+            return new(
+                L2.Begin,
+                effects=(yield each(_term(effect) for effect in effects)),
+                value=(yield _term(value)),
+            )
+
+        case _:
+            raise TypeError(f"not an L3 term: {type(term)!r}")
+
+
+def front_end_program(
+    program: L3.Program,
+    check: bool = True,
+    new: Callable[..., Any] = trusted,
+) -> tuple[Callable[[str], str], L2.Program]:
+    fresh = SequentialNameGenerator()
+
+    match program:
+        case L3.Program(parameters=parameters, body=body):
+            if check:
+                check_distinct(parameters, "parameters")
+
+            local = {parameter: (fresh(parameter), False) for parameter in parameters}
+            return (
+                fresh,
+                new(
+                    L2.Program,
+                    parameters=[local[parameter][0] for parameter in parameters],
+                    body=front_end_term(body, local, fresh, check, new),
+                ),
+            )
+
+        case _:
+            raise TypeError(f"not an L3 program: {type(program)!r}")
@@ -0,0 +1,98 @@
+from bisect import bisect_left
+from typing import Any
+
+from .reader import Frame, build, read_frame
+from .syntax import Program
+
+
+class Document:
+    __slots__ = ("root", "source")
+
+    def __init__(self, source: str, root: Frame) -> None:
+        self.source = source
+        self.root = root
+
+    @property
+    def program(self) -> Program:
+        return self.root.items[0]
+
+
+def parse_document(source: str) -> Document:
+    return Document(source, read_frame(source, "program"))
+
+
+def replace_child(
+    parent: Frame,
+    position: int,
+    child: Frame,
+    value: Any,
+    delta: int,
+) -> Frame:
+    # Copies parent with its child at position replaced, leaving the previous document intact.
+    child.index = parent.children[position].index
+
+    frame = Frame(None, parent.start)
+    frame.head = parent.head
+    frame.operator = parent.operator
+    frame.shape = parent.shape
+    frame.rest = parent.rest
+    frame.length = parent.length + delta
+    frame.index = parent.index
+
+    frame.items = [*parent.items]
+    frame.items[child.index] = value
+    frame.children = [*parent.children]
+    frame.children[position] = child
+    frame.offsets = parent.offsets[: position + 1] + [offset + delta for offset in parent.offsets[position + 1 :]]
+
+    return frame
+
+
+def reparse_document(
+    document: Document,
+    offset: int,
+    removed: int,
+    inserted: str,
+) -> Document:
+    source = document.source
+    if not 0 <= offset <= offset + removed <= len(source):
+        raise ValueError(f"edit {offset}:{offset + removed} is outside of the document")
+
+    text = f"{source[:offset]}{inserted}{source[offset + removed :]}"
+    delta = len(inserted) - removed
+
+    # The forms whose parentheses strictly enclose the edit, outermost first, as (parent, position, start).
+    path: list[tuple[Frame, int, int]] = []
+    parent, base = document.root, 0
+    while parent.children:
+        position = bisect_left(parent.offsets, offset - base) - 1
+        if position < 0:
+            break
+
+        start = base + parent.offsets[position]
+        child = parent.children[position]
+        if offset + removed >= start + child.length:
+            break
+
+        path.append((parent, position, start))
+        parent, base = child, start
+
+    # Read the smallest enclosing form again, widening to its parent while the edit leaves it unbalanced.
+    for depth in reversed(range(len(path))):
+        parent, position, start = path[depth]
+        child = parent.children[position]
+
+        try:
+            root = read_frame(text[start : start + child.length + delta], parent.slot(child.index))
+        except ValueError:
+            continue
+
+        [frame], [value] = root.children, root.items
+        for parent, position, _start in reversed(path[1 : depth + 1]):
+            frame = replace_child(parent, position, frame, value, delta)
+            value = build(frame, validate=False)
+
+        parent, position, _start = path[0]
+        return Document(text, replace_child(parent, position, frame, value, delta))
+
+    return parse_document(text)
@@ -1,14 +1,14 @@
 from pathlib import Path
 
 import click
-from L1.to_python import to_ast_program
-from L2.cps_convert import cps_convert_program
-from L2.optimize import optimize_program
+from L1.to_python import to_pyc_program
+from L1.write_python import write_program
 
-from .check import check_program
-from .eliminate_letrec import eliminate_letrec_program
+from .batch import compile_files, expand_inputs
 from .parse import parse_program
-from .uniqify import uniqify_program
+from .pipeline import lower_program
+from .stats import Format, PassStats, format_stats, measure
+from .stream import lower_sources, read_sources, write_bundle, write_modules
 
 
 @click.command(
@@ -29,37 +29,141 @@ from .uniqify import uniqify_program
     show_default=True,
     help="Enable or disable optimization",
 )
+@click.option(
+    "--trampoline",
+    is_flag=True,
+    help="Return every call to a driver loop instead of making it, so deep recursion runs in constant stack",
+)
+@click.option(
+    "--pyc",
+    is_flag=True,
+    help="Write compiled bytecode that python runs and imports directly, instead of source",
+)
+@click.option(
+    "--time-passes",
+    "--stats",
+    "stats",
+    is_flag=True,
+    help=(
+        "Report the time, peak traced memory and IR nodes before and after each pass on stderr. "
+        "The front end then runs as separate check, uniqify and eliminate_letrec passes, so each is reported, and "
+        "tracing allocations slows the passes down"
+    ),
+)
+@click.option(
+    "--stats-format",
+    type=click.Choice(["text", "json"]),
+    default="text",
+    show_default=True,
+    help="Report --stats as a table or as JSON",
+)
+@click.option(
+    "--stream",
+    is_flag=True,
+    help="INPUT holds any number of concatenated programs, compiled one at a time as they are read",
+)
+@click.option(
+    "--bundle",
+    is_flag=True,
+    help="With --stream, write every program to a single module instead of one module per program",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="With several INPUTs, the worker processes to compile them on (0 for one per CPU)",
+)
 @click.option(
     "-o",
     "--output",
-    type=click.Path(writable=True, dir_okay=False, path_type=Path),
+    type=click.Path(writable=True, allow_dash=True, path_type=Path),
     default=None,
-    help="Output file (defaults to <INPUT>.py)",
-)
-@click.argument(
-    "input",
-    type=click.Path(exists=True, readable=True, dir_okay=False, path_type=Path),
+    help=(
+        "Output file (defaults to <INPUT>.py, or <INPUT>.pyc with --pyc, or stdout when INPUT is -). "
+        "With --stream but not --bundle, the directory for <INPUT>_<N>.py or .pyc (defaults to the directory of INPUT). "
+        "With several INPUTs, the directory for their outputs (defaults to the directory of each INPUT)"
+    ),
 )
+@click.argument("inputs", metavar="INPUT...", nargs=-1, required=True)
 def main(
     output: Path | None,
     check: bool,
     optimize: bool,
-    input: Path,
+    trampoline: bool,
+    pyc: bool,
+    stats: bool,
+    stats_format: Format,
+    stream: bool,
+    bundle: bool,
+    jobs: int,
+    inputs: tuple[str, ...],
 ) -> None:
-    l3 = parse_program(input.read_text())
+    # Several inputs, directories and patterns are compiled as a batch, one module per file.
+    if len(inputs) > 1 or not (inputs[0] == "-" or Path(inputs[0]).is_file()):
+        if stream or stats or bundle:
+            raise click.UsageError("--stream, --bundle and --stats compile a single INPUT")
+        if output == Path("-"):
+            raise click.UsageError("Several INPUTs are written to one module each, give --output a directory")
+        try:
+            sources = expand_inputs(inputs)
+        except ValueError as error:
+            raise click.BadParameter(str(error), param_hint="INPUT") from error
+
+        suffix = ".pyc" if pyc else ".py"
+        targets = [(output or source.parent) / source.with_suffix(suffix).name for source in sources]
+        if len(set(targets)) < len(targets):
+            raise click.UsageError(
+                "Several INPUTs would write the same output, give them different names or no --output"
+            )
+        if output:
+            output.mkdir(parents=True, exist_ok=True)
 
-    if check:
-        check_program(l3)
+        errors = compile_files(list(zip(sources, targets)), jobs, check, optimize, trampoline, pyc)
+        for source, error in zip(sources, errors):
+            if error is not None:
+                click.echo(f"{source}: {error}", err=True)
+        if any(error is not None for error in errors):
+            raise SystemExit(1)
+        return
 
-    fresh, l3 = uniqify_program(l3)
+    input = Path(inputs[0])
+    stdin = input == Path("-")
 
-    l2 = eliminate_letrec_program(l3)
+    if pyc and bundle:
+        raise click.UsageError("--pyc cannot be combined with --bundle")
+    if stats and stream:
+        raise click.UsageError("--stats cannot be combined with --stream")
+    if stream and not bundle and output == Path("-"):
+        raise click.UsageError("--stream writes one module per program to a directory, use --bundle to write to stdout")
 
-    if optimize:
-        l2 = optimize_program(l2)
+    passes: list[PassStats] | None = [] if stats else None
 
-    l1 = cps_convert_program(l2, fresh)
+    with click.open_file(str(input)) as source:
+        if stream and not bundle:
+            directory = output or (Path.cwd() if stdin else input.parent)
+            directory.mkdir(parents=True, exist_ok=True)
+            programs = lower_sources(read_sources(source), check, optimize)
+            write_modules(programs, directory, "stdin" if stdin else input.stem, trampoline, pyc)
+            return
 
-    module = to_ast_program(l1)
+        if pyc:
+            target = output or (Path("-") if stdin else input.with_suffix(".pyc"))
+            program = lower_program(measure(passes, "parse", parse_program, source.read()), check, optimize, passes)
+            with click.open_file(str(target), "wb", lazy=True) as module:
+                module.write(measure(passes, "codegen", to_pyc_program, program, trampoline, str(target)))
+        else:
+            # Opened lazily so that a failed compile leaves any existing output untouched.
+            target = output or (Path("-") if stdin else input.with_suffix(".py"))
+            with click.open_file(str(target), "w", lazy=True) as module:
+                if stream:
+                    write_bundle(lower_sources(read_sources(source), check, optimize), module, trampoline)
+                else:
+                    program = lower_program(
+                        measure(passes, "parse", parse_program, source.read()), check, optimize, passes
+                    )
+                    measure(passes, "codegen", write_program, program, module, trampoline)
 
-    (output or input.with_suffix(".py")).write_text(module)
+    if passes is not None:
+        click.echo(format_stats(passes, stats_format), err=True)
@@ -1,9 +1,12 @@
 from collections.abc import Sequence
 from pathlib import Path
+from threading import Lock
+from typing import Literal
 
 from lark import Lark, Token, Transformer
 from lark.visitors import v_args  # pyright: ignore[reportUnknownVariableType]
 
+from .reader import read_program, read_term
 from .syntax import (
     Abstract,
     Allocate,
@@ -157,15 +160,45 @@ class AstTransformer(Transformer[Token, Program | Term]):
         return Begin(effects=effects, value=value)
 
 
-def parse_term(source: str) -> Term:
-    grammar = Path(__file__).with_name("L3.lark").read_text()
-    parser = Lark(grammar, start="term", parser="lalr")
-    tree = parser.parse(source)  # pyright: ignore[reportUnknownMemberType]
-    return AstTransformer().transform(tree)  # pyright: ignore[reportReturnType]
+type Start = Literal["program", "term"]
 
+# "tree" builds a lark parse tree and then transforms it; "inline" runs the AstTransformer callbacks during the
+# LALR reductions instead, so no parse tree is ever built. "reader" skips lark entirely and uses the explicit-stack
+# reader in L3.reader, which handles arbitrarily deep nesting.
+type LarkMode = Literal["tree", "inline"]
+type Mode = LarkMode | Literal["reader"]
 
-def parse_program(source: str) -> Program:
-    grammar = Path(__file__).with_name("L3.lark").read_text()
-    parser = Lark(grammar, start="program", parser="lalr")
-    tree = parser.parse(source)  # pyright: ignore[reportUnknownMemberType]
-    return AstTransformer().transform(tree)  # pyright: ignore[reportReturnType]
+_GRAMMAR = Path(__file__).with_name("L3.lark")
+
+_parsers: dict[tuple[Start, LarkMode], Lark] = {}
+_parsers_lock = Lock()
+
+
+def get_parser(start: Start, mode: LarkMode = "tree") -> Lark:
+    with _parsers_lock:
+        if (start, mode) not in _parsers:
+            transformer = AstTransformer() if mode == "inline" else None
+            # cache=True stores the analyzed grammar on disk, keyed by a hash of the grammar text.
+            _parsers[start, mode] = Lark(
+                _GRAMMAR.read_text(), start=start, parser="lalr", cache=True, transformer=transformer
+            )
+        return _parsers[start, mode]
+
+
+def _parse(source: str, start: Start, mode: LarkMode) -> Program | Term:
+    result = get_parser(start, mode).parse(source)  # pyright: ignore[reportUnknownMemberType]
+    if mode == "tree":
+        return AstTransformer().transform(result)
+    return result  # pyright: ignore[reportReturnType]
+
+
+def parse_term(source: str, mode: Mode = "tree") -> Term:
+    if mode == "reader":
+        return read_term(source)
+    return _parse(source, "term", mode)  # pyright: ignore[reportReturnType]
+
+
+def parse_program(source: str, mode: Mode = "tree") -> Program:
+    if mode == "reader":
+        return read_program(source)
+    return _parse(source, "program", mode)  # pyright: ignore[reportReturnType]
@@ -0,0 +1,58 @@
+import ast
+import types
+from collections.abc import Callable
+
+from L1 import compact
+from L1 import syntax as L1
+from L1.to_python import to_ast_function
+from L2.cps_convert import cps_convert_program
+from L2.optimize import interner, optimize_program
+
+from .check import check_program
+from .eliminate_letrec import eliminate_letrec_program
+from .front_end import front_end_program
+from .parse import parse_program
+from .stats import PassStats, measure
+from .syntax import Program
+from .uniqify import uniqify_program
+
+
+def lower_program(
+    program: Program,
+    check: bool = True,
+    optimize: bool = True,
+    stats: list[PassStats] | None = None,
+) -> L1.Program:
+    # The L2 program is built by the interner the optimizer builds with, so all of its nodes are interned.
+    intern = interner()
+    if stats is None:
+        fresh, l2 = front_end_program(program, check, intern)
+    else:
+        # The fused front end is run as the passes it fuses, which return the same program, so each is reported.
+        if check:
+            measure(stats, "check", check_program, program)
+        fresh, l3 = measure(stats, "uniqify", uniqify_program, program)
+        l2 = measure(stats, "eliminate_letrec", eliminate_letrec_program, l3, intern)
+
+    if optimize:
+        l2 = measure(stats, "optimize", optimize_program, l2, intern)
+
+    # The L1 program is the largest of the pipeline, so it is built compact. Its passes match compact nodes too.
+    return measure(stats, "cps_convert", cps_convert_program, l2, fresh, compact.new)
+
+
+def compile_program(
+    source: str,
+    check: bool = True,
+    optimize: bool = True,
+    trampoline: bool = False,
+) -> Callable[..., int]:
+    # Compiles the syntax tree of the function directly instead of unparsing it to source and parsing that again.
+    module = ast.Module(body=[to_ast_function(lower_program(parse_program(source), check, optimize), "l3", trampoline)])
+    ast.fix_missing_locations(module)
+
+    # The module only defines the function, so the function is made from its code object without running the module.
+    code = next(
+        constant for constant in compile(module, "<l3>", "exec").co_consts if isinstance(constant, types.CodeType)
+    )
+    return types.FunctionType(code, {})
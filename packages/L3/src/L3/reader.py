@@ -0,0 +1,268 @@
+import re
+from typing import Any
+
+from pydantic import BaseModel
+from util.trusted import trusted
+
+from .syntax import (
+    Abstract,
+    Allocate,
+    Apply,
+    Begin,
+    Branch,
+    Immediate,
+    Let,
+    LetRec,
+    Load,
+    Primitive,
+    Program,
+    Reference,
+    Store,
+    Term,
+)
+
+# The same tokens as L3.lark. Keywords are recognized from identifiers, and only in the head position of a form.
+TOKEN = re.compile(
+    r"""
+    (?P<space>\s+)
+    | (?P<open>\()
+    | (?P<close>\))
+    | (?P<integer>0|[1-9][0-9]*)
+    | (?P<identifier>[a-zA-Z_][a-zA-Z0-9_]*)
+    | (?P<symbol>==|<|\+|-|\*|\\|λ)
+    """,
+    re.VERBOSE,
+)
+
+HEADS = {
+    "let": "let",
+    "letrec": "letrec",
+    "lambda": "lambda",
+    "\\": "lambda",
+    "λ": "lambda",
+    "if": "if",
+    "allocate": "allocate",
+    "load": "load",
+    "store": "store",
+    "begin": "begin",
+    "+": "primitive",
+    "-": "primitive",
+    "*": "primitive",
+}
+
+# The slots each form expects after its head, and the slot that may repeat after those.
+SHAPES: dict[str, tuple[tuple[str, ...], str | None]] = {
+    "root": ((), None),
+    "program": (("l3", "parameters", "term"), None),
+    "parameters": ((), "identifier"),
+    "bindings": ((), "binding"),
+    "binding": (("identifier", "term"), None),
+    "comparison": (("operator", "term", "term"), None),
+    "let": (("bindings", "term"), None),
+    "letrec": (("bindings", "term"), None),
+    "lambda": (("parameters", "term"), None),
+    "if": (("comparison", "term", "term"), None),
+    "allocate": (("integer",), None),
+    "load": (("term", "integer"), None),
+    "store": (("term", "integer", "term"), None),
+    "begin": (("term",), "term"),
+    "primitive": (("term", "term"), None),
+    "apply": (("term",), "term"),
+}
+
+# Slots that are filled by a parenthesized list rather than a term.
+LISTS = {"program", "parameters", "bindings", "binding", "comparison"}
+
+
+class Frame:
+    __slots__ = ("children", "head", "index", "items", "length", "offsets", "operator", "rest", "shape", "start")
+
+    def __init__(self, head: str | None, start: int) -> None:
+        self.head: str | None = None
+        self.operator: str | None = None
+        self.shape: tuple[str, ...] = ()
+        self.rest: str | None = None
+        self.items: list[Any] = []
+        # The span of the form in the text it was read from, and where it sits in its parent.
+        self.start = start
+        self.length = 0
+        self.index = 0
+        # The nested forms, with their offsets relative to this form so that edits elsewhere never invalidate them.
+        self.children: list[Frame] = []
+        self.offsets: list[int] = []
+        if head is not None:
+            self.set_head(head)
+
+    def set_head(self, head: str) -> None:
+        self.head = head
+        self.shape, self.rest = SHAPES[head]
+
+    def slot(self, index: int) -> str | None:
+        if index < len(self.shape):
+            return self.shape[index]
+        return self.rest
+
+    def expected(self) -> str | None:
+        return self.slot(len(self.items))
+
+
+def validated[T: BaseModel](cls: type[T], **fields: Any) -> T:
+    return cls(**fields)
+
+
+def build(frame: Frame, validate: bool = True) -> Any:
+    # Without validation, the items must already be valid syntax, e.g. when rebuilding a form around a changed child.
+    items = frame.items
+    new = validated if validate else trusted
+
+    match frame.head:
+        case "program":
+            _l3, parameters, body = items
+            return new(Program, parameters=parameters, body=body)
+
+        case "parameters" | "bindings" | "comparison":
+            return items
+
+        case "binding":
+            name, value = items
+            return (name, value)
+
+        case "let":
+            bindings, body = items
+            return new(Let, bindings=bindings, body=body)
+
+        case "letrec":
+            bindings, body = items
+            return new(LetRec, bindings=bindings, body=body)
+
+        case "lambda":
+            parameters, body = items
+            return new(Abstract, parameters=parameters, body=body)
+
+        case "if":
+            [operator, left, right], consequent, otherwise = items
+            return new(Branch, operator=operator, left=left, right=right, consequent=consequent, otherwise=otherwise)
+
+        case "allocate":
+            [count] = items
+            return new(Allocate, count=count)
+
+        case "load":
+            base, index = items
+            return new(Load, base=base, index=index)
+
+        case "store":
+            base, index, value = items
+            return new(Store, base=base, index=index, value=value)
+
+        case "begin":
+            *effects, value = items
+            return new(Begin, effects=effects, value=value)
+
+        case "primitive":
+            left, right = items
+            return new(Primitive, operator=frame.operator, left=left, right=right)
+
+        case "apply":  # pragma: no branch
+            target, *arguments = items
+            return new(Apply, target=target, arguments=arguments)
+
+
+def atom(kind: str | None, text: str, slot: str | None) -> Any:
+    match slot, kind:
+        case "term", "identifier":
+            return Reference(name=text)
+
+        case "term", "integer":
+            return Immediate(value=int(text))
+
+        case "integer", "integer":
+            return int(text)
+
+        case "identifier", "identifier":
+            return text
+
+        case "l3", "identifier" if text == "l3":
+            return text
+
+        case "operator", "symbol" if text in ("<", "=="):
+            return text
+
+        case _:
+            return None
+
+
+def read_frame(source: str, slot: str) -> Frame:
+    root = Frame("root", 0)
+    root.shape = (slot,)
+    stack = [root]
+
+    position = 0
+    while position < len(source):
+        token = TOKEN.match(source, position)
+        if token is None:
+            raise ValueError(f"unexpected character {source[position]!r} at offset {position}")
+
+        kind = token.lastgroup
+        text = token.group()
+        start, position = position, token.end()
+        frame = stack[-1]
+
+        match kind:
+            case "space":
+                pass
+
+            case "open":
+                if frame.head is None:
+                    frame.set_head("apply")
+
+                expected = frame.expected()
+                if expected == "term":
+                    stack.append(Frame(None, start))
+                elif expected in LISTS:
+                    stack.append(Frame(expected, start))
+                else:
+                    raise ValueError(f"unexpected '(' at offset {start}")
+
+            case "close":
+                if frame is root or frame.head is None or len(frame.items) < len(frame.shape):
+                    raise ValueError(f"unexpected ')' at offset {start}")
+
+                stack.pop()
+                parent = stack[-1]
+                frame.length = position - frame.start
+                frame.index = len(parent.items)
+                parent.children.append(frame)
+                parent.offsets.append(frame.start - parent.start)
+                parent.items.append(build(frame))
+
+            case _:
+                if frame.head is None:
+                    if text in HEADS:
+                        frame.set_head(HEADS[text])
+                        frame.operator = text
+                        continue
+                    frame.set_head("apply")
+
+                value = atom(kind, text, frame.expected())
+                if value is None:
+                    raise ValueError(f"unexpected {text!r} at offset {start}")
+                frame.items.append(value)
+
+    if len(stack) > 1 or not root.items:
+        raise ValueError("unexpected end of input")
+
+    root.length = len(source)
+    return root
+
+
+def read(source: str, slot: str) -> Any:
+    return read_frame(source, slot).items[0]
+
+
+def read_term(source: str) -> Term:
+    return read(source, "term")
+
+
+def read_program(source: str) -> Program:
+    return read(source, "program")
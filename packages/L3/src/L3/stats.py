@@ -0,0 +1,108 @@
+import json
+import time
+import tracemalloc
+from collections.abc import Callable, Sequence
+from dataclasses import fields, is_dataclass
+from typing import Any, Literal
+
+from pydantic import BaseModel
+
+type Format = Literal["text", "json"]
+
+
+class PassStats(BaseModel, frozen=True):
+    name: str
+    seconds: float
+    peak: int
+    nodes_before: int | None
+    nodes_after: int | None
+
+
+def count(
+    root: BaseModel,
+) -> int:
+    # With an explicit stack, since statement chains are far deeper than the recursion limit.
+    total = 0
+    stack: list[Any] = [root]
+    while stack:
+        value = stack.pop()
+        # Compact nodes are dataclasses registered as virtual subclasses of their model, so they are checked first.
+        if is_dataclass(value):
+            total += 1
+            stack.extend(getattr(value, field.name) for field in fields(value))
+        elif isinstance(value, BaseModel):
+            total += 1
+            stack.extend(getattr(value, name) for name in type(value).model_fields)
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return total
+
+
+def nodes(
+    value: Any,
+) -> int | None:
+    # A pass takes and returns a program, sometimes alongside its name generator. Source text and output have no nodes.
+    match value:
+        case BaseModel():
+            return count(value)
+
+        case (_, BaseModel() as program):
+            return count(program)
+
+        case _:
+            return None
+
+
+def measure[T](
+    stats: list[PassStats] | None,
+    name: str,
+    function: Callable[..., T],
+    *arguments: Any,
+) -> T:
+    if stats is None:
+        return function(*arguments)
+
+    # Allocations are traced while the pass runs, which slows it down, so times are only comparable with each other.
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    current, _ = tracemalloc.get_traced_memory()
+
+    start = time.perf_counter()
+    result = function(*arguments)
+    seconds = time.perf_counter() - start
+
+    _, peak = tracemalloc.get_traced_memory()
+    if started:
+        tracemalloc.stop()
+
+    stats.append(
+        PassStats(
+            name=name,
+            seconds=seconds,
+            peak=peak - current,
+            nodes_before=nodes(arguments[0]),
+            nodes_after=nodes(result),
+        )
+    )
+    return result
+
+
+def format_stats(
+    stats: Sequence[PassStats],
+    format: Format = "text",
+) -> str:
+    if format == "json":
+        return json.dumps([entry.model_dump() for entry in stats], indent=2)
+
+    def column(value: int | None) -> str:
+        return "-" if value is None else str(value)
+
+    lines = [f"{'pass':>12}  {'time':>10}  {'peak':>10}  {'nodes before':>12}  {'nodes after':>12}"]
+    for entry in stats:
+        lines.append(
+            f"{entry.name:>12}  {entry.seconds:9.4f}s  {entry.peak / 2**20:8.2f}MB"
+            f"  {column(entry.nodes_before):>12}  {column(entry.nodes_after):>12}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,97 @@
+import re
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import TextIO
+
+from L1 import syntax as L1
+from L1.to_python import to_pyc_program
+from L1.write_python import write_function, write_program
+
+from .parse import parse_program
+from .pipeline import lower_program
+
+PARENTHESES = re.compile(r"[()]")
+
+BUNDLE_MAIN = """\
+if __name__ == '__main__':
+    import sys
+    print(globals()[f'program_{sys.argv[1]}'](*map(int, sys.argv[2:])))
+"""
+
+
+def read_sources(
+    stream: TextIO,
+    size: int = 1 << 16,
+) -> Iterator[str]:
+    # Splits concatenated top-level forms by tracking parenthesis depth, so only the form being read is held in memory.
+    pieces: list[str] = []
+    depth = 0
+
+    while chunk := stream.read(size):
+        start = 0
+        position = 0
+
+        for match in PARENTHESES.finditer(chunk):
+            if depth == 0:
+                if chunk[position : match.start()].strip() or match.group() == ")":
+                    raise ValueError(f"unexpected text between programs: {chunk[position : match.end()]!r}")
+                start = match.start()
+
+            depth += 1 if match.group() == "(" else -1
+            position = match.end()
+
+            if depth == 0:
+                pieces.append(chunk[start:position])
+                yield "".join(pieces)
+                pieces.clear()
+
+        if depth > 0:
+            pieces.append(chunk[start:])
+        elif chunk[position:].strip():
+            raise ValueError(f"unexpected text between programs: {chunk[position:]!r}")
+
+    if depth > 0:
+        raise ValueError("unterminated program at end of input")
+
+
+def lower_sources(
+    sources: Iterable[str],
+    check: bool = True,
+    optimize: bool = True,
+) -> Iterator[L1.Program]:
+    for source in sources:
+        yield lower_program(parse_program(source), check, optimize)
+
+
+def write_modules(
+    programs: Iterable[L1.Program],
+    directory: Path,
+    stem: str,
+    trampoline: bool = False,
+    pyc: bool = False,
+) -> int:
+    count = 0
+    for program in programs:
+        if pyc:
+            path = directory / f"{stem}_{count}.pyc"
+            path.write_bytes(to_pyc_program(program, trampoline, str(path)))
+        else:
+            with (directory / f"{stem}_{count}.py").open("w") as module:
+                write_program(program, module, trampoline)
+        count += 1
+    return count
+
+
+def write_bundle(
+    programs: Iterable[L1.Program],
+    output: TextIO,
+    trampoline: bool = False,
+) -> int:
+    count = 0
+    for program in programs:
+        write_function(program, output, f"program_{count}", trampoline)
+        output.write("\n\n")
+        count += 1
+
+    output.write(BUNDLE_MAIN)
+    return count
@@ -1,14 +1,15 @@
 from collections.abc import Sequence
 from typing import Annotated, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import Field
+from util.node import Node
 
 type Identifier = Annotated[str, Field(min_length=1)]
 
 type Nat = Annotated[int, Field(ge=0)]
 
 
-class Program(BaseModel, frozen=True):
+class Program(Node, frozen=True):
     tag: Literal["l3"] = "l3"
     parameters: Sequence[Identifier]
     body: Term
@@ -20,48 +21,48 @@ type Term = Annotated[
 ]
 
 
-class Let(BaseModel, frozen=True):
+class Let(Node, frozen=True):
     tag: Literal["let"] = "let"
     bindings: Sequence[tuple[Identifier, Term]]
     body: Term
 
 
-class LetRec(BaseModel, frozen=True):
+class LetRec(Node, frozen=True):
     tag: Literal["letrec"] = "letrec"
     bindings: Sequence[tuple[Identifier, Term]]
     body: Term
 
 
-class Reference(BaseModel, frozen=True):
+class Reference(Node, frozen=True):
     tag: Literal["reference"] = "reference"
     name: Identifier
 
 
-class Abstract(BaseModel, frozen=True):
+class Abstract(Node, frozen=True):
     tag: Literal["abstract"] = "abstract"
     parameters: Sequence[Identifier]
     body: Term
 
 
-class Apply(BaseModel, frozen=True):
+class Apply(Node, frozen=True):
     tag: Literal["apply"] = "apply"
     target: Term
     arguments: Sequence[Term]
 
 
-class Immediate(BaseModel, frozen=True):
+class Immediate(Node, frozen=True):
     tag: Literal["immediate"] = "immediate"
     value: int
 
 
-class Primitive(BaseModel, frozen=True):
+class Primitive(Node, frozen=True):
     tag: Literal["primitive"] = "primitive"
     operator: Literal["+", "-", "*"]
     left: Term
     right: Term
 
 
-class Branch(BaseModel, frozen=True):
+class Branch(Node, frozen=True):
     tag: Literal["branch"] = "branch"
     operator: Literal["<", "=="]
     left: Term
@@ -70,25 +71,25 @@ class Branch(BaseModel, frozen=True):
     otherwise: Term
 
 
-class Allocate(BaseModel, frozen=True):
+class Allocate(Node, frozen=True):
     tag: Literal["allocate"] = "allocate"
     count: Nat
 
 
-class Load(BaseModel, frozen=True):
+class Load(Node, frozen=True):
     tag: Literal["load"] = "load"
     base: Term
     index: Nat
 
 
-class Store(BaseModel, frozen=True):
+class Store(Node, frozen=True):
     tag: Literal["store"] = "store"
     base: Term
     index: Nat
     value: Term
 
 
-class Begin(BaseModel, frozen=True):
+class Begin(Node, frozen=True):
     tag: Literal["begin"] = "begin"
     effects: Sequence[Term]
     value: Term
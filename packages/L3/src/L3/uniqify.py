@@ -1,7 +1,10 @@
 from collections.abc import Callable, Mapping
 from functools import partial
 
+from util.persistent_map import extend
 from util.sequential_name_generator import SequentialNameGenerator
+from util.trampoline import Steps, each, trampoline
+from util.trusted import trusted
 
 from .syntax import (
     Abstract,
@@ -23,78 +26,89 @@ from .syntax import (
 type Context = Mapping[str, str]
 
 
+@trampoline
 def uniqify_term(
     term: Term,
     context: Context,
     fresh: Callable[[str], str],
-) -> Term:
-    _term = partial(uniqify_term, context=context, fresh=fresh)
+) -> Steps[Term]:
+    _term = partial(uniqify_term.steps, context=context, fresh=fresh)
 
     match term:
         case Let(bindings=bindings, body=body):
-            new_values = [_term(value) for _, value in bindings]
+            new_values = yield each(_term(value) for _, value in bindings)
             local = {name: fresh(name) for name, _ in bindings}
-            new_context = {**context, **local}
-            return Let(
+            new_context = extend(context, local)
+            return trusted(
+                Let,
                 bindings=[(local[name], value) for (name, _), value in zip(bindings, new_values)],
-                body=uniqify_term(body, new_context, fresh),
+                body=(yield uniqify_term.steps(body, new_context, fresh)),
             )
 
         case LetRec(bindings=bindings, body=body):
             local = {name: fresh(name) for name, _ in bindings}
-            new_context = {**context, **local}
-            return LetRec(
-                bindings=[(local[name], uniqify_term(value, new_context, fresh)) for name, value in bindings],
-                body=uniqify_term(body, new_context, fresh),
+            new_context = extend(context, local)
+            new_values = yield each(uniqify_term.steps(value, new_context, fresh) for _, value in bindings)
+            return trusted(
+                LetRec,
+                bindings=[(local[name], value) for (name, _), value in zip(bindings, new_values)],
+                body=(yield uniqify_term.steps(body, new_context, fresh)),
             )
 
         case Reference(name=name):
-            return Reference(name=context[name])
+            return trusted(Reference, name=context[name])
 
         case Abstract(parameters=parameters, body=body):
             local = {param: fresh(param) for param in parameters}
-            new_context = {**context, **local}
-            return Abstract(
+            new_context = extend(context, local)
+            return trusted(
+                Abstract,
                 parameters=[local[param] for param in parameters],
-                body=uniqify_term(body, new_context, fresh),
+                body=(yield uniqify_term.steps(body, new_context, fresh)),
             )
 
         case Apply(target=target, arguments=arguments):
-            return Apply(
-                target=_term(target),
-                arguments=[_term(arg) for arg in arguments],
+            return trusted(
+                Apply,
+                target=(yield _term(target)),
+                arguments=(yield each(_term(arg) for arg in arguments)),
             )
 
         case Immediate():
             return term
 
         case Primitive(operator=operator, left=left, right=right):
-            return Primitive(operator=operator, left=_term(left), right=_term(right))
+            return trusted(Primitive, operator=operator, left=(yield _term(left)), right=(yield _term(right)))
 
         case Branch(operator=operator, left=left, right=right, consequent=consequent, otherwise=otherwise):
-            return Branch(
+            return trusted(
+                Branch,
                 operator=operator,
-                left=_term(left),
-                right=_term(right),
-                consequent=_term(consequent),
-                otherwise=_term(otherwise),
+                left=(yield _term(left)),
+                right=(yield _term(right)),
+                consequent=(yield _term(consequent)),
+                otherwise=(yield _term(otherwise)),
             )
 
         case Allocate():
             return term
 
         case Load(base=base, index=index):
-            return Load(base=_term(base), index=index)
+            return trusted(Load, base=(yield _term(base)), index=index)
 
         case Store(base=base, index=index, value=value):
-            return Store(base=_term(base), index=index, value=_term(value))
+            return trusted(Store, base=(yield _term(base)), index=index, value=(yield _term(value)))
 
-        case Begin(effects=effects, value=value):  # pragma: no branch
-            return Begin(
-                effects=[_term(effect) for effect in effects],
-                value=_term(value),
+        case Begin(effects=effects, value=value):
+            return trusted(
+                Begin,
+                effects=(yield each(_term(effect) for effect in effects)),
+                value=(yield _term(value)),
             )
 
+        case _:
+            raise TypeError(f"not an L3 term: {type(term)!r}")
+
 
 def uniqify_program(
     program: Program,
@@ -104,12 +118,16 @@ def uniqify_program(
     _term = partial(uniqify_term, fresh=fresh)
 
     match program:
-        case Program(parameters=parameters, body=body):  # pragma: no branch
+        case Program(parameters=parameters, body=body):
             local = {parameter: fresh(parameter) for parameter in parameters}
             return (
                 fresh,
-                Program(
+                trusted(
+                    Program,
                     parameters=[local[parameter] for parameter in parameters],
                     body=_term(body, local),
                 ),
             )
+
+        case _:
+            raise TypeError(f"not an L3 program: {type(program)!r}")
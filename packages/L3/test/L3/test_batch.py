@@ -0,0 +1,97 @@
+import runpy
+from pathlib import Path
+
+import pytest
+from L3.batch import compile_file, compile_files, expand_inputs, warm
+
+SOURCES = {
+    "add.l3": "(l3 (x y) (+ x y))",
+    "loop.l3": "(l3 (n) (letrec ((f (\\ (i) (if (< i 1) i (f (- i 1)))))) (f n)))",
+    "unbound.l3": "(l3 () x)",
+    "syntax.l3": "(l3 (x)",
+}
+
+
+def write_sources(directory: Path) -> list[Path]:
+    (directory / "nested").mkdir()
+    paths = [directory / "add.l3", directory / "nested" / "loop.l3"]
+    for path in paths:
+        path.write_text(SOURCES[path.name])
+    (directory / "notes.txt").write_text("")
+    return paths
+
+
+def test_expand_inputs(tmp_path: Path):
+    add, loop = write_sources(tmp_path)
+
+    assert expand_inputs([str(tmp_path)]) == [add, loop]
+    assert expand_inputs([str(tmp_path / "**" / "*.l3")]) == [add, loop]
+    assert expand_inputs([str(loop), str(tmp_path)]) == [loop, add]
+    assert expand_inputs([str(add), str(add)]) == [add]
+
+
+@pytest.mark.parametrize("input", ["missing.l3", "*.missing"])
+def test_expand_inputs_missing(tmp_path: Path, input: str):
+    with pytest.raises(ValueError):
+        expand_inputs([str(tmp_path / input)])
+
+
+@pytest.mark.parametrize("name", ["unbound.l3", "syntax.l3", "missing.l3"])
+def test_compile_file_failure(tmp_path: Path, name: str):
+    source = tmp_path / name
+    if name in SOURCES:
+        source.write_text(SOURCES[name])
+
+    error = compile_file(source, tmp_path / "module.py")
+
+    assert error is not None
+    assert not (tmp_path / "module.py").exists()
+
+
+@pytest.mark.parametrize("pyc", [False, True])
+@pytest.mark.parametrize("jobs", [1, 2, 0])
+def test_compile_files(tmp_path: Path, jobs: int, pyc: bool):
+    suffix = ".pyc" if pyc else ".py"
+    files = [(tmp_path / name, tmp_path / f"{Path(name).stem}{suffix}") for name in SOURCES]
+    for source, _ in files:
+        source.write_text(SOURCES[source.name])
+
+    errors = compile_files(files, jobs, pyc=pyc, trampoline=True)
+
+    assert [error is None for error in errors] == [True, True, False, False]
+    assert runpy.run_path(str(tmp_path / f"add{suffix}"))["l1"](1, 2) == 3
+    assert runpy.run_path(str(tmp_path / f"loop{suffix}"))["l1"](10) == 0
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_compile_files_unchecked(tmp_path: Path, jobs: int):
+    # Without checking, an unbound variable fails inside a pass rather than with a ValueError.
+    files = [(tmp_path / "bad.l3", tmp_path / "bad.py"), (tmp_path / "add.l3", tmp_path / "add.py")]
+    files[0][0].write_text("(l3 () (+ x 1))")
+    files[1][0].write_text(SOURCES["add.l3"])
+
+    errors = compile_files(files, jobs, check=False)
+
+    assert errors[0] is not None and errors[0].startswith("KeyError")
+    assert errors[1] is None
+    assert runpy.run_path(str(tmp_path / "add.py"))["l1"](1, 2) == 3
+
+
+def test_compile_files_deterministic(tmp_path: Path):
+    # The same output whether the files are compiled in this process or spread over workers.
+    outputs: dict[int, list[str]] = {}
+    for jobs in (1, 2):
+        directory = tmp_path / str(jobs)
+        directory.mkdir()
+        files = [(directory / f"{i}.l3", directory / f"{i}.py") for i in range(8)]
+        for i, (source, _) in enumerate(files):
+            source.write_text(f"(l3 (x) (let ((y {i})) (+ x y)))")
+
+        assert compile_files(files, jobs) == [None] * len(files)
+        outputs[jobs] = [target.read_text() for _, target in files]
+
+    assert outputs[1] == outputs[2]
+
+
+def test_warm():
+    warm()
@@ -14,6 +14,7 @@ from L3.syntax import (
     Program,
     Reference,
     Store,
+    Term,
 )
 
 
@@ -564,3 +565,14 @@ def test_check_program_empty_parameters():
     program = Program(parameters=[], body=Immediate(value=0))
 
     check_program(program)
+
+
+def test_check_program_deep_let():
+    depth = 100_000
+    body: Term = Reference(name="x")
+    for _ in range(depth):
+        body = Let(
+            bindings=[("x", Primitive(operator="+", left=Reference(name="x"), right=Immediate(value=1)))], body=body
+        )
+
+    check_program(Program(parameters=["x"], body=body))
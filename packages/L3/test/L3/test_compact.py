@@ -0,0 +1,71 @@
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from L2.to_python import to_ast_program as to_ast_l2_program
+from L3 import compact
+from L3.check import check_program, check_term
+from L3.eliminate_letrec import eliminate_letrec_program, eliminate_letrec_term
+from L3.front_end import front_end_program, front_end_term
+from L3.parse import parse_program
+from L3.pipeline import lower_program
+from L3.to_python import to_ast_module, to_ast_program, to_ast_term
+from L3.uniqify import uniqify_program, uniqify_term
+from util.sequential_name_generator import SequentialNameGenerator
+
+
+def test_compact_round_trip():
+    program = parse_program(
+        "(l3 (x) (let ((f (\\ (y) y)) (m (allocate 1)))"
+        " (letrec ((g (\\ (n) (g n))))"
+        " (begin (store m 0 1) (if (< (load m 0) x) (f x) (* x 2))))))"
+    )
+
+    actual = compact.to_compact(program)
+
+    match actual:
+        case compact.Program(
+            parameters=("x",),
+            body=compact.Let(bindings=(("f", compact.Abstract()), _), body=compact.LetRec(bindings=(("g", _),))),
+        ):
+            pass
+
+        case _:  # pragma: no cover
+            raise AssertionError(actual)
+
+    assert compact.from_compact(actual) == program
+
+
+def test_passes_match_compact():
+    program = parse_program("(l3 (x) (letrec ((f (\\ (n) (if (< n 1) x (f (- n 1)))))) (let ((y x)) (f y))))")
+    actual = compact.to_compact(program)
+
+    check_program(actual)
+    assert to_ast_program(uniqify_program(actual)[1]) == to_ast_program(uniqify_program(program)[1])
+    assert to_ast_l2_program(eliminate_letrec_program(actual)) == to_ast_l2_program(eliminate_letrec_program(program))
+    assert to_ast_l2_program(front_end_program(actual)[1]) == to_ast_l2_program(front_end_program(program)[1])
+    assert lower_program(actual) == lower_program(program)
+
+
+# Anything else falls through every case of a pass.
+UNKNOWN: Any = object()
+
+
+@pytest.mark.parametrize(
+    "run",
+    [
+        lambda: check_program(UNKNOWN),
+        lambda: check_term(UNKNOWN, {}),
+        lambda: uniqify_program(UNKNOWN),
+        lambda: uniqify_term(UNKNOWN, {}, SequentialNameGenerator()),
+        lambda: eliminate_letrec_program(UNKNOWN),
+        lambda: eliminate_letrec_term(UNKNOWN, {}),
+        lambda: front_end_program(UNKNOWN),
+        lambda: front_end_term(UNKNOWN, {}, SequentialNameGenerator()),
+        lambda: to_ast_module(UNKNOWN),
+        lambda: to_ast_term(UNKNOWN),
+    ],
+)
+def test_passes_reject_unknown(run: Callable[[], object]):
+    with pytest.raises(TypeError):
+        run()
@@ -680,3 +680,22 @@ def test_eliminate_letrec_program_with_params():
     actual = eliminate_letrec_program(program)
 
     assert actual == expected
+
+
+def test_eliminate_letrec_program_deep_letrec():
+    depth = 100_000
+    body: L3.Term = L3.Reference(name="f")
+    for _ in range(depth):
+        body = L3.LetRec(bindings=[("f", L3.Abstract(parameters=[], body=L3.Reference(name="f")))], body=body)
+
+    program = eliminate_letrec_program(L3.Program(parameters=[], body=body))
+
+    term = program.body
+    for _ in range(depth):
+        assert isinstance(term, L2.Let)
+        assert isinstance(term.body, L2.Begin)
+        [store] = term.body.effects
+        assert isinstance(store, L2.Store)
+        assert store.value == L2.Abstract(parameters=[], body=L2.Load(base=L2.Reference(name="f"), index=0))
+        term = term.body.value
+    assert term == L2.Load(base=L2.Reference(name="f"), index=0)
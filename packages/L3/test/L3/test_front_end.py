@@ -0,0 +1,90 @@
+import pytest
+from L2 import syntax as L2
+from L3.check import check_program
+from L3.eliminate_letrec import eliminate_letrec_program
+from L3.front_end import front_end_program
+from L3.parse import parse_program
+from L3.syntax import Let, Primitive, Program, Reference, Term
+from L3.uniqify import uniqify_program
+
+
+def sequential(program: Program, check: bool = True) -> tuple[str, L2.Program]:
+    if check:
+        check_program(program)
+    fresh, program = uniqify_program(program)
+    return fresh("t"), eliminate_letrec_program(program)
+
+
+def fused(program: Program, check: bool = True) -> tuple[str, L2.Program]:
+    fresh, l2 = front_end_program(program, check)
+    return fresh("t"), l2
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "(l3 () 0)",
+        "(l3 (x y) (+ x y))",
+        "(l3 (x) (let ((x (+ x 1)) (y x)) (let ((x (* x y))) x)))",
+        "(l3 (n) (letrec ((f (\\ (x) (if (< x 1) 0 (g (- x 1))))) (g (\\ (x) (f x)))) (f n)))",
+        "(l3 (x) (letrec ((f (\\ (f) f))) (let ((f (f x))) (f f))))",
+        "(l3 (x) (let ((m (allocate 2))) (begin (store m 0 x) (store m 1 (load m 0)) (load m 1))))",
+        "(l3 (x) ((\\ (x y) (if (== x y) x y)) x (letrec ((x x)) x)))",
+    ],
+)
+def test_front_end_program(source: str):
+    program = parse_program(source)
+
+    assert fused(program) == sequential(program)
+
+
+def test_front_end_program_no_check():
+    # Unchecked, duplicate binders get renamed the same way by both.
+    program = parse_program("(l3 (x x) (let ((y x) (y 1)) (letrec ((f y) (f f)) ((\\ (z z) z) f))))")
+
+    assert fused(program, check=False) == sequential(program, check=False)
+
+
+def test_front_end_program_no_check_unknown_variable():
+    with pytest.raises(KeyError):
+        front_end_program(parse_program("(l3 () x)"), check=False)
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "(l3 (x x) 0)",
+        "(l3 () x)",
+        "(l3 () (let ((x 0) (x 1)) x))",
+        "(l3 () (letrec ((f 0) (f 1)) f))",
+        "(l3 () (\\ (x x) x))",
+        "(l3 () (let ((x x)) x))",
+        "(l3 () (let ((x 0)) (\\ (y) z)))",
+    ],
+)
+def test_front_end_program_invalid(source: str):
+    program = parse_program(source)
+
+    with pytest.raises(ValueError):
+        check_program(program)
+    with pytest.raises(ValueError):
+        front_end_program(program)
+
+
+def test_front_end_program_deep_let():
+    depth = 100_000
+    body: Term = Reference(name="x")
+    for _ in range(depth):
+        body = Let(
+            bindings=[("x", Primitive(operator="+", left=Reference(name="x"), right=Reference(name="x")))], body=body
+        )
+
+    _, program = front_end_program(Program(parameters=["x"], body=body))
+
+    term = program.body
+    for i in range(depth):
+        assert isinstance(term, L2.Let)
+        [(name, _)] = term.bindings
+        assert name == f"x{i + 1}"
+        term = term.body
+    assert term == L2.Reference(name=f"x{depth}")
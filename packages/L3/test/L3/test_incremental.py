@@ -0,0 +1,103 @@
+import random
+
+import pytest
+from L3.incremental import parse_document, reparse_document
+from L3.syntax import Apply, Let
+
+SOURCE = " (l3 (x y) (let ((a (+ x 1)) (b (* y 2))) (begin (store (allocate 2) 0 a) (if (< a b) (\\ (z) (+ z a)) (f a b 3)))))\n"
+
+
+def edit(source: str, old: str, new: str) -> tuple[int, int, str]:
+    return source.index(old), len(old), new
+
+
+@pytest.mark.parametrize(
+    "old, new",
+    [
+        ("1", "42"),
+        ("(+ x 1)", "(- x 1)"),
+        ("(b (* y 2))", "(b (* y 2)) (c 3)"),
+        ("(< a b)", "(== a b)"),
+        ("(x y)", "(x y w)"),
+        ("(f a b 3)", "f"),
+        ("(store (allocate 2) 0 a)", "(allocate 2)"),
+        ("(l3 (x y)", "(l3 (y)"),
+        ("\n", "  \n"),
+        (" (l3", "(l3"),
+        ("(f a b 3)))))", "(f a b 3))))) "),
+    ],
+)
+def test_reparse_document(old: str, new: str):
+    document = parse_document(SOURCE)
+
+    actual = reparse_document(document, *edit(SOURCE, old, new))
+
+    expected = parse_document(SOURCE.replace(old, new))
+
+    assert actual.source == expected.source
+    assert actual.program == expected.program
+
+
+def test_reparse_document_reuses_subtrees():
+    document = parse_document(SOURCE)
+
+    actual = reparse_document(document, *edit(SOURCE, "1", "42"))
+
+    match document.program.body, actual.program.body:
+        case Let(bindings=[_, before], body=body), Let(bindings=[_, after], body=same):
+            assert after[1] is before[1]
+            assert same is body
+
+        case _:  # pragma: no cover
+            pytest.fail("expected a let")
+
+
+def test_reparse_document_widens():
+    source = "(l3 () (h (f 1) 2))"
+    document = parse_document(source)
+
+    actual = reparse_document(document, source.index(" 1"), 0, ") (g")
+
+    match actual.program.body:
+        case Apply(arguments=[Apply(arguments=[]), Apply(), _]):
+            pass
+
+        case _:  # pragma: no cover
+            pytest.fail(f"unexpected {actual.program.body}")
+
+
+def test_reparse_document_invalid():
+    document = parse_document(SOURCE)
+
+    with pytest.raises(ValueError):
+        reparse_document(document, *edit(SOURCE, "(+ x 1)", "(+ x"))
+
+
+@pytest.mark.parametrize("offset, removed", [(-1, 0), (0, len(SOURCE) + 1)])
+def test_reparse_document_outside(offset: int, removed: int):
+    document = parse_document(SOURCE)
+
+    with pytest.raises(ValueError):
+        reparse_document(document, offset, removed, "")
+
+
+def test_reparse_document_random_edits():
+    rng = random.Random(0)
+    document = parse_document(SOURCE)
+
+    for _ in range(1000):
+        source = document.source
+        offset = rng.randrange(len(source) + 1)
+        removed = rng.randrange(min(4, len(source) - offset) + 1)
+        inserted = rng.choice(["", "1", "x", " ", "(", ")", "(+ 1 2)", "7 "])
+        text = source[:offset] + inserted + source[offset + removed :]
+
+        try:
+            expected = parse_document(text)
+        except ValueError:
+            with pytest.raises(ValueError):
+                reparse_document(document, offset, removed, inserted)
+            continue
+
+        document = reparse_document(document, offset, removed, inserted)
+        assert document.program == expected.program
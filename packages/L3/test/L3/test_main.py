@@ -0,0 +1,115 @@
+import runpy
+from importlib.util import MAGIC_NUMBER
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner, Result
+from L3.main import main
+
+SOURCE = "(l3 (x y) (+ x y))"
+SOURCES = "(l3 (x y) (+ x y)) (l3 (x y) (* x y))"
+
+
+def run(*arguments: str, input: str | None = None, code: int = 0) -> Result:
+    result = CliRunner().invoke(main, list(arguments), input=input)
+    assert result.exit_code == code, result.output
+    return result
+
+
+@pytest.mark.parametrize("stats", [[], ["--stats"]])
+@pytest.mark.parametrize("pyc", [False, True])
+def test_main(tmp_path: Path, pyc: bool, stats: list[str]):
+    source = tmp_path / "add.l3"
+    source.write_text(SOURCE)
+
+    result = run(*(["--pyc"] if pyc else []), *stats, str(source))
+
+    namespace = runpy.run_path(str(source.with_suffix(".pyc" if pyc else ".py")))
+    assert namespace["l1"](3, 4) == 7
+    assert ("eliminate_letrec" in result.stderr) == bool(stats)
+
+
+@pytest.mark.parametrize("pyc", [False, True])
+def test_main_output(tmp_path: Path, pyc: bool):
+    source = tmp_path / "add.l3"
+    source.write_text(SOURCE)
+    target = tmp_path / "module"
+
+    run(*(["--pyc"] if pyc else []), str(source), "-o", str(target))
+
+    assert target.exists()
+    assert not source.with_suffix(".pyc" if pyc else ".py").exists()
+
+
+def test_main_stdin():
+    assert "def l1(" in run("-", input=SOURCE).stdout
+    assert run("--pyc", "-", input=SOURCE).stdout_bytes.startswith(MAGIC_NUMBER)
+
+
+def test_main_stream(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    source = tmp_path / "many.l3"
+    source.write_text(SOURCES)
+
+    run("--stream", str(source))
+    run("--stream", str(source), "-o", str(tmp_path / "out"))
+    monkeypatch.chdir(tmp_path)
+    run("--stream", "-", input=SOURCES)
+
+    assert runpy.run_path(str(tmp_path / "many_1.py"))["l1"](3, 4) == 12
+    assert sorted(path.name for path in (tmp_path / "out").iterdir()) == ["many_0.py", "many_1.py"]
+    assert (tmp_path / "stdin_1.py").exists()
+
+
+def test_main_bundle(tmp_path: Path):
+    source = tmp_path / "many.l3"
+    source.write_text(SOURCES)
+
+    assert "def program_1(" in run("--stream", "--bundle", str(source), "-o", "-").stdout
+
+
+@pytest.mark.parametrize("output", [False, True])
+@pytest.mark.parametrize("failure", [False, True])
+def test_main_batch(tmp_path: Path, failure: bool, output: bool):
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "add.l3").write_text(SOURCE)
+    (tmp_path / "nested" / "mul.l3").write_text("(l3 (x y) (* x y))")
+    if failure:
+        (tmp_path / "bad.l3").write_text("(l3 () x)")
+    directory = tmp_path / "out" if output else None
+
+    result = run(str(tmp_path), *(["-o", str(directory)] if directory else []), code=int(failure))
+
+    assert (directory or tmp_path / "nested").joinpath("mul.py").exists()
+    assert ("bad.l3: ValueError" in result.stderr) == failure
+
+
+@pytest.mark.parametrize(
+    "arguments",
+    [
+        ["--pyc", "--bundle", "{add}"],
+        ["--stats", "--stream", "{add}"],
+        ["--stream", "{add}", "-o", "-"],
+        ["--stream", "{add}", "{mul}"],
+        ["{add}", "{missing}"],
+        ["{add}", "{nested}", "-o", "{tmp}"],
+        ["{add}", "{mul}", "-o", "-"],
+        ["--bundle", "{add}", "{mul}"],
+    ],
+)
+def test_main_usage(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, arguments: list[str]):
+    # From tmp_path, so that an output of - would be created where the test looks for it.
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "nested").mkdir()
+    paths = {
+        "add": tmp_path / "add.l3",
+        "mul": tmp_path / "mul.l3",
+        "nested": tmp_path / "nested" / "add.l3",
+        "missing": tmp_path / "missing.l3",
+        "tmp": tmp_path,
+    }
+    for name in ["add", "mul", "nested"]:
+        paths[name].write_text(SOURCE)
+
+    run(*(argument.format(**paths) for argument in arguments), code=2)
+
+    assert not (tmp_path / "-").exists()
@@ -1,4 +1,7 @@
-from L3.parse import parse_program, parse_term
+from pathlib import Path
+
+import pytest
+from L3.parse import get_parser, parse_program, parse_term
 from L3.syntax import (
     Abstract,
     Allocate,
@@ -295,3 +298,26 @@ def test_parse_program_identity():
     actual = parse_program(source)
 
     assert actual == expected
+
+
+# Parser registry
+def test_get_parser_reused():
+    assert get_parser("program") is get_parser("program")
+    assert get_parser("term") is get_parser("term")
+    assert get_parser("program") is not get_parser("term")
+    assert get_parser("program", "inline") is get_parser("program", "inline")
+    assert get_parser("program", "inline") is not get_parser("program")
+
+
+# Inline mode
+@pytest.mark.parametrize("name", ["add_complex", "add_simple", "fact", "fib"])
+def test_parse_program_inline(name: str):
+    source = (Path(__file__).parents[2] / "examples" / f"{name}.l3").read_text()
+
+    assert parse_program(source, "inline") == parse_program(source)
+
+
+def test_parse_term_inline():
+    source = "(letrec ((f (\\ (x y) (begin (store x 0 y) (load x 0))))) (if (== 1 2) (f (allocate 1) 3) 0))"
+
+    assert parse_term(source, "inline") == parse_term(source)
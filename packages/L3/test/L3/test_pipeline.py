@@ -0,0 +1,68 @@
+import runpy
+from pathlib import Path
+
+import pytest
+from L1 import syntax as L1
+from L1.to_python import to_ast_program
+from L3.parse import parse_program
+from L3.pipeline import compile_program, lower_program
+
+
+def run(directory: Path, program: L1.Program, *arguments: int, trampoline: bool = False) -> int:
+    module = directory / "module.py"
+    module.write_text(to_ast_program(program, trampoline))
+    return runpy.run_path(str(module))["l1"](*arguments)
+
+
+def test_lower_program(tmp_path: Path):
+    program = parse_program("(l3 (x y) (let ((z (+ x y))) (* z z)))")
+
+    assert run(tmp_path, lower_program(program), 1, 2) == 9
+
+
+@pytest.mark.parametrize("optimize", [True, False])
+def test_lower_program_optimize(tmp_path: Path, optimize: bool):
+    program = parse_program("(l3 (x) (let ((y 2)) (+ x y)))")
+
+    assert run(tmp_path, lower_program(program, optimize=optimize), 40) == 42
+
+
+def test_lower_program_check():
+    program = parse_program("(l3 () x)")
+
+    with pytest.raises(ValueError):
+        lower_program(program)
+
+
+def test_lower_program_no_check(tmp_path: Path):
+    program = parse_program("(l3 () (let ((x 1)) x))")
+
+    assert run(tmp_path, lower_program(program, check=False)) == 1
+
+
+def test_lower_program_trampoline(tmp_path: Path):
+    # Far more iterations than the recursion limit allows nested calls.
+    program = parse_program(
+        "(l3 (n) (letrec ((loop (\\ (i acc) (if (== i 0) acc (loop (- i 1) (+ acc i)))))) (loop n 0)))"
+    )
+
+    assert run(tmp_path, lower_program(program), 100_000, trampoline=True) == 100_000 * 100_001 // 2
+
+
+def test_compile_program():
+    function = compile_program("(l3 (x y) (let ((z (+ x y))) (* z z)))")
+
+    assert function.__name__ == "l3"
+    assert [function(x, 2) for x in range(3)] == [4, 9, 16]
+
+
+@pytest.mark.parametrize("trampoline", [False, True])
+def test_compile_program_options(trampoline: bool):
+    function = compile_program("(l3 (x) (let ((y 2)) (+ x y)))", check=False, optimize=False, trampoline=trampoline)
+
+    assert function(40) == 42
+
+
+def test_compile_program_check():
+    with pytest.raises(ValueError):
+        compile_program("(l3 () x)")
@@ -0,0 +1,128 @@
+from pathlib import Path
+
+import pytest
+from L3.parse import parse_program, parse_term
+from L3.reader import read_program, read_term
+from L3.syntax import Apply, Immediate, Let, Reference, Term
+
+EXAMPLES = Path(__file__).parents[2] / "examples"
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "x",
+        "42",
+        "(let () x)",
+        "(let ((x 0) (y x)) (+ x y))",
+        "(letrec ((f (\\ (n) (f n)))) (f 0))",
+        "(lambda () 0)",
+        "(λ (a b) (- a b))",
+        "(f)",
+        "((f 1) 2 3)",
+        "(5 x)",
+        "(if (< 1 2) 3 4)",
+        "(if (== x y) (* x y) (- x y))",
+        "(allocate 3)",
+        "(load x 0)",
+        "(store (allocate 1) 0 (load y 2))",
+        "(begin x)",
+        "(begin (f) (g) 0)",
+        # Keywords are only keywords in the head position of a form.
+        "(f let)",
+        "(let ((let 1)) let)",
+        "(\\ (if) if)",
+        "(l3 1)",
+        # Tokens need no separating whitespace.
+        "(f 1x 01)",
+        "  (f\n\tx)  ",
+    ],
+)
+def test_read_term_matches_parse_term(source: str):
+    assert read_term(source) == parse_term(source)
+
+
+@pytest.mark.parametrize("name", ["add_complex", "add_simple", "fact", "fib"])
+def test_read_program_matches_parse_program(name: str):
+    source = (EXAMPLES / f"{name}.l3").read_text()
+
+    assert read_program(source) == parse_program(source)
+
+
+def test_read_program_parameter_named_l3():
+    assert read_program("(l3 (l3) l3)") == parse_program("(l3 (l3) l3)")
+
+
+def test_parse_reader_mode():
+    assert parse_term("(f x)", "reader") == parse_term("(f x)")
+    assert parse_program("(l3 (x) x)", "reader") == parse_program("(l3 (x) x)")
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "",
+        "#",
+        "(f x",
+        ")",
+        "x)",
+        "x y",
+        "()",
+        "(let)",
+        "(begin)",
+        "(f +)",
+        "(== 1 2)",
+        "(let x x)",
+        "(let (x) x)",
+        "(let ((1 x)) x)",
+        "(\\ (x 1) x)",
+        "(if (+ 1 2) 3 4)",
+        "(allocate x)",
+        "(allocate (f))",
+        "(load x y)",
+        "(+ 1 2 3)",
+    ],
+)
+def test_read_term_invalid(source: str):
+    with pytest.raises(ValueError):
+        read_term(source)
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "x",
+        "(x)",
+        "(f (x) x)",
+        "(l3 x x)",
+        "(l3 (x) x) y",
+    ],
+)
+def test_read_program_invalid(source: str):
+    with pytest.raises(ValueError):
+        read_program(source)
+
+
+def test_read_term_deep_let():
+    depth = 10_000
+    source = "(let ((x 0)) " * depth + "x" + ")" * depth
+
+    term: Term = read_term(source)
+
+    for _ in range(depth):
+        assert isinstance(term, Let)
+        term = term.body
+    assert term == Reference(name="x")
+
+
+def test_read_term_deep_apply():
+    depth = 10_000
+    source = "(f " * depth + "0" + ")" * depth
+
+    term: Term = read_term(source)
+
+    for _ in range(depth):
+        assert isinstance(term, Apply)
+        assert term.target == Reference(name="f")
+        [term] = term.arguments
+    assert term == Immediate(value=0)
@@ -0,0 +1,83 @@
+import json
+import tracemalloc
+
+import pytest
+from L3.parse import parse_program
+from L3.pipeline import lower_program
+from L3.stats import PassStats, count, format_stats, measure, nodes
+from L3.syntax import Immediate, Primitive, Program, Reference
+
+SOURCE = "(l3 (x) (let ((y 2)) (+ x y)))"
+
+
+def test_count():
+    program = Program(
+        parameters=["x"],
+        body=Primitive(operator="+", left=Reference(name="x"), right=Immediate(value=1)),
+    )
+
+    assert count(program) == 4
+
+
+def test_nodes():
+    program = parse_program(SOURCE)
+
+    assert nodes(program) == count(program)
+    assert nodes((object(), program)) == count(program)
+    assert nodes(SOURCE) is None
+
+
+def test_measure_without_stats():
+    assert measure(None, "parse", parse_program, SOURCE) == parse_program(SOURCE)
+
+
+@pytest.mark.parametrize("check", [True, False])
+@pytest.mark.parametrize("optimize", [True, False])
+def test_lower_program_stats(optimize: bool, check: bool):
+    stats: list[PassStats] = []
+    program = measure(stats, "parse", parse_program, SOURCE)
+    l1 = lower_program(program, check, optimize, stats)
+
+    names = [
+        "parse",
+        *(["check"] if check else []),
+        "uniqify",
+        "eliminate_letrec",
+        *(["optimize"] if optimize else []),
+        "cps_convert",
+    ]
+    assert [entry.name for entry in stats] == names
+    assert stats[0].nodes_before is None
+    assert stats[0].nodes_after == stats[1].nodes_before == count(program)
+    assert stats[-1].nodes_after == count(l1)
+    assert all(entry.seconds >= 0 and entry.peak >= 0 for entry in stats)
+    assert not tracemalloc.is_tracing()
+
+    # The separate front-end passes build the same program as the fused one.
+    assert l1 == lower_program(program, check, optimize)
+
+
+def test_measure_while_tracing():
+    stats: list[PassStats] = []
+    tracemalloc.start()
+    try:
+        measure(stats, "parse", parse_program, SOURCE)
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+    assert stats[0].peak > 0
+
+
+def test_format_stats():
+    stats = [
+        PassStats(name="parse", seconds=0.5, peak=2**20, nodes_before=None, nodes_after=10),
+        PassStats(name="codegen", seconds=0.25, peak=0, nodes_before=10, nodes_after=None),
+    ]
+
+    lines = format_stats(stats).splitlines()
+    assert len(lines) == 3
+    assert lines[1].split() == ["parse", "0.5000s", "1.00MB", "-", "10"]
+    assert lines[2].split() == ["codegen", "0.2500s", "0.00MB", "10", "-"]
+
+    assert json.loads(format_stats(stats, "json")) == [entry.model_dump() for entry in stats]
@@ -0,0 +1,105 @@
+import io
+import runpy
+import sys
+from pathlib import Path
+
+import pytest
+from L1.to_python import to_ast_program
+from L3.stream import lower_sources, read_sources, write_bundle, write_modules
+
+SOURCES = [
+    "(l3 (x) (+ x 1))",
+    "(l3 (x y) (let ((z (* x y))) (- z 1)))",
+    "(l3 () (begin (allocate 1) 7))",
+]
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 1 << 16])
+def test_read_sources(size: int):
+    stream = io.StringIO("\n" + " \n".join(SOURCES) + "\n")
+
+    assert list(read_sources(stream, size)) == SOURCES
+
+
+def test_read_sources_empty():
+    assert list(read_sources(io.StringIO("  \n"))) == []
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "x (l3 () 1)",
+        "(l3 () 1) x (l3 () 2)",
+        "(l3 () 1))",
+        "(l3 () 1) x",
+    ],
+)
+def test_read_sources_text_between_programs(source: str):
+    with pytest.raises(ValueError, match="between programs"):
+        list(read_sources(io.StringIO(source), 4))
+
+
+def test_read_sources_unterminated():
+    sources = read_sources(io.StringIO("(l3 () 1) (l3 () (+ 1"), 4)
+
+    assert next(sources) == "(l3 () 1)"
+    with pytest.raises(ValueError, match="unterminated"):
+        next(sources)
+
+
+def test_lower_sources_is_lazy():
+    def sources():
+        yield SOURCES[0]
+        raise AssertionError("read past the first program")
+
+    programs = lower_sources(sources())
+
+    assert len(next(programs).parameters) == 1
+
+
+@pytest.mark.parametrize("pyc", [False, True])
+@pytest.mark.parametrize("trampoline", [False, True])
+def test_write_modules(tmp_path: Path, trampoline: bool, pyc: bool):
+    count = write_modules(lower_sources(SOURCES), tmp_path, "input", trampoline, pyc)
+    suffix = ".pyc" if pyc else ".py"
+
+    assert count == len(SOURCES)
+    assert sorted(path.name for path in tmp_path.iterdir()) == [f"input_{i}{suffix}" for i in range(3)]
+
+    namespace = runpy.run_path(str(tmp_path / f"input_1{suffix}"))
+    assert namespace["l1"](3, 4) == 11
+
+
+@pytest.mark.parametrize("trampoline", [False, True])
+def test_write_modules_source(tmp_path: Path, trampoline: bool):
+    # The modules are streamed out, but hold the same source as the unparsed syntax tree.
+    sources = [*SOURCES, "(l3 (n) (letrec ((f (\\ (i) (if (< i 1) i (f (- i 1)))))) (f n)))"]
+    write_modules(lower_sources(sources), tmp_path, "input", trampoline)
+
+    for i, program in enumerate(lower_sources(sources)):
+        assert (tmp_path / f"input_{i}.py").read_text() == to_ast_program(program, trampoline)
+
+
+@pytest.mark.parametrize("trampoline", [False, True])
+def test_write_bundle(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    tmp_path: Path,
+    trampoline: bool,
+):
+    output = io.StringIO()
+    count = write_bundle(lower_sources(SOURCES), output, trampoline)
+
+    assert count == len(SOURCES)
+
+    bundle = tmp_path / "bundle.py"
+    bundle.write_text(output.getvalue())
+
+    namespace = runpy.run_path(str(bundle))
+    assert namespace["program_0"](1) == 2
+    assert namespace["program_2"]() == 7
+
+    monkeypatch.setattr(sys, "argv", [str(bundle), "1", "3", "4"])
+    runpy.run_path(str(bundle), run_name="__main__")
+
+    assert capsys.readouterr().out == "11\n"
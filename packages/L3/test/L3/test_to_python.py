@@ -0,0 +1,25 @@
+import runpy
+from pathlib import Path
+
+import pytest
+from L3.parse import parse_program
+from L3.to_python import to_ast_program, to_pyc_program
+
+PROGRAMS = [
+    ("(l3 (x y) (let ((a (+ x y)) (b (- x y))) (* a b)))", [3, 2], 5),
+    ("(l3 (n) (letrec ((f (\\ (i acc) (if (< i 1) acc (f (- i 1) (+ acc i)))))) (f n 0)))", [4], 10),
+    ("(l3 (x) (let ((m (allocate 2))) (begin (store m 1 x) (if (== (load m 1) x) 1 0))))", [7], 1),
+]
+
+
+@pytest.mark.parametrize("pyc", [False, True])
+@pytest.mark.parametrize(("source", "arguments", "expected"), PROGRAMS)
+def test_to_python(tmp_path: Path, source: str, arguments: list[int], expected: int, pyc: bool):
+    program = parse_program(source)
+    path = tmp_path / ("module.pyc" if pyc else "module.py")
+    if pyc:
+        path.write_bytes(to_pyc_program(program, str(path)))
+    else:
+        path.write_text(to_ast_program(program))
+
+    assert runpy.run_path(str(path))["l3"](*arguments) == expected
@@ -12,6 +12,7 @@ from L3.syntax import (
     Program,
     Reference,
     Store,
+    Term,
 )
 from L3.uniqify import Context, uniqify_program, uniqify_term
 from util.sequential_name_generator import SequentialNameGenerator
@@ -519,3 +520,28 @@ def test_uniqify_program_nested_let():
     )
 
     assert actual == expected
+
+
+def test_uniqify_program_deep_let():
+    depth = 100_000
+    body: Term = Reference(name="x")
+    for _ in range(depth):
+        body = Let(
+            bindings=[("x", Primitive(operator="+", left=Reference(name="x"), right=Immediate(value=1)))], body=body
+        )
+
+    _, program = uniqify_program(Program(parameters=["x"], body=body))
+
+    # Every let shadows x, so each gets a fresh name that the next one refers to.
+    [previous] = program.parameters
+    names = {previous}
+    term = program.body
+    for _ in range(depth):
+        assert isinstance(term, Let)
+        [(name, value)] = term.bindings
+        assert isinstance(value, Primitive)
+        assert value.left == Reference(name=previous)
+        names.add(name)
+        previous, term = name, term.body
+    assert term == Reference(name=previous)
+    assert len(names) == depth + 1
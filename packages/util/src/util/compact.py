@@ -0,0 +1,99 @@
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from dataclasses import fields
+from typing import Any, cast
+
+from pydantic import BaseModel
+
+from .trusted import trusted
+
+type Classes = Mapping[type, tuple[type, tuple[str, ...]]]
+
+
+def children(
+    node: Any,
+    names: tuple[str, ...],
+    classes: Classes,
+) -> Iterator[Any]:
+    # Fields hold a node, a sequence of nodes or names, or a sequence of (name, node) bindings.
+    for name in names:
+        value = getattr(node, name)
+        if type(value) in classes:
+            yield value
+        elif isinstance(value, (list, tuple)):
+            for item in cast(Sequence[Any], value):
+                if type(item) in classes:
+                    yield item
+                elif isinstance(item, tuple):
+                    yield from (part for part in cast(Sequence[Any], item) if type(part) in classes)
+
+
+def convert(
+    root: Any,
+    classes: Classes,
+    build: Callable[..., Any],
+    sequence: Callable[[Iterator[Any]], Any],
+) -> Any:
+    # Post-order with an explicit stack, since statement chains are far deeper than the recursion limit.
+    converted: dict[int, Any] = {}
+
+    def item(value: Any) -> Any:
+        if type(value) in classes:
+            return converted[id(value)]
+        if isinstance(value, tuple):
+            return tuple(item(part) for part in cast(Sequence[Any], value))
+        return value
+
+    def field(value: Any) -> Any:
+        if isinstance(value, (list, tuple)):
+            return sequence(item(part) for part in cast(Sequence[Any], value))
+        return item(value)
+
+    stack = [root]
+    while stack:
+        node = stack[-1]
+        if id(node) in converted:
+            stack.pop()
+            continue
+
+        cls, names = classes[type(node)]
+        pending = [child for child in children(node, names, classes) if id(child) not in converted]
+        if pending:
+            stack.extend(pending)
+            continue
+
+        stack.pop()
+        converted[id(node)] = build(cls, **{name: field(getattr(node, name)) for name in names})
+
+    return converted[id(root)]
+
+
+def construct(cls: type, **values: Any) -> Any:
+    return cls(**values)
+
+
+class Converter:
+    def __init__(self, classes: Mapping[type[BaseModel], type]) -> None:
+        # Compact classes are dataclasses with the fields of their model, less the tag. Each is registered as a virtual
+        # subclass of its model, so the class patterns of the passes match both. pydantic only consults the registry
+        # for classes that carry its decorators attribute.
+        self._compact: Classes = {}
+        self._models: Classes = {}
+        for model, compact in classes.items():
+            names = tuple(field.name for field in fields(compact))
+            self._compact[model] = (compact, names)
+            self._models[compact] = (model, names)
+            compact.__pydantic_decorators__ = model.__pydantic_decorators__  # pyright: ignore[reportAttributeAccessIssue]
+            model.register(compact)
+
+    def new(self, model: type[BaseModel], **values: Any) -> Any:
+        # A drop-in for util.trusted in a pass, building the compact node for model instead.
+        compact, _ = self._compact[model]
+        return compact(
+            **{name: tuple(cast(list[Any], value)) if type(value) is list else value for name, value in values.items()}
+        )
+
+    def to_compact(self, node: BaseModel) -> Any:
+        return convert(node, self._compact, construct, tuple)
+
+    def from_compact(self, node: Any) -> Any:
+        return convert(node, self._models, trusted, list)
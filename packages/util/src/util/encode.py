@@ -1,7 +1,18 @@
 import keyword
+from functools import lru_cache
 
 
 def encode(name: str) -> str:
+    # Most names are already valid identifiers, which escaping would leave unchanged.
+    if name.isascii() and name.isidentifier() and not keyword.iskeyword(name):
+        return name
+
+    return _escape(name)
+
+
+# Bounded, since a long-running process compiles many programs with names of their own.
+@lru_cache(maxsize=1 << 14)
+def _escape(name: str) -> str:
     def escape(c: str) -> str:
         if c.isidentifier() or c.isdigit() or c == "_":
             return c
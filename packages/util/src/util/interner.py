@@ -0,0 +1,51 @@
+from collections.abc import Iterable, Sequence
+from itertools import count
+from typing import Any, cast
+
+from pydantic import BaseModel
+
+from .compact import Classes
+from .node import Node
+from .trusted import trusted
+
+_serials = count()
+
+
+class Interner:
+    def __init__(self, models: Iterable[type[BaseModel]]) -> None:
+        # Fields with defaults (the tags) are the same for every node of a model, so they are left out of keys.
+        self._classes: Classes = {
+            model: (model, tuple(name for name, field in model.__pydantic_fields__.items() if field.is_required()))
+            for model in models
+        }
+        self._nodes: dict[tuple[Any, ...], Any] = {}
+        # A serial rather than the interner itself, so nodes do not keep every other node of their interner alive.
+        self._serial = next(_serials)
+
+    def _key(self, value: Any) -> Any:
+        # Children are already interned, so they are keyed by identity and a key costs O(fields), not O(subtree).
+        if type(value) in self._classes:
+            return id(value)
+        if isinstance(value, (list, tuple)):
+            return tuple([self._key(item) for item in cast(Sequence[Any], value)])
+        return value
+
+    def _complete(self, value: Any) -> bool:
+        # Whether every node in value came from this interner, and so is the only node with its structure.
+        if type(value) in self._classes:
+            return getattr(value, "_interner", None) == self._serial
+        if isinstance(value, (list, tuple)):
+            return all(self._complete(item) for item in cast(Sequence[Any], value))
+        return True
+
+    def __call__[T: BaseModel](self, cls: type[T], **fields: Any) -> T:
+        _, names = self._classes[cls]
+        identity = (cls, *[self._key(fields[name]) for name in names])
+
+        interned = self._nodes.get(identity)
+        if interned is None:
+            interned = self._nodes[identity] = trusted(cls, **fields)
+            if isinstance(interned, Node) and all(self._complete(fields[name]) for name in names):
+                object.__setattr__(interned, "_interner", self._serial)
+                object.__setattr__(interned, "_hash", hash(identity))
+        return interned
@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+
+
+class Node(BaseModel, frozen=True):
+    # The base of the syntax models. util.interner.Interner stamps each node it builds with its own serial and the hash
+    # of the node's key. It builds one instance per structure, so nodes from the same interner are equal only when they
+    # are the same node, and their hash costs nothing. Other nodes compare field by field and are not hashable, since
+    # their fields hold lists.
+    __slots__ = ("_hash", "_interner")
+
+    def __hash__(self) -> int:
+        try:
+            return self._hash
+        except AttributeError:
+            raise TypeError(f"unhashable {type(self).__name__} that is not interned") from None
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        interner = getattr(self, "_interner", None)
+        if interner is not None and interner == getattr(other, "_interner", None):
+            return False
+        return super().__eq__(other)
@@ -0,0 +1,96 @@
+from collections.abc import Iterable, Iterator, Mapping
+from typing import Any, cast
+
+_absent: Any = object()
+
+
+def apply[K, V](data: dict[K, V], changes: list[tuple[K, V]]) -> list[tuple[K, V]]:
+    # Sets (or, for _absent, removes) each key in order, and returns the changes that undo it.
+    undo: list[tuple[K, V]] = []
+    for key, value in changes:
+        undo.append((key, data.get(key, _absent)))
+        if value is _absent:
+            data.pop(key, None)
+        else:
+            data[key] = value
+    undo.reverse()
+    return undo
+
+
+class PersistentMap[K, V](Mapping[K, V]):
+    # Every version of a map shares one dict, which holds whichever version was used last. Each other version keeps
+    # the changes that turn the version it points to into itself. Using a version moves the dict to it, undoing and
+    # redoing changes on the way, so passes that extend a scope and return to it in stack order pay O(1) per binding.
+    __slots__ = ("_changes", "_data", "_next")
+
+    def __init__(self, mapping: Mapping[K, V] | None = None) -> None:
+        self._data: dict[K, V] = {} if mapping is None else dict(mapping)
+        self._next: PersistentMap[K, V] | None = None
+        self._changes: list[tuple[K, V]] = []
+
+    def _dict(self) -> dict[K, V]:
+        if self._next is None:
+            return self._data
+
+        path: list[PersistentMap[K, V]] = []
+        version = self
+        while version._next is not None:
+            path.append(version)
+            version = version._next
+
+        for version in reversed(path):
+            root = cast(PersistentMap[K, V], version._next)
+            root._changes, root._next = apply(self._data, version._changes), version
+            version._changes, version._next = [], None
+
+        return self._data
+
+    def _derive(self, changes: list[tuple[K, V]]) -> PersistentMap[K, V]:
+        if not changes:
+            return self
+
+        version = PersistentMap[K, V]()
+        version._data = self._dict()
+        self._changes, self._next = apply(self._data, changes), version
+        return version
+
+    def extend(self, items: Mapping[K, V]) -> PersistentMap[K, V]:
+        return self._derive(list(items.items()))
+
+    def remove(self, keys: Iterable[K]) -> PersistentMap[K, V]:
+        data = self._dict()
+        return self._derive([(key, _absent) for key in keys if key in data])
+
+    # Lookups skip the call to _dict for the version used last, which is the one a pass almost always reads.
+    def __getitem__(self, key: K) -> V:
+        return (self._data if self._next is None else self._dict())[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in (self._data if self._next is None else self._dict())
+
+    def get(self, key: K, default: Any = None) -> Any:
+        return (self._data if self._next is None else self._dict()).get(key, default)
+
+    def __iter__(self) -> Iterator[K]:
+        # A copy, since reading another version while iterating would change the dict.
+        return iter(list(self._dict()))
+
+    def __len__(self) -> int:
+        return len(self._dict())
+
+    def __repr__(self) -> str:
+        return f"PersistentMap({self._dict()!r})"
+
+
+def persistent[K, V](mapping: Mapping[K, V]) -> PersistentMap[K, V]:
+    if isinstance(mapping, PersistentMap):
+        return cast(PersistentMap[K, V], mapping)
+    return PersistentMap(mapping)
+
+
+def extend[K, V](mapping: Mapping[K, V], items: Mapping[K, V]) -> PersistentMap[K, V]:
+    return persistent(mapping).extend(items)
+
+
+def remove[K, V](mapping: Mapping[K, V], keys: Iterable[K]) -> PersistentMap[K, V]:
+    return persistent(mapping).remove(keys)
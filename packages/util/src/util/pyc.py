@@ -0,0 +1,12 @@
+import ast
+import importlib.util
+import marshal
+
+
+def to_pyc(
+    module: ast.Module,
+    filename: str,
+) -> bytes:
+    # A .pyc with no source behind it, which python runs and imports directly. The flags, modification time and source
+    # size in the header are left at zero, since there is no source to check them against.
+    return importlib.util.MAGIC_NUMBER + bytes(12) + marshal.dumps(compile(module, filename, "exec"))
@@ -0,0 +1,47 @@
+from collections.abc import Callable, Generator, Iterable
+from types import GeneratorType
+from typing import Any
+
+# A recursive function written as a generator: it yields the generator of each recursive call, and gets back what that
+# call returns.
+type Steps[T] = Generator[Any, Any, T]
+
+
+def run[T](steps: Steps[T]) -> T:
+    # Runs steps and every generator they yield on a list instead of the Python stack, so depth is limited by memory.
+    # Anything else that is yielded is sent straight back, which lets a continuation be a plain function.
+    stack: list[Steps[Any]] = [steps]
+    value: Any = None
+    while True:
+        try:
+            value = stack[-1].send(value)
+        except StopIteration as stop:
+            stack.pop()
+            if not stack:
+                return stop.value
+            value = stop.value
+        else:
+            if type(value) is GeneratorType:
+                stack.append(value)  # pyright: ignore[reportUnknownArgumentType]
+                value = None
+
+
+def each[T](steps: Iterable[Steps[T]]) -> Steps[list[T]]:
+    # Runs steps one after another, for the recursive calls a comprehension would make.
+    results: list[T] = []
+    for step in steps:
+        results.append((yield step))
+    return results
+
+
+class Trampoline[**P, T]:
+    def __init__(self, steps: Callable[P, Steps[T]]) -> None:
+        # Calling runs steps to completion. Recursive calls inside them yield self.steps(...) instead.
+        self.steps = steps
+
+    def __call__(self, *args: P.args, **kwargs: P.kwargs) -> T:
+        return run(self.steps(*args, **kwargs))
+
+
+def trampoline[**P, T](steps: Callable[P, Steps[T]]) -> Trampoline[P, T]:
+    return Trampoline(steps)
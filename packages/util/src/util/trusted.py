@@ -0,0 +1,22 @@
+from typing import Any
+
+from pydantic import BaseModel
+
+_defaults: dict[type[BaseModel], dict[str, Any]] = {}
+
+
+def trusted[T: BaseModel](cls: type[T], **fields: Any) -> T:
+    # Builds the instance that BaseModel.model_construct would, without validating fields or looking up aliases.
+    # Only for values that are already valid, such as the subtrees a compiler pass assembles into a new node.
+    defaults = _defaults.get(cls)
+    if defaults is None:
+        defaults = _defaults[cls] = {
+            name: field.get_default() for name, field in cls.__pydantic_fields__.items() if not field.is_required()
+        }
+
+    node = cls.__new__(cls)
+    object.__setattr__(node, "__dict__", {**defaults, **fields})
+    object.__setattr__(node, "__pydantic_fields_set__", set(fields))
+    object.__setattr__(node, "__pydantic_extra__", None)
+    object.__setattr__(node, "__pydantic_private__", None)
+    return node
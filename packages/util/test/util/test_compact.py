@@ -0,0 +1,68 @@
+from dataclasses import dataclass
+from typing import ClassVar, Literal
+
+from pydantic import BaseModel
+from util.compact import Converter
+
+
+class Model(BaseModel, frozen=True):
+    tag: Literal["node"] = "node"
+    name: str
+    bindings: list[tuple[str, Model]]
+    children: list[Model]
+
+
+@dataclass(frozen=True, slots=True)
+class Compact:
+    tag: ClassVar[Literal["node"]] = "node"
+    name: str
+    bindings: tuple[tuple[str, Compact], ...]
+    children: tuple[Compact, ...]
+
+
+converter = Converter({Model: Compact})
+
+
+def test_converter():
+    leaf = Model(name="leaf", bindings=[], children=[])
+    model = Model(name="root", bindings=[("x", leaf)], children=[leaf, leaf])
+
+    compact = converter.to_compact(model)
+
+    leaf_compact = Compact(name="leaf", bindings=(), children=())
+    assert compact == Compact(name="root", bindings=(("x", leaf_compact),), children=(leaf_compact, leaf_compact))
+    assert converter.from_compact(compact) == model
+
+
+def test_converter_shares_subtrees():
+    leaf = Model(name="leaf", bindings=[], children=[])
+    model = Model(name="root", bindings=[("x", leaf)], children=[leaf])
+
+    compact = converter.to_compact(model)
+
+    assert compact.bindings[0][1] is compact.children[0]
+
+
+def test_converter_deep():
+    model = Model(name="leaf", bindings=[], children=[])
+    for _ in range(100_000):
+        model = Model(name="node", bindings=[], children=[model])
+
+    compact = converter.to_compact(model)
+    for _ in range(100_000):
+        compact = compact.children[0]
+
+    assert compact.name == "leaf"
+
+
+def test_converter_registers_compact():
+    node = converter.new(Model, name="root", bindings=[], children=[Compact(name="leaf", bindings=(), children=())])
+
+    assert node == Compact(name="root", bindings=(), children=(Compact(name="leaf", bindings=(), children=()),))
+    assert isinstance(node, Model)
+    match node:
+        case Model(name=name, children=[Model(name=child)]):
+            assert (name, child) == ("root", "leaf")
+
+        case _:  # pragma: no cover
+            raise AssertionError(node)
@@ -0,0 +1,28 @@
+import pytest
+from util.encode import encode
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ("x", "x"),
+        ("x_1", "x_1"),
+        ("a-b", "a_x2D_b"),
+        ("1x", "_1x"),
+        ("class", "_class"),
+        ("match", "match"),
+        ("é", "é"),
+        ("", "_"),
+    ],
+)
+def test_encode(name: str, expected: str):
+    assert encode(name) == expected
+
+
+def test_encode_invalid():
+    with pytest.raises(ValueError):
+        encode("a²")
+
+
+def test_encode_cached():
+    assert encode("a-b") is encode("a-b")
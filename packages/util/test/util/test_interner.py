@@ -0,0 +1,51 @@
+from typing import Literal
+
+import pytest
+from util.interner import Interner
+from util.node import Node
+
+
+class Leaf(Node, frozen=True):
+    tag: Literal["leaf"] = "leaf"
+    name: str
+
+
+class Tree(Node, frozen=True):
+    tag: Literal["node"] = "node"
+    bindings: list[tuple[str, Leaf | Tree]]
+    children: list[Leaf | Tree]
+
+
+def test_interner_call():
+    intern = Interner([Leaf, Tree])
+
+    x = intern(Leaf, name="x")
+
+    assert intern(Leaf, name="x") is x
+    assert intern(Leaf, name="y") is not x
+    assert intern(Tree, bindings=[("a", x)], children=[x]) is intern(Tree, children=[x], bindings=[("a", x)])
+    assert intern(Tree, bindings=[("a", x)], children=[x]) == Tree(bindings=[("a", Leaf(name="x"))], children=[x])
+
+
+def test_interner_hash():
+    intern = Interner([Leaf, Tree])
+    x = intern(Leaf, name="x")
+    node = intern(Tree, bindings=[("a", x)], children=[x])
+
+    assert len({node, intern(Tree, bindings=[("a", intern(Leaf, name="x"))], children=[x]), x}) == 2
+    assert node != intern(Tree, bindings=[], children=[x])
+
+
+def test_interner_incomplete():
+    # A node over children from elsewhere may equal another without being the same instance, so it is not stamped.
+    intern = Interner([Leaf, Tree])
+    node = intern(Tree, bindings=[], children=[Leaf(name="x")])
+
+    assert node == intern(Tree, bindings=[], children=[Leaf(name="x")])
+    with pytest.raises(TypeError):
+        hash(node)
+
+
+def test_interner_separate():
+    # Trees from different interners are compared field by field.
+    assert Interner([Leaf])(Leaf, name="x") == Interner([Leaf])(Leaf, name="x")
@@ -0,0 +1,24 @@
+from typing import Literal
+
+import pytest
+from util.node import Node
+
+
+class Leaf(Node, frozen=True):
+    tag: Literal["leaf"] = "leaf"
+    name: str
+
+
+def test_node_eq():
+    x = Leaf(name="x")
+    same = x
+
+    assert x == same
+    assert x == Leaf(name="x")
+    assert x != Leaf(name="y")
+    assert x != "x"
+
+
+def test_node_hash():
+    with pytest.raises(TypeError):
+        hash(Leaf(name="x"))
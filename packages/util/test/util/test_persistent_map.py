@@ -0,0 +1,99 @@
+import random
+
+from util.persistent_map import PersistentMap, extend, persistent, remove
+
+
+def test_extend():
+    empty = PersistentMap[str, int]()
+    one = empty.extend({"a": 1})
+    two = one.extend({"b": 2})
+
+    assert dict(two) == {"a": 1, "b": 2}
+    assert dict(one) == {"a": 1}
+    assert dict(empty) == {}
+    assert dict(two) == {"a": 1, "b": 2}
+
+
+def test_shadow():
+    outer = PersistentMap({"a": 1})
+    inner = outer.extend({"a": 2})
+
+    assert inner["a"] == 2
+    assert outer["a"] == 1
+    assert inner.get("a") == 2
+
+
+def test_remove():
+    outer = PersistentMap({"a": 1, "b": 2})
+    inner = outer.remove(["a", "c"])
+
+    assert "a" not in inner
+    assert inner.get("a") is None
+    assert len(inner) == 1
+    assert "a" in outer
+    assert len(outer) == 2
+
+
+def test_nothing_changed():
+    mapping = PersistentMap({"a": 1})
+    assert mapping.extend({}) is mapping
+    assert mapping.remove([]) is mapping
+
+
+def test_repeated_key():
+    mapping = PersistentMap({"a": 1})
+    changed = mapping.extend({"b": 2}).remove(["a"]).extend({"a": 3, "b": 4})
+
+    assert dict(changed) == {"a": 3, "b": 4}
+    assert dict(mapping) == {"a": 1}
+
+
+def test_iterate_while_switching():
+    first = PersistentMap({"a": 1})
+    second = first.extend({"b": 2})
+    assert first == {"a": 1}
+    assert second == {"a": 1, "b": 2}
+    assert [(key, first.get(key)) for key in second] == [("a", 1), ("b", None)]
+
+
+def test_repr():
+    assert repr(PersistentMap({"a": 1}).extend({"b": 2})) == "PersistentMap({'a': 1, 'b': 2})"
+
+
+def test_helpers_accept_any_mapping():
+    mapping = PersistentMap({"a": 1})
+    assert persistent(mapping) is mapping
+    assert persistent({"a": 1}) == mapping
+
+    assert dict(extend({"a": 1}, {"b": 2})) == {"a": 1, "b": 2}
+    assert dict(remove({"a": 1}, ["a"])) == {}
+
+
+def test_deep():
+    versions = [PersistentMap[int, int]()]
+    for i in range(100_000):
+        versions.append(versions[-1].extend({i: i}))
+
+    assert 0 not in versions[0]
+    assert len(versions[-1]) == 100_000
+    assert versions[50_000].get(50_000) is None
+    assert versions[50_001][50_000] == 50_000
+
+
+def test_random_against_dicts():
+    rng = random.Random(0)
+    versions: list[tuple[PersistentMap[int, int], dict[int, int]]] = [(PersistentMap(), {})]
+
+    for _ in range(2_000):
+        mapping, expected = rng.choice(versions)
+        assert dict(mapping) == expected
+
+        if rng.random() < 0.7:
+            items = {rng.randrange(20): rng.randrange(100) for _ in range(rng.randrange(3))}
+            versions.append((mapping.extend(items), {**expected, **items}))
+        else:
+            keys = [rng.randrange(20) for _ in range(rng.randrange(3))]
+            versions.append((mapping.remove(keys), {k: v for k, v in expected.items() if k not in keys}))
+
+    for mapping, expected in versions:
+        assert dict(mapping) == expected
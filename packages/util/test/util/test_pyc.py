@@ -0,0 +1,27 @@
+import ast
+import importlib
+import importlib.util
+import runpy
+import sys
+from pathlib import Path
+
+import pytest
+from util.pyc import to_pyc
+
+
+def test_to_pyc(tmp_path: Path):
+    module = ast.parse("def f(x):\n    return x + 1\n")
+
+    pyc = to_pyc(module, "module.py")
+    (tmp_path / "module.pyc").write_bytes(pyc)
+
+    assert pyc.startswith(importlib.util.MAGIC_NUMBER)
+    assert runpy.run_path(str(tmp_path / "module.pyc"))["f"](1) == 2
+
+
+def test_to_pyc_import(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    (tmp_path / "generated.pyc").write_bytes(to_pyc(ast.parse("value = 42"), "generated.py"))
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    assert importlib.import_module("generated").value == 42
+    del sys.modules["generated"]
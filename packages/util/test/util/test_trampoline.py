@@ -0,0 +1,46 @@
+from util.trampoline import Steps, each, run, trampoline
+
+
+@trampoline
+def depth(n: int) -> Steps[int]:
+    if n == 0:
+        return 0
+    return 1 + (yield depth.steps(n - 1))
+
+
+@trampoline
+def total(tree: list[object] | int) -> Steps[int]:
+    if isinstance(tree, int):
+        return tree
+    return sum((yield each(total.steps(child) for child in tree)))
+
+
+def test_run():
+    def steps() -> Steps[int]:
+        return 42
+        yield
+
+    assert run(steps()) == 42
+
+
+def test_each():
+    assert total([1, [2, 3], [], [[4]]]) == 10
+
+
+def test_plain_values_sent_back():
+    def steps() -> Steps[list[int]]:
+        return [(yield 1), (yield 2)]
+
+    assert run(steps()) == [1, 2]
+
+
+def test_deep():
+    assert depth(100_000) == 100_000
+
+
+def test_deep_each():
+    tree: list[object] | int = 1
+    for _ in range(100_000):
+        tree = [tree]
+
+    assert total(tree) == 1
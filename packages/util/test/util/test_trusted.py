@@ -0,0 +1,38 @@
+from typing import Literal
+
+import pytest
+from pydantic import BaseModel, ValidationError
+from util.trusted import trusted
+
+
+class Node(BaseModel, frozen=True):
+    tag: Literal["node"] = "node"
+    name: str
+    children: list[Node]
+
+
+def test_trusted():
+    leaf = Node(name="leaf", children=[])
+
+    actual = trusted(Node, name="root", children=[leaf])
+
+    expected = Node(name="root", children=[leaf])
+
+    assert actual == expected
+    assert actual.children[0] is leaf
+    assert actual.model_fields_set == expected.model_fields_set
+    assert actual.model_dump() == expected.model_dump()
+    assert repr(actual) == repr(expected)
+
+
+def test_trusted_skips_validation():
+    actual = trusted(Node, name=1, children=[])
+
+    assert actual.name == 1
+
+
+def test_trusted_frozen():
+    actual = trusted(Node, name="root", children=[])
+
+    with pytest.raises(ValidationError):
+        actual.name = "other"  # pyright: ignore[reportAttributeAccessIssue]